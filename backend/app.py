@@ -9,7 +9,7 @@ import time
 import logging
 from datetime import datetime
 from typing import Dict, Any, List, Optional
-from fastapi import FastAPI, HTTPException, BackgroundTasks, UploadFile, File, Header
+from fastapi import FastAPI, HTTPException, BackgroundTasks, UploadFile, File, Header, Body
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
@@ -18,17 +18,25 @@ from fastapi.responses import FileResponse
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from backend.engine import run_autopilot
-from backend.database import PersistentDatabase
+from backend.database import PersistentDatabase, encode_page_cursor, decode_page_cursor
 from backend.auth import AuthManager
 from backend.scheduler import start_autonomous_ai_agent  # Import autonomous agent
 from backend.job_fetcher import JobFetcher  # Import job fetcher for portal integration
+from backend.job_catalog import JobCatalog
+from backend.federated_fetcher import FederatedJobFetcher
+from backend.portal_health import portal_health, configured_portal_urls
+from backend.profile_changes import (
+    ProfileChangePublisher, JsonPatchError, ProfileVersionConflict, changed_fields, affects_ranking
+)
+from backend.ranking_cache import RankingCache, ranking_key
 from backend.models import (
     UserRegistrationRequest, UserLoginRequest, AuthResponse,
     ResumeUploadResponse, DraftProfileRequest, DraftProfileResponse,
-    SaveProfileRequest, SaveProfileResponse, ProfileValidationResponse,
-    JobListingRequest, JobListingResponse, JobListingsResponse,
-    RunAutopilotRequest, RunAutopilotResponse, AutopilotStatusResponse,
+    SaveProfileRequest, SaveProfileResponse, ProfileValidationResponse, ProfilePatchResponse,
+    JobListingRequest, JobListingResponse, JobListingsResponse, JobSearchResponse,
+    RunAutopilotRequest, RunAutopilotResponse, AutopilotStatusResponse, AutopilotRunsResponse,
     ApplicationHistoryResponse, DeleteHistoryRequest, UserDashboardResponse,
+    AnalyticsTimeseriesResponse,
     BulkJobUploadRequest, BulkJobUploadResponse,
     GenerateDraftRequest, GenerateDraftResponse, ApproveArtifactsRequest,
     ApproveArtifactsResponse, CurrentArtifactsResponse,
@@ -64,7 +72,26 @@ app.add_middleware(
 # Database and auth instances
 db = PersistentDatabase("data/platform.db")  # Use consistent path from project root
 auth_manager = AuthManager(db)
-job_fetcher = JobFetcher()  # Initialize job fetcher for portal integration
+PORTAL_URLS = configured_portal_urls()
+# Several portals (PORTAL_URLS) are queried concurrently and deduplicated by the federated fetcher
+job_fetcher = FederatedJobFetcher(PORTAL_URLS) if len(PORTAL_URLS) > 1 else JobFetcher(PORTAL_URLS[0])
+job_catalog = JobCatalog(
+    job_fetcher,
+    ttl_seconds=float(os.environ.get("JOB_CATALOG_TTL_SECONDS", 60)),
+    snapshot_path=os.environ.get("JOB_CATALOG_SNAPSHOT_PATH", "data/job_catalog.snapshot") or None
+)
+ranking_cache = RankingCache()
+PLATFORM_ANALYTICS_COMPANY_BREAKDOWN = os.environ.get("PLATFORM_ANALYTICS_COMPANY_BREAKDOWN", "false").lower() == "true"
+profile_changes = ProfileChangePublisher()
+
+
+def invalidate_rankings_on_profile_change(user_id: int, fields):
+    """Only skill and constraint edits change rankings; basic_info and the like keep the cache."""
+    if affects_ranking(fields):
+        ranking_cache.invalidate(user_id)
+
+
+profile_changes.subscribe(invalidate_rankings_on_profile_change)
 
 # Setup logger
 logger = logging.getLogger(__name__)
@@ -76,6 +103,11 @@ logger = logging.getLogger(__name__)
 running_tasks: Dict[int, asyncio.Task] = {}
 
 
+def portal_available() -> bool:
+    """Whether any configured portal is up, per the background health monitor."""
+    return any(portal_health.is_available(url) for url in PORTAL_URLS)
+
+
 def get_auth_token(authorization: Optional[str] = Header(None)) -> Optional[str]:
     """Extract auth token from Authorization header."""
     if authorization and authorization.startswith("Bearer "):
@@ -83,6 +115,19 @@ def get_auth_token(authorization: Optional[str] = Header(None)) -> Optional[str]
     return None
 
 
+def get_ranked_jobs(user_id: int, profile_data: Dict[str, Any], all_jobs: List[Dict[str, Any]],
+                    catalog_version: int) -> List[Dict[str, Any]]:
+    """AI-rank catalog jobs for a user, reusing the cached ranking while its inputs are unchanged."""
+    from backend.ai_agents import rank_jobs_for_user
+    
+    cache_key = ranking_key(profile_data, catalog_version)
+    ranked_jobs = ranking_cache.get(user_id, cache_key)
+    if ranked_jobs is None:
+        ranked_jobs = rank_jobs_for_user(profile_data, all_jobs)
+        ranking_cache.put(user_id, cache_key, ranked_jobs)
+    return ranked_jobs
+
+
 @app.get("/")
 async def root():
     """Health check endpoint."""
@@ -351,6 +396,7 @@ async def save_profile(
         if existing_profile:
             # Check if profile has actually changed (to avoid unnecessary resets)
             existing_data = existing_profile.get("profile_data", {})
+            fields = changed_fields(existing_data, cleaned_profile_data)
             if existing_data != cleaned_profile_data:
                 # Profile has changed - clear application history to allow reapplying
                 cleared_count = db.clear_user_application_history(user_id)
@@ -361,6 +407,7 @@ async def save_profile(
             if not success:
                 raise HTTPException(status_code=500, detail="Failed to update profile")
             profile_id = existing_profile["id"]
+            profile_changes.publish(user_id, fields)
             
             # Profile modification invalidates existing approvals
             message = "Profile saved successfully. Application history cleared - you can now reapply to jobs with your updated profile."
@@ -391,13 +438,65 @@ async def get_user_profile(authorization: Optional[str] = Header(None)):
     if not is_auth:
         raise HTTPException(status_code=401, detail=auth_message)
     
-    profile = db.get_user_profile(user_id)
+    profile = db.get_user_profile(user_id, include_resume_text=True)
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
     
     return {"success": True, "profile": profile}
 
 
+@app.patch("/api/profile", response_model=ProfilePatchResponse)
+async def patch_profile(
+    operations: List[Dict[str, Any]] = Body(...),
+    if_match: Optional[str] = Header(None),
+    authorization: Optional[str] = Header(None)
+):
+    """
+    Partially update the user's profile with an RFC 6902 JSON Patch.
+    
+    Send the profile version from a previous response as If-Match to reject the
+    patch (409) if the profile changed in between. Only skill and constraint
+    changes reset application history and cached rankings.
+    """
+    token = get_auth_token(authorization)
+    is_auth, user_id, auth_message = auth_manager.require_auth(token)
+    if not is_auth:
+        raise HTTPException(status_code=401, detail=auth_message)
+    
+    expected_version = None
+    if if_match:
+        try:
+            expected_version = int(if_match.strip().removeprefix("W/").strip('"'))
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid If-Match version: {if_match}")
+    
+    try:
+        result = db.patch_user_profile(user_id, operations, expected_version=expected_version)
+    except ProfileVersionConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except JsonPatchError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid patch: {str(e)}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Failed to patch profile: {str(e)}")
+    except RuntimeError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    fields = set(result["changed_fields"])
+    history_cleared = affects_ranking(fields)
+    if history_cleared:
+        # Skill/constraint changes can turn earlier skips into matches - allow reapplying
+        cleared_count = db.clear_user_application_history(user_id)
+        logger.info(f"Profile patched for user {user_id} ({', '.join(sorted(fields))}): cleared {cleared_count} application history entries")
+    profile_changes.publish(user_id, fields)
+    
+    return ProfilePatchResponse(
+        success=True,
+        version=result["version"],
+        changed_fields=result["changed_fields"],
+        history_cleared=history_cleared
+    )
+
+
 # ==================== JOB LISTINGS ENDPOINTS ====================
 
 @app.post("/api/jobs/add", response_model=JobListingResponse)
@@ -474,6 +573,30 @@ async def get_job_listings(limit: int = 50):
         raise HTTPException(status_code=500, detail=f"Failed to get job listings: {str(e)}")
 
 
+@app.get("/api/jobs/search", response_model=JobSearchResponse)
+async def search_job_listings(q: str, limit: int = 20, offset: int = 0):
+    """Full-text search over stored job listings (BM25 ranked, paginated)."""
+    if limit < 1 or limit > 100:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 100")
+    if offset < 0:
+        raise HTTPException(status_code=400, detail="offset must not be negative")
+    
+    try:
+        results = db.search_job_listings(q, limit=limit, offset=offset)
+        
+        return JobSearchResponse(
+            success=True,
+            query=q,
+            jobs=[JobListingResponse(**job) for job in results["jobs"]],
+            total_count=results["total_count"],
+            limit=limit,
+            offset=offset
+        )
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to search job listings: {str(e)}")
+
+
 @app.get("/api/jobs/ai-ranked")
 async def get_ai_ranked_jobs(
     authorization: Optional[str] = Header(None)
@@ -493,62 +616,21 @@ async def get_ai_ranked_jobs(
         if not user_profile:
             raise HTTPException(status_code=404, detail="User profile not found. Please complete your profile first.")
         
-        # Check if sandbox portal is available
-        portal_status = job_fetcher.check_portal_status()
-        if portal_status.get("status") != "active":
-            raise HTTPException(status_code=503, detail="Sandbox portal is not available. Please start the portal at http://localhost:5001")
+        # All portal jobs in internal format, from the shared catalog (stale copy served while the portal is down)
+        catalog_version, all_jobs = job_catalog.snapshot()
         
-        # Fetch jobs from sandbox portal (ensure we get ALL jobs)
-        portal_jobs = job_fetcher.fetch_jobs(filters={"limit": 1000})
-        
-        if not portal_jobs:
+        if not all_jobs:
+            if not portal_available():
+                raise HTTPException(status_code=503, detail="Sandbox portal is not available. Please start the portal at http://localhost:5001")
             raise HTTPException(status_code=404, detail="No jobs available from sandbox portal")
         
-        # Convert portal jobs to internal format for AI ranking
-        all_jobs = []
-        for portal_job in portal_jobs:
-            internal_job = job_fetcher.convert_portal_job_to_internal_format(portal_job)
-            all_jobs.append(internal_job)
-        
-        # Get application history to mark applied/processed jobs
-        application_history = db.get_user_application_history(user_id, limit=1000)
-        applied_job_ids = set()
-        permanently_skipped_job_ids = set()
-        
-        # Group history by job_id to handle multiple entries per job
-        job_history = {}
-        for app in application_history:
-            job_id = app["job_id"]
-            if job_id not in job_history:
-                job_history[job_id] = []
-            job_history[job_id].append(app)
-        
-        # Process each job's history to determine final status
-        for job_id, entries in job_history.items():
-            # Check if any entry shows the job was successfully applied to
-            if any(entry["status"] in ["submitted", "retried"] for entry in entries):
-                applied_job_ids.add(job_id)
-            else:
-                # Check if ALL skip reasons are permanent (not due to daily limit)
-                skip_entries = [entry for entry in entries if entry["status"] == "skipped"]
-                if skip_entries:
-                    # If ANY skip was due to daily limit, don't mark as permanently skipped
-                    has_daily_limit_skip = False
-                    for entry in skip_entries:
-                        skip_reason = entry.get("skip_reason", "")
-                        if skip_reason and ("daily limit" in skip_reason.lower() or 
-                                          "maximum allowed applications per day" in skip_reason.lower() or 
-                                          "exceeded the maximum allowed applications" in skip_reason.lower()):
-                            has_daily_limit_skip = True
-                            break
-                    
-                    # Only mark as permanently skipped if NO skip was due to daily limit
-                    if not has_daily_limit_skip:
-                        permanently_skipped_job_ids.add(job_id)
+        # Get already processed jobs (applied / permanently skipped) from the job state table
+        job_id_sets = db.get_user_job_id_sets(user_id)
+        applied_job_ids = job_id_sets["applied"]
+        permanently_skipped_job_ids = job_id_sets["excluded"]
         
         # AI job matching and ranking
-        from backend.ai_agents import rank_jobs_for_user
-        ranked_jobs = rank_jobs_for_user(user_profile["profile_data"], all_jobs)
+        ranked_jobs = get_ranked_jobs(user_id, user_profile["profile_data"], all_jobs, catalog_version)
         
         # Update status for jobs that have been processed
         updated_count = 0
@@ -589,26 +671,28 @@ async def get_ai_ranked_jobs(
 async def get_portal_status():
     """
     Get sandbox portal status and integration info.
+    Served from the health monitor and the job catalog; does not contact the portal
+    (a catalog that has not been loaded yet reports "loaded": false).
     """
     try:
-        portal_status = job_fetcher.check_portal_status()
-        
-        # Get portal job count
-        portal_jobs_count = 0
-        if portal_status.get("status") == "active":
-            portal_jobs = job_fetcher.fetch_jobs(filters={"limit": 1000})
-            portal_jobs_count = len(portal_jobs)
+        is_available = portal_available()
+        portal_status = job_catalog.status()
+        portal_status["status"] = "active" if is_available else "unavailable"
+        portal_jobs_count = portal_status["job_count"]
         
         return {
             "success": True,
             "portal_status": portal_status,
+            "portal_health": portal_health.snapshot(),
             "integration_status": {
-                "portal_available": portal_status.get("status") == "active",
+                "portal_available": is_available,
                 "portal_jobs_count": portal_jobs_count,
                 "database_jobs_count": 0,  # No longer using database jobs
                 "mode": "portal_only",
                 "autonomous_agent_active": True
-            }
+            },
+            "portal_requests": job_fetcher.coalescing_stats(),
+            "portal_http": job_fetcher.http_stats()
         }
         
     except Exception as e:
@@ -636,70 +720,23 @@ async def start_autopilot(
         if not user_profile:
             raise HTTPException(status_code=404, detail="User profile not found")
         
-        # Get AI-ranked jobs from portal (same logic as ai-ranked endpoint)
-        # Check if sandbox portal is available
-        portal_status = job_fetcher.check_portal_status()
-        if portal_status.get("status") != "active":
-            return {
-                "success": False,
-                "message": "Sandbox portal is not available. Please start the portal at http://localhost:5001",
-                "applied_count": 0
-            }
-        
-        # Fetch jobs from sandbox portal (ensure we get ALL jobs)
-        portal_jobs = job_fetcher.fetch_jobs(filters={"limit": 1000})
+        # Get AI-ranked jobs from the shared catalog (same logic as ai-ranked endpoint)
+        catalog_version, all_jobs = job_catalog.snapshot()
         
-        if not portal_jobs:
+        if not all_jobs:
             return {
                 "success": False,
-                "message": "No jobs available from sandbox portal",
+                "message": "No jobs available from sandbox portal" if portal_available()
+                           else "Sandbox portal is not available. Please start the portal at http://localhost:5001",
                 "applied_count": 0
             }
         
-        # Convert portal jobs to internal format for AI ranking
-        all_jobs = []
-        for portal_job in portal_jobs:
-            internal_job = job_fetcher.convert_portal_job_to_internal_format(portal_job)
-            all_jobs.append(internal_job)
-        
-        # Get application history to mark applied/processed jobs
-        application_history = db.get_user_application_history(user_id, limit=1000)
-        applied_job_ids = set()
-        permanently_skipped_job_ids = set()
-        
-        # Group history by job_id to handle multiple entries per job
-        job_history = {}
-        for app in application_history:
-            job_id = app["job_id"]
-            if job_id not in job_history:
-                job_history[job_id] = []
-            job_history[job_id].append(app)
-        
-        # Process each job's history to determine final status
-        for job_id, entries in job_history.items():
-            # Check if any entry shows the job was successfully applied to
-            if any(entry["status"] in ["submitted", "retried"] for entry in entries):
-                applied_job_ids.add(job_id)
-            else:
-                # Check if ALL skip reasons are permanent (not due to daily limit)
-                skip_entries = [entry for entry in entries if entry["status"] == "skipped"]
-                if skip_entries:
-                    # If ANY skip was due to daily limit, don't mark as permanently skipped
-                    has_daily_limit_skip = False
-                    for entry in skip_entries:
-                        skip_reason = entry.get("skip_reason", "")
-                        if skip_reason and ("daily limit" in skip_reason.lower() or 
-                                          "maximum allowed applications per day" in skip_reason.lower() or 
-                                          "exceeded the maximum allowed applications" in skip_reason.lower()):
-                            has_daily_limit_skip = True
-                            break
-                    
-                    # Only mark as permanently skipped if NO skip was due to daily limit
-                    if not has_daily_limit_skip:
-                        permanently_skipped_job_ids.add(job_id)
+        # Get already processed jobs (applied / permanently skipped) from the job state table
+        job_id_sets = db.get_user_job_id_sets(user_id)
+        applied_job_ids = job_id_sets["applied"]
+        permanently_skipped_job_ids = job_id_sets["excluded"]
         
-        from backend.ai_agents import rank_jobs_for_user
-        ranked_jobs = rank_jobs_for_user(user_profile["profile_data"], all_jobs)
+        ranked_jobs = get_ranked_jobs(user_id, user_profile["profile_data"], all_jobs, catalog_version)
         
         # Update status for jobs that have been processed
         for job in ranked_jobs:
@@ -725,10 +762,7 @@ async def start_autopilot(
         today_start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
         
         # Get today's application count
-        today_applications = db.get_user_application_history(user_id, limit=1000)
-        apps_today_count = len([app for app in today_applications 
-                               if app["status"] in ["submitted", "retried"] 
-                               and app["timestamp"] >= today_start])
+        apps_today_count = db.count_user_applications_since(user_id, today_start)
         
         # Check if daily limit already reached - don't create run if so
         from schemas.student_schema import StudentArtifactPack
@@ -780,7 +814,11 @@ async def start_autopilot(
         
         tracker = ApplicationTracker()
         # Pass original profile separately to avoid schema validation issues
-        result = run_autopilot(student_artifact_pack, engine_jobs, tracker, original_profile, apps_today_count)
+        result = run_autopilot(
+            student_artifact_pack, engine_jobs, tracker, original_profile, apps_today_count,
+            batch_submit=os.environ.get("AUTOPILOT_BATCH_SUBMIT", "true").lower() == "true",
+            job_fetcher=job_fetcher
+        )
         
         if result["success"]:
             # Save application history (exclude "queued" status - only save final outcomes)
@@ -794,6 +832,7 @@ async def start_autopilot(
                     "job_id": event["job_id"],
                     "status": event["status"],
                     "reason": event.get("reason"),
+                    "reason_code": event.get("reason_code"),
                     "receipt_id": event.get("receipt_id"),
                     "timestamp": event["timestamp"],
                     "company": event.get("company"),
@@ -1081,8 +1120,10 @@ async def run_autopilot_endpoint(
         if request.job_ids:
             job_ids = request.job_ids
         else:
-            # Get all active jobs
-            jobs = db.get_active_job_listings(1000)
+            # Get active jobs sharing at least one skill with the user (matched in SQL)
+            profile = db.get_user_profile(user_id)
+            skill_vocab = profile["profile_data"].get("skill_vocab", []) if profile else []
+            jobs = db.find_jobs_matching_skills(skill_vocab, limit=1000)
             job_ids = [job["job_id"] for job in jobs]
         
         if not job_ids:
@@ -1132,8 +1173,7 @@ async def get_autopilot_status(
         raise HTTPException(status_code=401, detail=auth_message)
     
     try:
-        runs = db.get_user_autopilot_runs(user_id, limit=100)
-        run_data = next((run for run in runs if run["id"] == run_id), None)
+        run_data = db.get_autopilot_run(user_id, run_id)
         
         if not run_data:
             raise HTTPException(status_code=404, detail="Run not found")
@@ -1153,32 +1193,99 @@ async def get_autopilot_status(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/autopilot/runs", response_model=AutopilotRunsResponse)
+async def get_autopilot_runs(
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    include_archived: bool = False,
+    authorization: Optional[str] = Header(None)
+):
+    """Get autopilot runs for user, newest first (cursor paginated; include_archived reaches past the retention horizon)."""
+    token = get_auth_token(authorization)
+    is_auth, user_id, auth_message = auth_manager.require_auth(token)
+    if not is_auth:
+        raise HTTPException(status_code=401, detail=auth_message)
+    
+    try:
+        before = decode_page_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        runs = db.get_user_autopilot_runs(user_id, limit=limit, before=before, include_archived=include_archived)
+        
+        run_responses = []
+        for run in runs:
+            run_responses.append(AutopilotStatusResponse(
+                run_id=run["id"],
+                status=run["status"],
+                job_ids=run["job_ids"],
+                summary_data=run["summary_data"],
+                started_at=run["started_at"],
+                completed_at=run["completed_at"]
+            ))
+        
+        next_cursor = None
+        if runs and len(runs) == limit:
+            next_cursor = encode_page_cursor(runs[-1]["started_at"], runs[-1]["id"])
+        
+        return AutopilotRunsResponse(
+            success=True,
+            runs=run_responses,
+            next_cursor=next_cursor
+        )
+    
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 # ==================== APPLICATION HISTORY ENDPOINTS ====================
 
 @app.get("/api/history/applications", response_model=ApplicationHistoryResponse)
 async def get_application_history(
     limit: int = 100,
     status_filter: Optional[str] = None,
+    cursor: Optional[str] = None,
+    include_archived: bool = False,
+    reason_code: Optional[int] = None,
     authorization: Optional[str] = Header(None)
 ):
-    """Get application history for user (CRITICAL - persistent record)."""
+    """
+    Get application history for user (CRITICAL - persistent record).
+    
+    Results are newest first. Pass the returned next_cursor as `cursor` to get the next page.
+    Entries older than the retention horizon are archived; set include_archived to read them.
+    reason_code filters on the structured skip/fail reason (core.reason_codes.ReasonCode).
+    """
     token = get_auth_token(authorization)
     is_auth, user_id, auth_message = auth_manager.require_auth(token)
     if not is_auth:
         raise HTTPException(status_code=401, detail=auth_message)
     
     try:
-        history = db.get_user_application_history(user_id, limit, status_filter)
+        before = decode_page_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        history = db.get_user_application_history(user_id, limit, status_filter, before=before,
+                                                 include_archived=include_archived,
+                                                 reason_code=reason_code)
         stats = db.get_application_stats(user_id)
         
         from backend.models import ApplicationHistoryEntry
         history_entries = [ApplicationHistoryEntry(**entry) for entry in history]
         
+        next_cursor = None
+        if history and len(history) == limit:
+            next_cursor = encode_page_cursor(history[-1]["timestamp"], history[-1]["id"])
+        
         return ApplicationHistoryResponse(
             success=True,
             history=history_entries,
             total_count=len(history_entries),
-            stats=stats
+            stats=stats,
+            next_cursor=next_cursor
         )
     
     except Exception as e:
@@ -1213,6 +1320,86 @@ async def delete_history_entry(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# ==================== ANALYTICS ENDPOINTS ====================
+
+def build_analytics_response(
+    user_id: Optional[int],
+    granularity: str,
+    days: int,
+    group_by: Optional[str]
+) -> AnalyticsTimeseriesResponse:
+    """Query the analytics rollups for the last `days` days (UTC, including today)."""
+    if days < 1 or days > 366:
+        raise HTTPException(status_code=400, detail="days must be between 1 and 366")
+    if group_by == "none":
+        group_by = None
+    
+    until = time.time()
+    since = until - days * 86400
+    
+    try:
+        series = db.get_application_timeseries(
+            user_id, since, until, granularity=granularity, group_by=group_by
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return AnalyticsTimeseriesResponse(
+        success=True,
+        scope="platform" if user_id is None else "user",
+        granularity=granularity,
+        group_by=group_by,
+        since=datetime.utcfromtimestamp(since).isoformat(),
+        until=datetime.utcfromtimestamp(until).isoformat(),
+        series=series
+    )
+
+
+@app.get("/api/analytics/applications", response_model=AnalyticsTimeseriesResponse)
+async def get_application_analytics(
+    granularity: str = "day",
+    days: int = 30,
+    group_by: Optional[str] = "reason_code",
+    authorization: Optional[str] = Header(None)
+):
+    """
+    Get the user's submitted/skipped/failed/retried counts per hour, day or week.
+    
+    Each bucket is broken down by reason code (with its name) unless
+    group_by=company or group_by=none is given.
+    """
+    token = get_auth_token(authorization)
+    is_auth, user_id, auth_message = auth_manager.require_auth(token)
+    if not is_auth:
+        raise HTTPException(status_code=401, detail=auth_message)
+    
+    return build_analytics_response(user_id, granularity, days, group_by)
+
+
+@app.get("/api/analytics/platform", response_model=AnalyticsTimeseriesResponse)
+async def get_platform_analytics(
+    granularity: str = "day",
+    days: int = 30,
+    group_by: Optional[str] = "reason_code",
+    authorization: Optional[str] = Header(None)
+):
+    """
+    Get platform-wide application outcome counts per hour, day or week.
+    
+    group_by: reason_code (default), company or none. Per-company counts show
+    which employers other users apply to, so they are only served when
+    PLATFORM_ANALYTICS_COMPANY_BREAKDOWN is enabled.
+    """
+    token = get_auth_token(authorization)
+    is_auth, user_id, auth_message = auth_manager.require_auth(token)
+    if not is_auth:
+        raise HTTPException(status_code=401, detail=auth_message)
+    if group_by == "company" and not PLATFORM_ANALYTICS_COMPANY_BREAKDOWN:
+        raise HTTPException(status_code=403, detail="Platform analytics by company are disabled")
+    
+    return build_analytics_response(None, granularity, days, group_by)
+
+
 # ==================== DASHBOARD ENDPOINT ====================
 
 @app.get("/api/dashboard", response_model=UserDashboardResponse)
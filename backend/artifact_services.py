@@ -396,6 +396,7 @@ class EngineGateway:
                             "job_id": event["job_id"],
                             "status": event["status"],
                             "reason": event.get("reason"),
+                            "reason_code": event.get("reason_code"),
                             "receipt_id": event.get("receipt_id"),
                             "timestamp": event["timestamp"]
                         })
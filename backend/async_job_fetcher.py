@@ -0,0 +1,242 @@
+"""
+Asyncio job fetcher - the JobFetcher surface on httpx.AsyncClient.
+Lets async endpoints and schedulers fan out portal calls concurrently without threads.
+"""
+import os
+import logging
+from typing import List, Dict, Any, Optional
+
+import httpx
+
+from backend.http_client import normalize_portal_url
+from backend.job_fetcher import PortalFormatting, portal_requests
+from backend.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncJobFetcher(PortalFormatting):
+    """
+    Non-blocking portal client with the same methods and return values as JobFetcher.
+
+    Concurrency is bounded by max_connections (calls beyond it wait for a free
+    connection, up to the pool timeout). Identical concurrent GETs on the same event
+    loop share one request. An instance belongs to the event loop it is first used
+    on; close it with aclose() or use it as an async context manager.
+    """
+
+    def __init__(self, portal_url: str = None, max_connections: int = 50, max_keepalive_connections: int = 20,
+                 connect_timeout: float = None, read_timeout: float = None, retries: int = None,
+                 single_flight: Optional[SingleFlight] = None):
+        if portal_url is None:
+            portal_url = os.environ.get('SANDBOX_URL', 'http://localhost:5001')
+        if connect_timeout is None:
+            connect_timeout = float(os.environ.get("PORTAL_CONNECT_TIMEOUT", 3.05))
+        if read_timeout is None:
+            read_timeout = float(os.environ.get("PORTAL_READ_TIMEOUT", 30))
+        if retries is None:
+            retries = int(os.environ.get("PORTAL_GET_RETRIES", 3))
+
+        self.portal_url = normalize_portal_url(portal_url)
+        self.single_flight = single_flight or portal_requests
+
+        # Incremental catalog sync state (see fetch_catalog_changes)
+        self.catalog_cursor: Optional[str] = None
+        self.catalog_etag: Optional[str] = None
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive_connections)
+        self.client = httpx.AsyncClient(
+            base_url=self.portal_url,
+            limits=limits,
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            # httpx transport retries cover failed connects only, so they are safe for POSTs too
+            transport=httpx.AsyncHTTPTransport(limits=limits, retries=retries)
+        )
+
+        logger.info(f"AsyncJobFetcher initialized with portal URL: {self.portal_url}")
+
+    async def __aenter__(self) -> "AsyncJobFetcher":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        """Close pooled connections."""
+        await self.client.aclose()
+
+    async def _get(self, path: str, params: Optional[Dict[str, Any]] = None,
+                   headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+        """GET a portal path; concurrent identical requests share one HTTP call."""
+        key = (
+            "GET", self.portal_url, path,
+            tuple(sorted((params or {}).items())),
+            tuple(sorted((headers or {}).items()))
+        )
+        return await self.single_flight.do_async(key, lambda: self.client.get(path, params=params, headers=headers))
+
+    async def check_portal_status(self) -> Dict[str, Any]:
+        """Check if the job portal is available."""
+        try:
+            response = await self._get("/api/portal/status")
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            logger.error(f"Failed to check portal status: {e}")
+            return {"status": "unavailable", "error": str(e)}
+
+    async def fetch_jobs(self, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Fetch jobs from the external portal."""
+        try:
+            params = self.build_job_query_params(filters)
+
+            logger.info(f"Fetching jobs from portal with filters: {params}")
+
+            response = await self._get("/api/jobs", params=params)
+            response.raise_for_status()
+
+            data = response.json()
+
+            if data.get('success'):
+                jobs = data.get('jobs', [])
+                logger.info(f"Successfully fetched {len(jobs)} jobs from portal")
+                return jobs
+            else:
+                logger.error(f"Portal returned error: {data}")
+                return []
+
+        except Exception as e:
+            logger.error(f"Failed to fetch jobs from portal: {e}")
+            return []
+
+    async def fetch_catalog_changes(self) -> Optional[Dict[str, Any]]:
+        """Fetch what changed in the job catalog since this fetcher's previous call (see JobFetcher.fetch_catalog_changes)."""
+        try:
+            if self.catalog_cursor:
+                response = await self._get("/api/jobs", params={'updated_since': self.catalog_cursor})
+            else:
+                headers = {'If-None-Match': self.catalog_etag} if self.catalog_etag else {}
+                response = await self._get("/api/jobs", headers=headers)
+
+            if response.status_code == 304:
+                return {"not_modified": True, "full": False, "jobs": [], "deleted_job_ids": []}
+
+            response.raise_for_status()
+            data = response.json()
+
+            if not data.get('success'):
+                logger.error(f"Portal returned error: {data}")
+                return None
+
+            full = data.get('full', self.catalog_cursor is None)
+            self.catalog_cursor = data.get('cursor')
+            self.catalog_etag = None if self.catalog_cursor else response.headers.get('ETag')
+
+            jobs = data.get('jobs', [])
+            deleted_job_ids = data.get('deleted_job_ids', [])
+            return {
+                "not_modified": not full and not jobs and not deleted_job_ids,
+                "full": full,
+                "jobs": jobs,
+                "deleted_job_ids": deleted_job_ids
+            }
+
+        except Exception as e:
+            logger.error(f"Failed to fetch job catalog changes from portal: {e}")
+            return None
+
+    async def get_job_details(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get detailed information about a specific job."""
+        try:
+            response = await self._get(f"/api/jobs/{job_id}")
+            response.raise_for_status()
+
+            data = response.json()
+
+            if data.get('success'):
+                return data.get('job')
+            else:
+                logger.error(f"Failed to get job details: {data}")
+                return None
+
+        except Exception as e:
+            logger.error(f"Failed to get job details for {job_id}: {e}")
+            return None
+
+    async def submit_application(self, job_id: str, application_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Submit an application to a job through the portal."""
+        try:
+            logger.info(f"Submitting application to job {job_id}")
+
+            response = await self.client.post(f"/api/jobs/{job_id}/apply", json=application_data)
+
+            data = response.json()
+
+            if response.status_code == 200 and data.get('success'):
+                logger.info(f"Application submitted successfully: {data.get('application_id')}")
+                return {
+                    "success": True,
+                    "application_id": data.get('application_id'),
+                    "receipt_id": data.get('receipt_id'),
+                    "message": data.get('message'),
+                    "status": "submitted",
+                    "receipt": data.get('receipt')
+                }
+            else:
+                logger.error(f"Application submission failed: {data}")
+                return {
+                    "success": False,
+                    "error": data.get('error', 'Unknown error'),
+                    "status": "failed"
+                }
+
+        except Exception as e:
+            logger.error(f"Failed to submit application to {job_id}: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "status": "failed"
+            }
+
+    async def get_application_status(self, application_id: str = None, receipt_id: str = None) -> Optional[Dict[str, Any]]:
+        """Get application status by application ID or receipt ID."""
+        try:
+            if receipt_id:
+                response = await self._get(f"/api/applications/receipt/{receipt_id}")
+            elif application_id:
+                response = await self._get(f"/api/applications/{application_id}")
+            else:
+                logger.error("Either application_id or receipt_id must be provided")
+                return None
+
+            response.raise_for_status()
+            data = response.json()
+
+            if data.get('success'):
+                return data.get('application')
+            else:
+                logger.error(f"Failed to get application status: {data}")
+                return None
+
+        except Exception as e:
+            logger.error(f"Failed to get application status: {e}")
+            return None
+
+    async def get_companies(self) -> List[Dict[str, Any]]:
+        """Get all companies from the portal."""
+        try:
+            response = await self._get("/api/companies")
+            response.raise_for_status()
+
+            data = response.json()
+
+            if data.get('success'):
+                companies = data.get('companies', [])
+                logger.info(f"Successfully fetched {len(companies)} companies from portal")
+                return companies
+            else:
+                logger.error(f"Portal returned error: {data}")
+                return []
+
+        except Exception as e:
+            logger.error(f"Failed to fetch companies from portal: {e}")
+            return []
@@ -3,9 +3,10 @@ Authentication system for the persistent job application platform.
 Simple session-based authentication for now.
 """
 import hashlib
-import secrets
+import os
 from typing import Optional, Dict, Any
 from backend.database import PersistentDatabase
+from backend.session_store import SessionStore, DEFAULT_SESSION_TTL_SECONDS
 
 
 class AuthManager:
@@ -13,7 +14,11 @@ class AuthManager:
     
     def __init__(self, db: PersistentDatabase):
         self.db = db
-        self.active_sessions: Dict[str, int] = {}  # token -> user_id
+        self.sessions = SessionStore(
+            db,
+            ttl_seconds=float(os.environ.get("SESSION_TTL_SECONDS", DEFAULT_SESSION_TTL_SECONDS)),
+            flush_interval=float(os.environ.get("SESSION_FLUSH_INTERVAL_SECONDS", 5.0))
+        )
     
     def hash_password(self, password: str) -> str:
         """Hash password with salt."""
@@ -54,12 +59,8 @@ class AuthManager:
             if password_hash != user["password_hash"]:
                 return False, "Invalid email or password", None, None
             
-            # Generate session token
-            token = secrets.token_urlsafe(32)
-            self.active_sessions[token] = user["id"]
-            
-            # Update last login
-            self.db.update_last_login(user["id"])
+            # Generate session token (last login is recorded with the next batched flush)
+            token = self.sessions.create(user["id"])
             
             return True, "Login successful", token, user["id"]
             
@@ -68,18 +69,15 @@ class AuthManager:
     
     def logout_user(self, token: str) -> bool:
         """Logout user by removing session token."""
-        if token in self.active_sessions:
-            del self.active_sessions[token]
-            return True
-        return False
+        return self.sessions.revoke(token)
     
     def get_user_from_token(self, token: str) -> Optional[int]:
         """Get user ID from session token."""
-        return self.active_sessions.get(token)
+        return self.sessions.resolve(token)
     
     def is_authenticated(self, token: str) -> bool:
         """Check if token is valid."""
-        return token in self.active_sessions
+        return self.sessions.resolve(token) is not None
     
     def require_auth(self, token: Optional[str]) -> tuple[bool, Optional[int], str]:
         """Require authentication and return user ID."""
@@ -0,0 +1,210 @@
+"""
+On-disk snapshot of the converted job catalog, so a restarted process can serve jobs before reaching the portal.
+Columnar, memory-mapped file: one segment per job field plus the skill index.
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+import zlib
+from array import array
+from typing import Dict, Any, List, Optional
+
+MAGIC = b"JOBCAT\x00\x01"
+FORMAT_VERSION = 1
+_HEADER_LENGTH = struct.Struct("<I")
+_INT64_MIN, _INT64_MAX = -2 ** 63, 2 ** 63 - 1
+BYTE_ORDER = "little"  # Every integer in the file, whatever the host's byte order
+
+
+def _pack(typecode: str, values) -> bytes:
+    packed = array(typecode, values)
+    if sys.byteorder != BYTE_ORDER:
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _align(data: bytearray, boundary: int = 8):
+    data.extend(b"\x00" * (-len(data) % boundary))
+
+
+def _is_int64_column(values: List[Any]) -> bool:
+    return all(type(value) is int and _INT64_MIN <= value <= _INT64_MAX for value in values)
+
+
+def write_snapshot(path: str, jobs: List[Dict[str, Any]], skill_index: Dict[str, List[int]],
+                   version: int, cursor: Optional[str] = None):
+    """
+    Write jobs and their skill index to path, atomically (readers see the old or the new file).
+
+    Each field becomes one column. Integer fields are packed int64 arrays; the
+    others are a JSON array of the column's values plus the byte offset of every
+    value, so a column decodes with one json.loads and a single row can be read
+    without touching the rest. Fields missing from some jobs are recorded per
+    column so jobs round-trip exactly.
+    """
+    fields: Dict[str, None] = {}
+    for job in jobs:
+        for key in job:
+            fields.setdefault(key)
+
+    data = bytearray()
+    columns = {}
+    for name in fields:
+        missing = [row for row, job in enumerate(jobs) if name not in job]
+        values = [job.get(name) for job in jobs]
+        _align(data)
+        if not missing and _is_int64_column(values):
+            columns[name] = {"kind": "int64", "offset": len(data)}
+            data.extend(_pack("q", values))
+            continue
+
+        # ensure_ascii keeps character and byte offsets identical
+        parts = [json.dumps(value, separators=(",", ":")) for value in values]
+        starts, position = array("Q"), 1
+        for part in parts:
+            starts.append(position)
+            position += len(part) + 1
+        starts.append(position)  # Row i spans starts[i] to starts[i + 1] - 1
+        blob = ("[" + ",".join(parts) + "]").encode("ascii")
+
+        columns[name] = {"kind": "json", "offsets": len(data), "missing": missing}
+        data.extend(_pack("Q", starts))
+        columns[name].update(offset=len(data), length=len(blob))
+        data.extend(blob)
+
+    _align(data)
+    index_blob = json.dumps(skill_index, separators=(",", ":")).encode("ascii")
+    skill_index_segment = {"offset": len(data), "length": len(index_blob)}
+    data.extend(index_blob)
+
+    header = json.dumps({
+        "format": FORMAT_VERSION,
+        "byteorder": BYTE_ORDER,
+        "version": version,
+        "cursor": cursor,
+        "saved_at": time.time(),
+        "job_count": len(jobs),
+        "columns": columns,
+        "skill_index": skill_index_segment,
+        "checksum": zlib.crc32(data)
+    }).encode("ascii")
+    prefix = bytearray(MAGIC + _HEADER_LENGTH.pack(len(header)) + header)
+    _align(prefix)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(prefix)
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+class CatalogSnapshot:
+    """
+    Read-only, memory-mapped view of a snapshot written by write_snapshot.
+
+    Opening only parses the header and verifies the checksum; columns, rows and
+    the skill index are decoded on request. Raises ValueError for files that are
+    not snapshots, have another format version or are corrupt.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._parse_header()
+        except Exception:
+            self.mm.close()
+            raise
+
+    def __enter__(self) -> "CatalogSnapshot":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.mm.close()
+
+    def _parse_header(self):
+        if self.mm[:len(MAGIC)] != MAGIC:
+            raise ValueError("Not a job catalog snapshot")
+        (header_length,) = _HEADER_LENGTH.unpack_from(self.mm, len(MAGIC))
+        header_start = len(MAGIC) + _HEADER_LENGTH.size
+        self.header = json.loads(self.mm[header_start:header_start + header_length])
+        if self.header.get("format") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format {self.header.get('format')}")
+        if self.header.get("byteorder") != BYTE_ORDER:
+            raise ValueError(f"Unsupported snapshot byte order {self.header.get('byteorder')}")
+
+        header_end = header_start + header_length
+        self.data_start = header_end + (-header_end % 8)
+        if zlib.crc32(memoryview(self.mm)[self.data_start:]) != self.header["checksum"]:
+            raise ValueError("Snapshot checksum mismatch")
+
+    @property
+    def version(self) -> int:
+        return self.header["version"]
+
+    @property
+    def cursor(self) -> Optional[str]:
+        return self.header["cursor"]
+
+    @property
+    def saved_at(self) -> float:
+        return self.header["saved_at"]
+
+    @property
+    def job_count(self) -> int:
+        return self.header["job_count"]
+
+    def column(self, name: str) -> List[Any]:
+        """All values of one field, in row order (None where a job lacks the field)."""
+        segment = self.header["columns"][name]
+        start = self.data_start + segment["offset"]
+        if segment["kind"] == "int64":
+            if sys.byteorder == BYTE_ORDER:
+                # Zero-copy view of the mapped column
+                with memoryview(self.mm)[start:start + 8 * self.job_count] as view:
+                    return view.cast("q").tolist()
+            values = array("q", self.mm[start:start + 8 * self.job_count])
+            values.byteswap()
+            return values.tolist()
+        return json.loads(self.mm[start:start + segment["length"]])
+
+    def job(self, row: int) -> Dict[str, Any]:
+        """Decode a single job without reading the other rows."""
+        if not 0 <= row < self.job_count:
+            raise IndexError(row)
+        job = {}
+        for name, segment in self.header["columns"].items():
+            if segment["kind"] == "int64":
+                job[name] = struct.unpack_from("<q", self.mm, self.data_start + segment["offset"] + 8 * row)[0]
+            elif row not in segment["missing"]:
+                start, end = struct.unpack_from("<QQ", self.mm, self.data_start + segment["offsets"] + 8 * row)
+                value_start = self.data_start + segment["offset"] + start
+                job[name] = json.loads(self.mm[value_start:value_start + end - start - 1])
+        return job
+
+    def jobs(self) -> List[Dict[str, Any]]:
+        """Decode every job (one json.loads per column)."""
+        columns = {name: self.column(name) for name in self.header["columns"]}
+        jobs = [{} for _ in range(self.job_count)]
+        for name, values in columns.items():
+            missing = set(self.header["columns"][name].get("missing", ()))
+            for row, (job, value) in enumerate(zip(jobs, values)):
+                if row not in missing:
+                    job[name] = value
+        return jobs
+
+    def skill_index(self) -> Dict[str, List[int]]:
+        segment = self.header["skill_index"]
+        start = self.data_start + segment["offset"]
+        return json.loads(self.mm[start:start + segment["length"]])
@@ -4,11 +4,145 @@ Supports user profiles, job listings, and application history.
 """
 import sqlite3
 import json
+import re
+import hashlib
+import base64
+import zlib
+import os
+import time
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Iterable, Optional, Set, Tuple
 from pathlib import Path
 import uuid
 
+from backend.profile_cache import ProfileCache
+from backend.profile_changes import apply_json_patch, changed_fields, ProfileVersionConflict
+from core.reason_codes import ReasonCode, DEFERRED_REASON_CODES, classify_legacy_reason
+
+
+# Final per-(user, job) outcome kept in user_job_states. Values are ordered so
+# that folding several history entries together with MAX() keeps the outcome
+# that matters most: once applied always applied, and a daily-limit skip is
+# never downgraded to a permanent skip.
+JOB_STATE_OPEN = 0       # Only failed/queued attempts - job may be retried
+JOB_STATE_EXCLUDED = 1   # Permanently skipped (validation, score, blocked company...)
+JOB_STATE_DEFERRED = 2   # Skipped because the daily limit was reached - retry later
+JOB_STATE_APPLIED = 3    # Submitted (or submitted after retry)
+
+
+# application_rollups.user_id used for the platform-wide aggregate
+PLATFORM_ROLLUP_USER_ID = 0
+ROLLUP_STATUSES = ("submitted", "skipped", "failed", "retried")
+SECONDS_PER_HOUR = 3600
+SECONDS_PER_DAY = 86400
+# application_rollups.resolution values (bucket length in seconds)
+ROLLUP_RESOLUTIONS = (SECONDS_PER_HOUR, SECONDS_PER_DAY)
+# Hourly buckets serve recent windows only; daily buckets are kept for good
+DEFAULT_HOURLY_ROLLUP_RETENTION_DAYS = 14
+
+
+# Columns holding "blob:<sha256>" references into the content-addressed blobs table
+BLOB_REF_PREFIX = "blob:"
+BLOB_REF_COLUMNS = (
+    ("autopilot_runs", "profile_snapshot"),
+    ("draft_artifacts", "student_artifact_pack"),
+    ("artifact_snapshots", "student_artifact_pack"),
+)
+DEFAULT_BLOB_MIGRATION_SECONDS = 300  # Per maintenance run; the rest waits for the next run
+
+
+# Rows older than the retention horizon move out of the hot tables into monthly
+# archive tables named <table>_archive_YYYYMM (UTC month of the row's timestamp).
+ARCHIVED_TABLES = ("application_history", "autopilot_runs")
+ARCHIVE_TABLE_INFIX = "_archive_"
+DEFAULT_RETENTION_DAYS = 180
+
+
+# Large text columns are stored zlib-compressed as BLOBs prefixed with a codec byte.
+# Short values (and rows written by older versions) stay plain TEXT.
+TEXT_CODEC_ZLIB = 1
+TEXT_COMPRESSION_MIN_BYTES = 1024
+
+
+def encode_text_column(text: Optional[str]) -> Any:
+    """Encode a text value for storage, compressing it when large enough to pay off."""
+    if text is None:
+        return None
+    raw = text.encode("utf-8")
+    if len(raw) < TEXT_COMPRESSION_MIN_BYTES:
+        return text
+    return bytes([TEXT_CODEC_ZLIB]) + zlib.compress(raw)
+
+
+def decode_text_column(value: Any) -> Optional[str]:
+    """Decode a value written by encode_text_column (plain TEXT passes through)."""
+    if value is None or isinstance(value, str):
+        return value
+    codec = value[0]
+    if codec == TEXT_CODEC_ZLIB:
+        return zlib.decompress(value[1:]).decode("utf-8")
+    raise ValueError(f"Unknown text column codec: {codec}")
+
+
+def encode_json_column(document: Any) -> Any:
+    """Serialize a JSON document for a (possibly compressed) text column."""
+    return encode_text_column(json.dumps(document))
+
+
+def decode_json_column(value: Any) -> Any:
+    """Deserialize a JSON document written by encode_json_column."""
+    return json.loads(decode_text_column(value))
+
+
+def normalize_skill(skill: str) -> str:
+    """Normalize a skill name for the skills lookup table (case-insensitive match)."""
+    return skill.strip().lower()
+
+
+def encode_page_cursor(sort_value: Any, row_id: int) -> str:
+    """Encode a keyset position (sort value, row id) as an opaque URL-safe cursor."""
+    payload = json.dumps([sort_value, row_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii")
+
+
+def decode_page_cursor(cursor: str) -> Tuple[Any, int]:
+    """Decode a cursor produced by encode_page_cursor. Raises ValueError if malformed."""
+    try:
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception:
+        raise ValueError(f"Invalid page cursor: {cursor!r}")
+    if not isinstance(row_id, int):
+        raise ValueError(f"Invalid page cursor: {cursor!r}")
+    return sort_value, row_id
+
+
+def reason_code_name(reason_code: int) -> str:
+    """Lowercase ReasonCode name for API output ("unknown" for codes this version does not define)."""
+    try:
+        return ReasonCode(reason_code).name.lower()
+    except ValueError:
+        return "unknown"
+
+
+def job_state_for_application(status: str, reason_code: int = ReasonCode.NONE) -> int:
+    """Classify a single history entry into a JOB_STATE_* value."""
+    if status in ("submitted", "retried"):
+        return JOB_STATE_APPLIED
+    if status == "skipped":
+        if reason_code in DEFERRED_REASON_CODES:
+            return JOB_STATE_DEFERRED
+        return JOB_STATE_EXCLUDED
+    return JOB_STATE_OPEN
+
+
+def reason_code_for_application(application: Dict[str, Any]) -> int:
+    """Reason code of an application result, classifying the text for callers that send none."""
+    if application["status"] not in ("skipped", "failed"):
+        return ReasonCode.NONE
+    if application.get("reason_code") is not None:
+        return int(application["reason_code"])
+    return classify_legacy_reason(application.get("reason"))
+
 
 class PersistentDatabase:
     """SQLite database manager for the persistent job application platform."""
@@ -16,11 +150,17 @@ class PersistentDatabase:
     def __init__(self, db_path: str = "../data/platform.db"):
         self.db_path = db_path
         Path(db_path).parent.mkdir(exist_ok=True)
+        self.profile_cache = ProfileCache(
+            max_bytes=int(os.environ.get("PROFILE_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+        )
         self.init_tables()
     
     def get_connection(self):
         """Get database connection."""
-        return sqlite3.connect(self.db_path)
+        conn = sqlite3.connect(self.db_path)
+        # INSERT OR REPLACE must fire delete triggers so the search index stays in sync
+        conn.execute("PRAGMA recursive_triggers = ON")
+        return conn
     
     def validate_user_profile(self, profile: dict):
         """Validate user profile against UserProfile schema (NEW FORMAT)."""
@@ -85,6 +225,8 @@ class PersistentDatabase:
     def init_tables(self):
         """Initialize database tables for persistent platform."""
         with self.get_connection() as conn:
+            # Only takes effect for a new database; older ones are converted by optimize_storage()
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
             conn.executescript("""
                 -- Users table (authentication and basic info)
                 CREATE TABLE IF NOT EXISTS users (
@@ -93,7 +235,8 @@ class PersistentDatabase:
                     password_hash TEXT NOT NULL,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     last_login TIMESTAMP,
-                    is_active BOOLEAN DEFAULT TRUE
+                    is_active BOOLEAN DEFAULT TRUE,
+                    history_epoch INTEGER NOT NULL DEFAULT 0  -- bumped to reset application history
                 );
                 
                 -- User profiles (SINGLE SOURCE OF TRUTH)
@@ -124,7 +267,23 @@ class PersistentDatabase:
                     posted_date TIMESTAMP,
                     expires_date TIMESTAMP,
                     is_active BOOLEAN DEFAULT TRUE,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    source TEXT,  -- Portal the listing was synced from (NULL for manual uploads)
+                    content_hash TEXT  -- Hash of listing content, used by bulk sync change detection
+                );
+                
+                -- Normalized skills (one row per distinct lowercase skill name)
+                CREATE TABLE IF NOT EXISTS skills (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT UNIQUE NOT NULL
+                );
+                
+                -- Job -> skill mapping (mirrors job_listings.required_skills)
+                CREATE TABLE IF NOT EXISTS job_skills (
+                    job_id TEXT NOT NULL,
+                    skill_id INTEGER NOT NULL,
+                    PRIMARY KEY (job_id, skill_id),
+                    FOREIGN KEY (skill_id) REFERENCES skills (id)
                 );
                 
                 -- Autopilot runs (execution tracking)
@@ -151,13 +310,38 @@ class PersistentDatabase:
                     role TEXT NOT NULL,
                     status TEXT NOT NULL,  -- queued, skipped, submitted, failed, retried
                     skip_reason TEXT,
+                    reason_code INTEGER NOT NULL DEFAULT 0,  -- core.reason_codes.ReasonCode
                     receipt_id TEXT,
                     timestamp REAL NOT NULL,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    epoch INTEGER NOT NULL DEFAULT 0,  -- users.history_epoch when recorded
                     FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE,
                     FOREIGN KEY (run_id) REFERENCES autopilot_runs (id) ON DELETE CASCADE
                 );
                 
+                -- Per-user job state (one row per user/job, folded from application history)
+                CREATE TABLE IF NOT EXISTS user_job_states (
+                    user_id INTEGER NOT NULL,
+                    job_id TEXT NOT NULL,
+                    state INTEGER NOT NULL,  -- JOB_STATE_* value
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    epoch INTEGER NOT NULL DEFAULT 0,  -- users.history_epoch the state belongs to
+                    PRIMARY KEY (user_id, job_id),
+                    FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+                );
+                
+                -- Login sessions (tokens are stored as SHA-256 hashes only)
+                CREATE TABLE IF NOT EXISTS user_sessions (
+                    token_hash TEXT PRIMARY KEY,
+                    user_id INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_seen_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+                );
+                CREATE INDEX IF NOT EXISTS idx_user_sessions_user ON user_sessions (user_id);
+                CREATE INDEX IF NOT EXISTS idx_user_sessions_expires ON user_sessions (expires_at);
+                
                 -- Artifact workflow tables (NEW - for approval workflow)
                 CREATE TABLE IF NOT EXISTS draft_artifacts (
                     id TEXT PRIMARY KEY,  -- UUID
@@ -189,7 +373,9 @@ class PersistentDatabase:
                 CREATE INDEX IF NOT EXISTS idx_jobs_job_id ON job_listings (job_id);
                 CREATE INDEX IF NOT EXISTS idx_jobs_company ON job_listings (company);
                 CREATE INDEX IF NOT EXISTS idx_jobs_active ON job_listings (is_active);
+                CREATE INDEX IF NOT EXISTS idx_job_skills_skill_id ON job_skills (skill_id, job_id);
                 CREATE INDEX IF NOT EXISTS idx_runs_user_id ON autopilot_runs (user_id);
+                CREATE INDEX IF NOT EXISTS idx_runs_user_started ON autopilot_runs (user_id, started_at, id);
                 CREATE INDEX IF NOT EXISTS idx_history_user_id ON application_history (user_id);
                 CREATE INDEX IF NOT EXISTS idx_history_job_id ON application_history (job_id);
                 CREATE INDEX IF NOT EXISTS idx_history_status ON application_history (status);
@@ -197,6 +383,358 @@ class PersistentDatabase:
                 CREATE INDEX IF NOT EXISTS idx_artifact_snapshots_user_id ON artifact_snapshots (user_id);
                 CREATE INDEX IF NOT EXISTS idx_artifact_snapshots_approved_at ON artifact_snapshots (approved_at);
             """)
+            self._ensure_column(conn, "user_profiles", "version", "INTEGER NOT NULL DEFAULT 0")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_profiles_user_version ON user_profiles (user_id, version)")
+            self._ensure_column(conn, "job_listings", "source", "TEXT")
+            self._ensure_column(conn, "job_listings", "content_hash", "TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_source ON job_listings (source, is_active)")
+            self._init_history_epochs(conn)
+            self._init_reason_codes(conn)
+            self._backfill_user_job_states(conn)
+            self._backfill_job_skills(conn)
+            self._init_job_search(conn)
+            self._init_application_stats(conn)
+            self._init_application_rollups(conn)
+            self._init_blob_store(conn)
+            for table in ARCHIVED_TABLES:
+                for archive in self._archive_tables(conn.cursor(), table):
+                    self._prepare_archive_table(conn, table, archive)
+    
+    def _init_blob_store(self, conn):
+        """Create the content-addressed blob table and reference-counting triggers."""
+        conn.executescript("""
+            -- Content-addressed JSON documents (zlib compressed, shared by hash)
+            CREATE TABLE IF NOT EXISTS blobs (
+                hash TEXT PRIMARY KEY,  -- sha256 of canonical JSON
+                compressed_json BLOB NOT NULL,
+                ref_count INTEGER NOT NULL DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+            CREATE INDEX IF NOT EXISTS idx_blobs_ref_count ON blobs (ref_count);
+        """)
+        
+        for table, column in BLOB_REF_COLUMNS:
+            self._create_blob_ref_triggers(conn, table, column)
+    
+    def _create_blob_ref_triggers(self, conn, table: str, column: str):
+        """Keep blobs.ref_count in sync with the blob references stored in table.column."""
+        conn.executescript(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_{column}_blob_insert AFTER INSERT ON {table}
+            WHEN new.{column} LIKE '{BLOB_REF_PREFIX}%' BEGIN
+                UPDATE blobs SET ref_count = ref_count + 1 WHERE hash = substr(new.{column}, 6);
+            END;
+            
+            CREATE TRIGGER IF NOT EXISTS {table}_{column}_blob_delete AFTER DELETE ON {table}
+            WHEN old.{column} LIKE '{BLOB_REF_PREFIX}%' BEGIN
+                UPDATE blobs SET ref_count = ref_count - 1 WHERE hash = substr(old.{column}, 6);
+            END;
+            
+            CREATE TRIGGER IF NOT EXISTS {table}_{column}_blob_update AFTER UPDATE OF {column} ON {table} BEGIN
+                UPDATE blobs SET ref_count = ref_count - 1
+                WHERE old.{column} LIKE '{BLOB_REF_PREFIX}%' AND hash = substr(old.{column}, 6);
+                UPDATE blobs SET ref_count = ref_count + 1
+                WHERE new.{column} LIKE '{BLOB_REF_PREFIX}%' AND hash = substr(new.{column}, 6);
+            END;
+        """)
+    
+    def _store_blob(self, cursor, document: Any) -> str:
+        """
+        Store a JSON document once by content hash and return its column reference.
+        
+        The reference count is maintained by triggers on the referencing tables, so
+        the returned reference must be written in the same transaction.
+        """
+        canonical = json.dumps(document, sort_keys=True, separators=(",", ":"))
+        content_hash = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+        cursor.execute("""
+            INSERT OR IGNORE INTO blobs (hash, compressed_json) VALUES (?, ?)
+        """, (content_hash, zlib.compress(json.dumps(document).encode("utf-8"))))
+        return BLOB_REF_PREFIX + content_hash
+    
+    def _load_json_column(self, cursor, value: str) -> Any:
+        """Decode a JSON column that holds either inline JSON or a blob reference."""
+        if not value.startswith(BLOB_REF_PREFIX):
+            return json.loads(value)
+        
+        cursor.execute("SELECT compressed_json FROM blobs WHERE hash = ?", (value[len(BLOB_REF_PREFIX):],))
+        row = cursor.fetchone()
+        if not row:
+            raise RuntimeError(f"Missing blob for reference {value}")
+        return json.loads(zlib.decompress(row[0]).decode("utf-8"))
+    
+    def _init_application_rollups(self, conn):
+        """Create the hourly/daily analytics rollups fed by application history inserts."""
+        cursor = conn.cursor()
+        rollup_columns = {row[1] for row in conn.execute("PRAGMA table_info(application_rollups)")}
+        if rollup_columns and "resolution" not in rollup_columns:
+            # Older layout keyed on the free-text skip reason: rebuild in the bounded layout
+            conn.executescript("""
+                DROP TRIGGER IF EXISTS application_history_rollup_insert;
+                DROP TABLE application_rollups;
+            """)
+            rollup_columns = set()
+        
+        upserts = "\n".join(
+            f"""
+                INSERT INTO application_rollups (user_id, resolution, bucket_start, company, reason_code, status, count)
+                VALUES ({user_id}, {resolution}, CAST(new.timestamp / {resolution} AS INTEGER) * {resolution},
+                        new.company, new.reason_code, new.status, 1)
+                ON CONFLICT (user_id, resolution, bucket_start, company, reason_code, status) DO UPDATE SET count = count + 1;"""
+            for user_id in ("new.user_id", PLATFORM_ROLLUP_USER_ID)
+            for resolution in ROLLUP_RESOLUTIONS
+        )
+        conn.executescript(f"""
+            -- Hourly and daily application outcome counts (user_id 0 = platform-wide aggregate).
+            -- Keyed on the reason code, never the reason text (which embeds per-job scores and
+            -- skills), so the row count follows companies x reason codes, not history volume.
+            -- Append-only: deleting or clearing history (UI only) does not rewrite analytics.
+            CREATE TABLE IF NOT EXISTS application_rollups (
+                user_id INTEGER NOT NULL,
+                resolution INTEGER NOT NULL,  -- Bucket length in seconds: 3600 (hourly) or 86400 (daily)
+                bucket_start INTEGER NOT NULL,  -- UTC bucket start (unix seconds)
+                company TEXT NOT NULL,
+                reason_code INTEGER NOT NULL,  -- core.reason_codes.ReasonCode
+                status TEXT NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (user_id, resolution, bucket_start, company, reason_code, status)
+            );
+            
+            CREATE TRIGGER IF NOT EXISTS application_history_rollup_insert AFTER INSERT ON application_history BEGIN
+                {upserts}
+            END;
+        """)
+        
+        if not rollup_columns:
+            self._rebuild_application_rollups(conn, 0.0)
+    
+    def _rebuild_application_rollups(self, conn, since_timestamp: float):
+        """Recompute rollup buckets from since_timestamp (rounded down per resolution) onwards, all epochs included."""
+        cursor = conn.cursor()
+        history = " UNION ALL ".join(
+            f"SELECT user_id, timestamp, company, reason_code, status FROM {table}"
+            for table in ["application_history", *self._archive_tables(cursor, "application_history")]
+        )
+        written = 0
+        for resolution in ROLLUP_RESOLUTIONS:
+            bucket_start = int(since_timestamp // resolution) * resolution
+            cursor.execute("DELETE FROM application_rollups WHERE resolution = ? AND bucket_start >= ?",
+                           (resolution, bucket_start))
+            for user_expression, group_user in (("h.user_id", "h.user_id, "), ("?", "")):
+                user_params = () if group_user else (PLATFORM_ROLLUP_USER_ID,)
+                cursor.execute(f"""
+                    INSERT INTO application_rollups (user_id, resolution, bucket_start, company, reason_code, status, count)
+                    SELECT {user_expression}, {resolution}, CAST(h.timestamp / {resolution} AS INTEGER) * {resolution} AS bucket,
+                           h.company, h.reason_code, h.status, COUNT(*)
+                    FROM ({history}) h
+                    WHERE h.timestamp >= ?
+                    GROUP BY {group_user}bucket, h.company, h.reason_code, h.status
+                """, (*user_params, bucket_start))
+            cursor.execute("SELECT COUNT(*) FROM application_rollups WHERE resolution = ? AND bucket_start >= ?",
+                           (resolution, bucket_start))
+            written += cursor.fetchone()[0]
+        return written
+    
+    def _init_application_stats(self, conn):
+        """Create the per-user stats rollup and the triggers keeping it in sync with history."""
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'user_app_stats'")
+        rollup_exists = cursor.fetchone() is not None
+        
+        conn.executescript("""
+            -- Per-user application counts by status (one row per user)
+            CREATE TABLE IF NOT EXISTS user_app_stats (
+                user_id INTEGER PRIMARY KEY,
+                queued INTEGER NOT NULL DEFAULT 0,
+                skipped INTEGER NOT NULL DEFAULT 0,
+                submitted INTEGER NOT NULL DEFAULT 0,
+                failed INTEGER NOT NULL DEFAULT 0,
+                retried INTEGER NOT NULL DEFAULT 0
+            );
+        """)
+        self._create_history_stats_triggers(conn, "application_history")
+        
+        if not rollup_exists:
+            # Roll up history stored before the stats table existed
+            conn.execute("""
+                INSERT INTO user_app_stats (user_id, queued, skipped, submitted, failed, retried)
+                SELECT h.user_id,
+                       SUM(h.status = 'queued'), SUM(h.status = 'skipped'), SUM(h.status = 'submitted'),
+                       SUM(h.status = 'failed'), SUM(h.status = 'retried')
+                FROM application_history h
+                JOIN users u ON u.id = h.user_id AND h.epoch = u.history_epoch
+                GROUP BY h.user_id
+            """)
+    
+    def _create_history_stats_triggers(self, conn, table: str):
+        """
+        Keep user_app_stats in sync with the current-epoch rows of a history table (hot or archive).
+        
+        Rows from earlier epochs were zeroed out of the stats on reset, so purging them is a no-op here.
+        """
+        conn.executescript(f"""
+            -- Recreated on startup so databases from older versions pick up the epoch condition
+            DROP TRIGGER IF EXISTS {table}_stats_insert;
+            DROP TRIGGER IF EXISTS {table}_stats_delete;
+            
+            CREATE TRIGGER {table}_stats_insert AFTER INSERT ON {table}
+            WHEN new.epoch = (SELECT history_epoch FROM users WHERE id = new.user_id) BEGIN
+                INSERT OR IGNORE INTO user_app_stats (user_id) VALUES (new.user_id);
+                UPDATE user_app_stats SET
+                    queued = queued + (new.status = 'queued'),
+                    skipped = skipped + (new.status = 'skipped'),
+                    submitted = submitted + (new.status = 'submitted'),
+                    failed = failed + (new.status = 'failed'),
+                    retried = retried + (new.status = 'retried')
+                WHERE user_id = new.user_id;
+            END;
+            
+            CREATE TRIGGER {table}_stats_delete AFTER DELETE ON {table}
+            WHEN old.epoch = (SELECT history_epoch FROM users WHERE id = old.user_id) BEGIN
+                UPDATE user_app_stats SET
+                    queued = queued - (old.status = 'queued'),
+                    skipped = skipped - (old.status = 'skipped'),
+                    submitted = submitted - (old.status = 'submitted'),
+                    failed = failed - (old.status = 'failed'),
+                    retried = retried - (old.status = 'retried')
+                WHERE user_id = old.user_id;
+            END;
+        """)
+    
+    def _init_job_search(self, conn):
+        """Create the FTS5 index over job listings and the triggers keeping it in sync."""
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'job_listings_fts'")
+        index_exists = cursor.fetchone() is not None
+        
+        conn.executescript("""
+            -- Full-text index over job listings (external content, rowid = job_listings.id)
+            CREATE VIRTUAL TABLE IF NOT EXISTS job_listings_fts USING fts5(
+                role, company, description, required_skills,
+                content='job_listings', content_rowid='id'
+            );
+            
+            CREATE TRIGGER IF NOT EXISTS job_listings_fts_insert AFTER INSERT ON job_listings BEGIN
+                INSERT INTO job_listings_fts (rowid, role, company, description, required_skills)
+                VALUES (new.id, new.role, new.company, new.description, new.required_skills);
+            END;
+            
+            CREATE TRIGGER IF NOT EXISTS job_listings_fts_delete AFTER DELETE ON job_listings BEGIN
+                INSERT INTO job_listings_fts (job_listings_fts, rowid, role, company, description, required_skills)
+                VALUES ('delete', old.id, old.role, old.company, old.description, old.required_skills);
+            END;
+            
+            CREATE TRIGGER IF NOT EXISTS job_listings_fts_update AFTER UPDATE ON job_listings BEGIN
+                INSERT INTO job_listings_fts (job_listings_fts, rowid, role, company, description, required_skills)
+                VALUES ('delete', old.id, old.role, old.company, old.description, old.required_skills);
+                INSERT INTO job_listings_fts (rowid, role, company, description, required_skills)
+                VALUES (new.id, new.role, new.company, new.description, new.required_skills);
+            END;
+        """)
+        
+        if not index_exists:
+            # Index listings stored before the search table existed
+            conn.execute("INSERT INTO job_listings_fts (job_listings_fts) VALUES ('rebuild')")
+    
+    def _ensure_column(self, conn, table: str, column: str, definition: str):
+        """Add a column to an existing table (databases created by older versions)."""
+        existing_columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if column not in existing_columns:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    
+    def _init_history_epochs(self, conn):
+        """Add the history epoch columns and the epoch-leading indexes every history read uses."""
+        self._ensure_column(conn, "users", "history_epoch", "INTEGER NOT NULL DEFAULT 0")
+        self._ensure_column(conn, "application_history", "epoch", "INTEGER NOT NULL DEFAULT 0")
+        self._ensure_column(conn, "user_job_states", "epoch", "INTEGER NOT NULL DEFAULT 0")
+        conn.executescript("""
+            DROP INDEX IF EXISTS idx_history_user_time;
+            DROP INDEX IF EXISTS idx_history_user_status_time;
+            DROP INDEX IF EXISTS idx_job_states_user_state;
+            CREATE INDEX IF NOT EXISTS idx_history_user_epoch_time ON application_history (user_id, epoch, timestamp, id);
+            CREATE INDEX IF NOT EXISTS idx_history_user_epoch_status_time ON application_history (user_id, epoch, status, timestamp, id);
+            CREATE INDEX IF NOT EXISTS idx_job_states_user_epoch_state ON user_job_states (user_id, epoch, state);
+        """)
+    
+    def _init_reason_codes(self, conn):
+        """Add application_history.reason_code, classifying reasons stored before the column existed."""
+        cursor = conn.cursor()
+        for table in ["application_history", *self._archive_tables(cursor, "application_history")]:
+            existing_columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+            if "reason_code" in existing_columns:
+                continue
+            
+            self._ensure_column(conn, table, "reason_code", "INTEGER NOT NULL DEFAULT 0")
+            cursor.execute(f"""
+                SELECT id, status, skip_reason FROM {table}
+                WHERE status IN ('skipped', 'failed') AND skip_reason IS NOT NULL
+            """)
+            cursor.executemany(
+                f"UPDATE {table} SET reason_code = ? WHERE id = ?",
+                [(int(classify_legacy_reason(reason)), row_id) for row_id, status, reason in cursor.fetchall()]
+            )
+        
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_history_user_epoch_reason_time
+            ON application_history (user_id, epoch, reason_code, timestamp, id)
+        """)
+    
+    def _backfill_user_job_states(self, conn):
+        """Populate user_job_states from existing history (databases created before the table existed)."""
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1 FROM user_job_states LIMIT 1")
+        if cursor.fetchone():
+            return
+        
+        cursor.execute("""
+            SELECT h.user_id, h.job_id, h.status, h.reason_code, h.epoch
+            FROM application_history h
+            JOIN users u ON u.id = h.user_id AND h.epoch = u.history_epoch
+        """)
+        for user_id, job_id, status, reason_code, epoch in cursor.fetchall():
+            self._record_job_state(cursor, user_id, job_id, job_state_for_application(status, reason_code), epoch)
+    
+    def _backfill_job_skills(self, conn):
+        """Populate job_skills from the required_skills JSON column (databases created before the table existed)."""
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1 FROM job_skills LIMIT 1")
+        if cursor.fetchone():
+            return
+        
+        cursor.execute("SELECT job_id, required_skills FROM job_listings")
+        for job_id, required_skills in cursor.fetchall():
+            self._set_job_skills(cursor, job_id, json.loads(required_skills))
+    
+    def _set_job_skills(self, cursor, job_id: str, required_skills: List[str]):
+        """Replace the normalized skill rows for a job."""
+        skill_names = sorted({normalize_skill(skill) for skill in required_skills if skill and skill.strip()})
+        
+        cursor.execute("DELETE FROM job_skills WHERE job_id = ?", (job_id,))
+        if not skill_names:
+            return
+        
+        cursor.executemany("INSERT OR IGNORE INTO skills (name) VALUES (?)", [(name,) for name in skill_names])
+        placeholders = ",".join("?" * len(skill_names))
+        cursor.execute(f"""
+            INSERT OR IGNORE INTO job_skills (job_id, skill_id)
+            SELECT ?, id FROM skills WHERE name IN ({placeholders})
+        """, [job_id, *skill_names])
+    
+    def _record_job_state(self, cursor, user_id: int, job_id: str, state: int, epoch: int):
+        """Fold a new outcome into user_job_states, keeping the strongest state of the epoch."""
+        cursor.execute("""
+            INSERT INTO user_job_states (user_id, job_id, state, epoch)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (user_id, job_id) DO UPDATE SET
+                state = CASE WHEN epoch = excluded.epoch THEN MAX(state, excluded.state) ELSE excluded.state END,
+                epoch = excluded.epoch,
+                updated_at = CURRENT_TIMESTAMP
+        """, (user_id, job_id, state, epoch))
+    
+    def _current_history_epoch(self, cursor, user_id: int) -> int:
+        """Get the user's current history epoch (0 for unknown users)."""
+        cursor.execute("SELECT history_epoch FROM users WHERE id = ?", (user_id,))
+        row = cursor.fetchone()
+        return row[0] if row else 0
     
     # ==================== USER MANAGEMENT ====================
     
@@ -239,6 +777,77 @@ class PersistentDatabase:
                 UPDATE users SET last_login = CURRENT_TIMESTAMP WHERE id = ?
             """, (user_id,))
     
+    # ==================== SESSIONS ====================
+    
+    def create_session(self, token_hash: str, user_id: int, created_at: float, expires_at: float):
+        """Persist a new login session (written immediately so every worker can see it)."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO user_sessions (token_hash, user_id, created_at, last_seen_at, expires_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, (token_hash, user_id, created_at, created_at, expires_at))
+    
+    def get_session(self, token_hash: str) -> Optional[Dict[str, Any]]:
+        """Get a session by token hash; sessions of deactivated users are not returned."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT s.user_id, s.created_at, s.last_seen_at, s.expires_at
+                FROM user_sessions s
+                JOIN users u ON u.id = s.user_id
+                WHERE s.token_hash = ? AND u.is_active = TRUE
+            """, (token_hash,))
+            row = cursor.fetchone()
+            
+            if row:
+                return {
+                    "user_id": row[0],
+                    "created_at": row[1],
+                    "last_seen_at": row[2],
+                    "expires_at": row[3]
+                }
+            return None
+    
+    def delete_session(self, token_hash: str) -> bool:
+        """Delete a session. Returns True if it existed."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM user_sessions WHERE token_hash = ?", (token_hash,))
+            return cursor.rowcount > 0
+    
+    def record_session_activity(self, last_logins: Dict[int, float], touches: Dict[str, float],
+                                session_ttl: float):
+        """
+        Apply buffered login and session activity in one transaction.
+        
+        last_logins maps user_id -> login time and touches maps token_hash -> last
+        request time (both unix seconds). Touches slide the session expiry forward.
+        Older values never overwrite newer ones, so flushes from several workers can
+        interleave in any order.
+        """
+        if not last_logins and not touches:
+            return
+        
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany("""
+                UPDATE users SET last_login = datetime(?, 'unixepoch')
+                WHERE id = ? AND (last_login IS NULL OR last_login < datetime(?, 'unixepoch'))
+            """, [(logged_in_at, user_id, logged_in_at) for user_id, logged_in_at in last_logins.items()])
+            cursor.executemany("""
+                UPDATE user_sessions SET last_seen_at = ?, expires_at = ?
+                WHERE token_hash = ? AND last_seen_at < ?
+            """, [(seen_at, seen_at + session_ttl, token_hash, seen_at) for token_hash, seen_at in touches.items()])
+    
+    def delete_expired_sessions(self, now: Optional[float] = None) -> int:
+        """Delete sessions past their expiry. Returns the number removed."""
+        now = datetime.now().timestamp() if now is None else now
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM user_sessions WHERE expires_at <= ?", (now,))
+            return cursor.rowcount
+    
     # ==================== USER PROFILES (SINGLE SOURCE OF TRUTH) ====================
     
     def create_user_profile(self, user_id: int, student_id: str, profile_data: Dict[str, Any], 
@@ -252,30 +861,59 @@ class PersistentDatabase:
             cursor.execute("""
                 INSERT INTO user_profiles (user_id, student_id, profile_data, resume_hash, resume_text)
                 VALUES (?, ?, ?, ?, ?)
-            """, (user_id, student_id, json.dumps(profile_data), resume_hash, resume_text))
-            return cursor.lastrowid
+            """, (user_id, student_id, encode_json_column(profile_data), resume_hash, encode_text_column(resume_text)))
+            profile_id = cursor.lastrowid
+        
+        self.profile_cache.invalidate(user_id)
+        return profile_id
     
-    def get_user_profile(self, user_id: int) -> Optional[Dict[str, Any]]:
-        """Get user profile by user ID."""
+    def get_user_profile(self, user_id: int, include_resume_text: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Get user profile by user ID.
+        
+        resume_text is only read (and decompressed) when include_resume_text is set;
+        otherwise it is returned as None.
+        
+        Profiles without resume_text are served from the in-process cache when the
+        cached version still matches user_profiles.version. The returned
+        profile_data may be shared with the cache and must not be mutated.
+        """
+        resume_text_column = "resume_text" if include_resume_text else "NULL"
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT id, student_id, profile_data, resume_hash, resume_text, created_at, updated_at
+            
+            if not include_resume_text:
+                cached = self.profile_cache.get(user_id)
+                if cached is not None:
+                    cursor.execute("SELECT version FROM user_profiles WHERE user_id = ?", (user_id,))
+                    row = cursor.fetchone()
+                    if row and row[0] == cached[0]:
+                        return dict(cached[1])
+                    self.profile_cache.invalidate(user_id)
+            
+            cursor.execute(f"""
+                SELECT id, student_id, profile_data, resume_hash, created_at, updated_at, version, {resume_text_column}
                 FROM user_profiles WHERE user_id = ?
             """, (user_id,))
             row = cursor.fetchone()
             
             if row:
-                return {
+                profile_json = decode_text_column(row[2])
+                profile = {
                     "id": row[0],
                     "user_id": user_id,
                     "student_id": row[1],
-                    "profile_data": json.loads(row[2]),
+                    "profile_data": json.loads(profile_json),
                     "resume_hash": row[3],
-                    "resume_text": row[4],
-                    "created_at": row[5],
-                    "updated_at": row[6]
+                    "resume_text": decode_text_column(row[7]),
+                    "created_at": row[4],
+                    "updated_at": row[5],
+                    "version": row[6]
                 }
+                if not include_resume_text:
+                    self.profile_cache.put(user_id, row[6], profile, len(profile_json))
+                    return dict(profile)
+                return profile
             return None
     
     def update_user_profile(self, user_id: int, profile_data: Dict[str, Any]) -> bool:
@@ -287,14 +925,61 @@ class PersistentDatabase:
             cursor = conn.cursor()
             cursor.execute("""
                 UPDATE user_profiles 
-                SET profile_data = ?, updated_at = CURRENT_TIMESTAMP
+                SET profile_data = ?, updated_at = CURRENT_TIMESTAMP, version = version + 1
                 WHERE user_id = ?
-            """, (json.dumps(profile_data), user_id))
+            """, (encode_json_column(profile_data), user_id))
             
             if cursor.rowcount == 0:
                 raise RuntimeError(f"Profile update failed: no profile found for user_id {user_id}")
+        
+        self.profile_cache.invalidate(user_id)
+        return True
+    
+    def patch_user_profile(self, user_id: int, operations: List[Dict[str, Any]],
+                           expected_version: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Apply an RFC 6902 JSON Patch to a user's profile_data.
+        
+        Only profile_data is rewritten, and only when the patch changes something.
+        Pass expected_version (from a previous read) to reject patches based on a
+        stale profile. Returns {"version", "changed_fields", "profile_data"}.
+        
+        Raises JsonPatchError for bad patches, ValueError if the result fails
+        validation and ProfileVersionConflict if the profile changed concurrently.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT profile_data, version FROM user_profiles WHERE user_id = ?
+            """, (user_id,))
+            row = cursor.fetchone()
+            if not row:
+                raise RuntimeError(f"Profile patch failed: no profile found for user_id {user_id}")
             
-            return True
+            current = decode_json_column(row[0])
+            version = row[1]
+            if expected_version is not None and expected_version != version:
+                raise ProfileVersionConflict(f"Profile is at version {version}, patch expects {expected_version}")
+            
+            patched = apply_json_patch(current, operations)
+            fields = changed_fields(current, patched)
+            if not fields:
+                return {"version": version, "changed_fields": [], "profile_data": current}
+            
+            patched["last_modified"] = datetime.utcnow().isoformat()
+            self.validate_user_profile(patched)
+            
+            # Conditional on the version read above, so concurrent writers cannot be lost
+            cursor.execute("""
+                UPDATE user_profiles 
+                SET profile_data = ?, updated_at = CURRENT_TIMESTAMP, version = version + 1
+                WHERE user_id = ? AND version = ?
+            """, (encode_json_column(patched), user_id, version))
+            if cursor.rowcount == 0:
+                raise ProfileVersionConflict(f"Profile changed while applying patch (version {version})")
+        
+        self.profile_cache.invalidate(user_id)
+        return {"version": version + 1, "changed_fields": sorted(fields), "profile_data": patched}
     
     def get_profile_by_student_id(self, student_id: str) -> Optional[Dict[str, Any]]:
         """Get profile by student ID."""
@@ -310,9 +995,9 @@ class PersistentDatabase:
                 return {
                     "user_id": row[0],
                     "student_id": student_id,
-                    "profile_data": json.loads(row[1]),
+                    "profile_data": decode_json_column(row[1]),
                     "resume_hash": row[2],
-                    "resume_text": row[3],
+                    "resume_text": decode_text_column(row[3]),
                     "created_at": row[4],
                     "updated_at": row[5]
                 }
@@ -320,6 +1005,24 @@ class PersistentDatabase:
     
     # ==================== JOB LISTINGS ====================
     
+    def _job_listing_row(self, job_data: Dict[str, Any]) -> tuple:
+        """Column values for a job_listings write (insert column order)."""
+        row = (
+            job_data["job_id"],
+            job_data["company"],
+            job_data["role"],
+            job_data["location"],
+            json.dumps(job_data["required_skills"]),
+            job_data["min_experience_years"],
+            job_data.get("description"),
+            job_data.get("salary_range"),
+            job_data.get("job_type", "full-time"),
+            job_data.get("posted_date"),
+            job_data.get("expires_date")
+        )
+        content_hash = hashlib.sha256(json.dumps(row).encode("utf-8")).hexdigest()
+        return row + (job_data.get("source"), content_hash)
+    
     def add_job_listing(self, job_data: Dict[str, Any]) -> int:
         """Add a new job listing."""
         with self.get_connection() as conn:
@@ -327,22 +1030,88 @@ class PersistentDatabase:
             cursor.execute("""
                 INSERT OR REPLACE INTO job_listings 
                 (job_id, company, role, location, required_skills, min_experience_years, 
-                 description, salary_range, job_type, posted_date, expires_date)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                job_data["job_id"],
-                job_data["company"],
-                job_data["role"],
-                job_data["location"],
-                json.dumps(job_data["required_skills"]),
-                job_data["min_experience_years"],
-                job_data.get("description"),
-                job_data.get("salary_range"),
-                job_data.get("job_type", "full-time"),
-                job_data.get("posted_date"),
-                job_data.get("expires_date")
-            ))
-            return cursor.lastrowid
+                 description, salary_range, job_type, posted_date, expires_date, source, content_hash)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, self._job_listing_row(job_data))
+            listing_id = cursor.lastrowid
+            self._set_job_skills(cursor, job_data["job_id"], job_data["required_skills"])
+            return listing_id
+    
+    def sync_job_listings(self, jobs: Iterable[Dict[str, Any]], source: str) -> Dict[str, int]:
+        """
+        Bulk sync listings from a portal in a single transaction.
+        
+        jobs may be any iterable (e.g. a streamed portal listing); it is consumed
+        once, before the transaction starts.
+        
+        Content hashes are diffed against stored hashes so only new or changed
+        listings are written. Active listings from the same source that are
+        missing from the feed are deactivated.
+        
+        Returns counts of added, changed, removed and unchanged listings.
+        """
+        rows = {}
+        for job_data in jobs:
+            rows[job_data["job_id"]] = self._job_listing_row({**job_data, "source": source})
+        
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT job_id, content_hash, is_active, source FROM job_listings")
+            stored = {job_id: (content_hash, bool(is_active), job_source)
+                      for job_id, content_hash, is_active, job_source in cursor.fetchall()}
+            
+            added, changed = [], []
+            for job_id, row in rows.items():
+                if job_id not in stored:
+                    added.append(row)
+                elif stored[job_id][0] != row[-1] or not stored[job_id][1]:
+                    changed.append(row)
+            removed = [(job_id,) for job_id, (_, is_active, job_source) in stored.items()
+                       if is_active and job_source == source and job_id not in rows]
+            
+            upserts = added + changed
+            cursor.executemany("""
+                INSERT INTO job_listings 
+                (job_id, company, role, location, required_skills, min_experience_years, 
+                 description, salary_range, job_type, posted_date, expires_date, source, content_hash)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (job_id) DO UPDATE SET
+                    company = excluded.company,
+                    role = excluded.role,
+                    location = excluded.location,
+                    required_skills = excluded.required_skills,
+                    min_experience_years = excluded.min_experience_years,
+                    description = excluded.description,
+                    salary_range = excluded.salary_range,
+                    job_type = excluded.job_type,
+                    posted_date = excluded.posted_date,
+                    expires_date = excluded.expires_date,
+                    source = excluded.source,
+                    content_hash = excluded.content_hash,
+                    is_active = TRUE
+            """, upserts)
+            cursor.executemany("UPDATE job_listings SET is_active = FALSE WHERE job_id = ?", removed)
+            
+            # Refresh normalized skills for written listings only
+            job_skill_rows = set()
+            for row in upserts:
+                for skill in json.loads(row[4]):
+                    if skill and skill.strip():
+                        job_skill_rows.add((row[0], normalize_skill(skill)))
+            cursor.executemany("DELETE FROM job_skills WHERE job_id = ?", [(row[0],) for row in upserts])
+            cursor.executemany("INSERT OR IGNORE INTO skills (name) VALUES (?)",
+                               {(name,) for _, name in job_skill_rows})
+            cursor.executemany("""
+                INSERT OR IGNORE INTO job_skills (job_id, skill_id)
+                SELECT ?, id FROM skills WHERE name = ?
+            """, sorted(job_skill_rows))
+            
+            return {
+                "added": len(added),
+                "changed": len(changed),
+                "removed": len(removed),
+                "unchanged": len(rows) - len(upserts)
+            }
     
     def get_active_job_listings(self, limit: int = 100) -> List[Dict[str, Any]]:
         """Get active job listings."""
@@ -375,6 +1144,107 @@ class PersistentDatabase:
                 })
             return jobs
     
+    def find_jobs_matching_skills(self, skills: List[str], limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Get active job listings requiring any of the given skills.
+        
+        Overlap is counted inside SQLite through the job_skills index, so only
+        candidate jobs are loaded. Results are ordered by overlap count (highest
+        first) and include it as "skill_overlap".
+        """
+        skill_names = sorted({normalize_skill(skill) for skill in skills if skill and skill.strip()})
+        if not skill_names:
+            return []
+        
+        placeholders = ",".join("?" * len(skill_names))
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT jl.job_id, jl.company, jl.role, jl.location, jl.required_skills, jl.min_experience_years,
+                       jl.description, jl.salary_range, jl.job_type, jl.posted_date, jl.expires_date, jl.created_at,
+                       matches.overlap
+                FROM (
+                    SELECT js.job_id, COUNT(*) AS overlap
+                    FROM skills s
+                    JOIN job_skills js ON js.skill_id = s.id
+                    WHERE s.name IN ({placeholders})
+                    GROUP BY js.job_id
+                ) AS matches
+                JOIN job_listings jl ON jl.job_id = matches.job_id
+                WHERE jl.is_active = TRUE
+                ORDER BY matches.overlap DESC, jl.created_at DESC
+                LIMIT ?
+            """, [*skill_names, limit])
+            
+            jobs = []
+            for row in cursor.fetchall():
+                jobs.append({
+                    "job_id": row[0],
+                    "company": row[1],
+                    "role": row[2],
+                    "location": row[3],
+                    "required_skills": json.loads(row[4]),
+                    "min_experience_years": row[5],
+                    "description": row[6],
+                    "salary_range": row[7],
+                    "job_type": row[8],
+                    "posted_date": row[9],
+                    "expires_date": row[10],
+                    "created_at": row[11],
+                    "skill_overlap": row[12]
+                })
+            return jobs
+    
+    def search_job_listings(self, query: str, limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+        """
+        Full-text search over active job listings (role, company, description, skills).
+        
+        Every word in the query must match (prefix match). Results are ordered by
+        BM25 relevance with role and skill hits weighted above description hits.
+        """
+        terms = re.findall(r"\w+", query.lower())
+        if not terms:
+            return {"jobs": [], "total_count": 0}
+        match_expression = " ".join(f'"{term}"*' for term in terms)
+        
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT COUNT(*)
+                FROM job_listings_fts
+                JOIN job_listings jl ON jl.id = job_listings_fts.rowid
+                WHERE job_listings_fts MATCH ? AND jl.is_active = TRUE
+            """, (match_expression,))
+            total_count = cursor.fetchone()[0]
+            
+            cursor.execute("""
+                SELECT jl.job_id, jl.company, jl.role, jl.location, jl.required_skills, jl.min_experience_years,
+                       jl.description, jl.salary_range, jl.job_type, jl.posted_date, jl.expires_date, jl.created_at
+                FROM job_listings_fts
+                JOIN job_listings jl ON jl.id = job_listings_fts.rowid
+                WHERE job_listings_fts MATCH ? AND jl.is_active = TRUE
+                ORDER BY bm25(job_listings_fts, 10.0, 5.0, 1.0, 3.0)
+                LIMIT ? OFFSET ?
+            """, (match_expression, limit, offset))
+            
+            jobs = []
+            for row in cursor.fetchall():
+                jobs.append({
+                    "job_id": row[0],
+                    "company": row[1],
+                    "role": row[2],
+                    "location": row[3],
+                    "required_skills": json.loads(row[4]),
+                    "min_experience_years": row[5],
+                    "description": row[6],
+                    "salary_range": row[7],
+                    "job_type": row[8],
+                    "posted_date": row[9],
+                    "expires_date": row[10],
+                    "created_at": row[11]
+                })
+            return {"jobs": jobs, "total_count": total_count}
+    
     def get_job_by_id(self, job_id: str) -> Optional[Dict[str, Any]]:
         """Get job listing by ID."""
         with self.get_connection() as conn:
@@ -411,7 +1281,7 @@ class PersistentDatabase:
             cursor.execute("""
                 INSERT INTO autopilot_runs (user_id, job_ids, status, profile_snapshot)
                 VALUES (?, ?, 'running', '{}')
-            """, (user_id, json.dumps(job_ids)))
+            """, (user_id, encode_json_column(job_ids)))
             return cursor.lastrowid
     
     def create_autopilot_run_with_profile(self, user_id: int, profile_snapshot: Dict[str, Any], job_ids: List[str]) -> int:
@@ -424,7 +1294,7 @@ class PersistentDatabase:
             cursor.execute("""
                 INSERT INTO autopilot_runs (user_id, profile_snapshot, job_ids, status)
                 VALUES (?, ?, ?, 'running')
-            """, (user_id, json.dumps(profile_snapshot), json.dumps(job_ids)))
+            """, (user_id, self._store_blob(cursor, profile_snapshot), encode_json_column(job_ids)))
             return cursor.lastrowid
     
     def update_autopilot_run_success(self, run_id: int, summary_data: Dict[str, Any]):
@@ -435,7 +1305,7 @@ class PersistentDatabase:
                 UPDATE autopilot_runs 
                 SET status = 'completed', summary_data = ?, completed_at = CURRENT_TIMESTAMP
                 WHERE id = ?
-            """, (json.dumps(summary_data), run_id))
+            """, (encode_json_column(summary_data), run_id))
     
     def update_autopilot_run_error(self, run_id: int, error_message: str):
         """Mark autopilot run as failed."""
@@ -445,7 +1315,7 @@ class PersistentDatabase:
                 UPDATE autopilot_runs 
                 SET status = 'failed', summary_data = ?, completed_at = CURRENT_TIMESTAMP
                 WHERE id = ?
-            """, (json.dumps({"error": error_message}), run_id))
+            """, (encode_json_column({"error": error_message}), run_id))
     
     def complete_autopilot_run(self, run_id: int, summary_data: Dict[str, Any], log_path: str):
         """Mark autopilot run as completed."""
@@ -455,7 +1325,7 @@ class PersistentDatabase:
                 UPDATE autopilot_runs 
                 SET status = 'completed', summary_data = ?, log_path = ?, completed_at = CURRENT_TIMESTAMP
                 WHERE id = ?
-            """, (json.dumps(summary_data), log_path, run_id))
+            """, (encode_json_column(summary_data), log_path, run_id))
     
     def fail_autopilot_run(self, run_id: int, error_message: str):
         """Mark autopilot run as failed."""
@@ -465,39 +1335,85 @@ class PersistentDatabase:
                 UPDATE autopilot_runs 
                 SET status = 'failed', summary_data = ?, completed_at = CURRENT_TIMESTAMP
                 WHERE id = ?
-            """, (json.dumps({"error": error_message}), run_id))
+            """, (encode_json_column({"error": error_message}), run_id))
     
-    def get_user_autopilot_runs(self, user_id: int, limit: int = 20) -> List[Dict[str, Any]]:
-        """Get autopilot runs for a user."""
+    def get_user_autopilot_runs(self, user_id: int, limit: int = 20,
+                                before: Optional[Tuple[str, int]] = None,
+                                include_archived: bool = False) -> List[Dict[str, Any]]:
+        """
+        Get autopilot runs for a user, newest first.
+        
+        Pass the (started_at, id) of the last run on the previous page as `before`
+        to get the next page (keyset pagination - every page costs the same).
+        Runs past the retention horizon are only returned with include_archived=True.
+        """
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT id, job_ids, status, summary_data, log_path, started_at, completed_at
-                FROM autopilot_runs 
-                WHERE user_id = ?
-                ORDER BY started_at DESC
-                LIMIT ?
-            """, (user_id, limit))
+            
+            conditions = "user_id = ?"
+            params = [user_id]
+            
+            if before:
+                conditions += " AND (started_at, id) < (?, ?)"
+                params.extend(before)
+            
+            tables = ["autopilot_runs"]
+            if include_archived:
+                tables += self._archive_tables(cursor, "autopilot_runs")
+            
+            self._select_newest_first(
+                cursor, tables,
+                "id, job_ids, status, summary_data, log_path, started_at, completed_at",
+                conditions, params, ("started_at", "id"), limit
+            )
             
             runs = []
             for row in cursor.fetchall():
                 runs.append({
                     "id": row[0],
-                    "job_ids": json.loads(row[1]),
+                    "job_ids": decode_json_column(row[1]),
                     "status": row[2],
-                    "summary_data": json.loads(row[3]) if row[3] else {},
+                    "summary_data": decode_json_column(row[3]) if row[3] else {},
                     "log_path": row[4],
                     "started_at": row[5],
                     "completed_at": row[6]
                 })
             return runs
     
+    def get_autopilot_run(self, user_id: int, run_id: int) -> Optional[Dict[str, Any]]:
+        """Get a single autopilot run owned by a user (archived runs included)."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            row = None
+            for table in ["autopilot_runs", *self._archive_tables(cursor, "autopilot_runs")]:
+                cursor.execute(f"""
+                    SELECT id, job_ids, status, summary_data, log_path, started_at, completed_at
+                    FROM {table} 
+                    WHERE id = ? AND user_id = ?
+                """, (run_id, user_id))
+                row = cursor.fetchone()
+                if row:
+                    break
+            
+            if row:
+                return {
+                    "id": row[0],
+                    "job_ids": decode_json_column(row[1]),
+                    "status": row[2],
+                    "summary_data": decode_json_column(row[3]) if row[3] else {},
+                    "log_path": row[4],
+                    "started_at": row[5],
+                    "completed_at": row[6]
+                }
+            return None
+    
     # ==================== APPLICATION HISTORY (CRITICAL) ====================
     
     def save_application_history(self, user_id: int, run_id: int, applications: List[Dict[str, Any]]):
-        """Save application history from tracker."""
+        """Save application history from tracker (recorded in the user's current history epoch)."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            epoch = self._current_history_epoch(cursor, user_id)
             for app in applications:
                 # Use company and role from application data if available, otherwise lookup
                 company = app.get("company")
@@ -509,10 +1425,11 @@ class PersistentDatabase:
                     company = company or (job_details["company"] if job_details else "Unknown")
                     role = role or (job_details["role"] if job_details else "Unknown")
                 
+                reason_code = reason_code_for_application(app)
                 cursor.execute("""
                     INSERT INTO application_history 
-                    (user_id, run_id, job_id, company, role, status, skip_reason, receipt_id, timestamp)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    (user_id, run_id, job_id, company, role, status, skip_reason, reason_code, receipt_id, timestamp, epoch)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """, (
                     user_id,
                     run_id,
@@ -521,30 +1438,57 @@ class PersistentDatabase:
                     role,
                     app["status"],
                     app.get("reason"),
+                    reason_code,
                     app.get("receipt_id"),
-                    app["timestamp"]
+                    app["timestamp"],
+                    epoch
                 ))
+                self._record_job_state(
+                    cursor, user_id, app["job_id"],
+                    job_state_for_application(app["status"], reason_code),
+                    epoch
+                )
     
-    def get_user_application_history(self, user_id: int, limit: int = 100, status_filter: str = None) -> List[Dict[str, Any]]:
-        """Get application history for a user."""
+    def get_user_application_history(self, user_id: int, limit: int = 100, status_filter: str = None,
+                                     before: Optional[Tuple[float, int]] = None,
+                                     include_archived: bool = False,
+                                     reason_code: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Get application history for a user, newest first.
+        
+        Pass the (timestamp, id) of the last entry on the previous page as `before`
+        to get the next page (keyset pagination - every page costs the same).
+        Entries past the retention horizon are only returned with include_archived=True.
+        Only the current history epoch is returned (entries from before a reset are hidden).
+        reason_code filters on core.reason_codes.ReasonCode.
+        """
         with self.get_connection() as conn:
             cursor = conn.cursor()
             
-            query = """
-                SELECT id, run_id, job_id, company, role, status, skip_reason, receipt_id, timestamp, created_at
-                FROM application_history 
-                WHERE user_id = ?
-            """
-            params = [user_id]
+            conditions = "user_id = ? AND epoch = ?"
+            params = [user_id, self._current_history_epoch(cursor, user_id)]
             
             if status_filter:
-                query += " AND status = ?"
+                conditions += " AND status = ?"
                 params.append(status_filter)
             
-            query += " ORDER BY timestamp DESC LIMIT ?"
-            params.append(limit)
+            if reason_code is not None:
+                conditions += " AND reason_code = ?"
+                params.append(int(reason_code))
+            
+            if before:
+                conditions += " AND (timestamp, id) < (?, ?)"
+                params.extend(before)
+            
+            tables = ["application_history"]
+            if include_archived:
+                tables += self._archive_tables(cursor, "application_history")
             
-            cursor.execute(query, params)
+            self._select_newest_first(
+                cursor, tables,
+                "id, run_id, job_id, company, role, status, skip_reason, reason_code, receipt_id, timestamp, created_at",
+                conditions, params, ("timestamp", "id"), limit
+            )
             
             history = []
             for row in cursor.fetchall():
@@ -556,53 +1500,255 @@ class PersistentDatabase:
                     "role": row[4],
                     "status": row[5],
                     "skip_reason": row[6],
-                    "receipt_id": row[7],
-                    "timestamp": row[8],
-                    "created_at": row[9]
+                    "reason_code": row[7],
+                    "receipt_id": row[8],
+                    "timestamp": row[9],
+                    "created_at": row[10]
                 })
             return history
     
+    def get_user_job_id_sets(self, user_id: int) -> Dict[str, Set[str]]:
+        """
+        Get the job IDs a user has already processed, split by final state.
+        
+        Returns a dict with:
+        - applied: jobs submitted successfully
+        - excluded: jobs permanently skipped (never due to the daily limit)
+        - processed: every job with any history entry
+        
+        Only the current history epoch counts.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT job_id, state FROM user_job_states
+                WHERE user_id = ? AND epoch = (SELECT history_epoch FROM users WHERE id = ?)
+            """, (user_id, user_id))
+            
+            job_sets = {"applied": set(), "excluded": set(), "processed": set()}
+            for job_id, state in cursor.fetchall():
+                job_sets["processed"].add(job_id)
+                if state == JOB_STATE_APPLIED:
+                    job_sets["applied"].add(job_id)
+                elif state == JOB_STATE_EXCLUDED:
+                    job_sets["excluded"].add(job_id)
+            return job_sets
+    
+    def count_user_applications_since(self, user_id: int, since_timestamp: float) -> int:
+        """Count successful applications (submitted or retried) made since a timestamp in the current epoch."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT COUNT(*) FROM application_history
+                WHERE user_id = ? AND epoch = (SELECT history_epoch FROM users WHERE id = ?)
+                AND status IN ('submitted', 'retried') AND timestamp >= ?
+            """, (user_id, user_id, since_timestamp))
+            return cursor.fetchone()[0]
+    
     def delete_application_history_entry(self, user_id: int, history_id: int) -> bool:
         """Delete an application history entry (UI only - does NOT affect backend safety logs)."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            history_tables = ["application_history", *self._archive_tables(cursor, "application_history")]
+            
+            job_id = None
+            for table in history_tables:
+                cursor.execute(f"""
+                    SELECT job_id FROM {table} WHERE id = ? AND user_id = ?
+                """, (history_id, user_id))
+                row = cursor.fetchone()
+                if row:
+                    job_id = row[0]
+                    cursor.execute(f"""
+                        DELETE FROM {table} 
+                        WHERE id = ? AND user_id = ?
+                    """, (history_id, user_id))
+                    break
+            if job_id is None:
+                return False
+            
+            # Re-derive the job state from the current-epoch entries that remain
+            epoch = self._current_history_epoch(cursor, user_id)
             cursor.execute("""
-                DELETE FROM application_history 
-                WHERE id = ? AND user_id = ?
-            """, (history_id, user_id))
-            return cursor.rowcount > 0
+                DELETE FROM user_job_states WHERE user_id = ? AND job_id = ?
+            """, (user_id, job_id))
+            for table in history_tables:
+                cursor.execute(f"""
+                    SELECT status, reason_code FROM {table}
+                    WHERE user_id = ? AND epoch = ? AND job_id = ?
+                """, (user_id, epoch, job_id))
+                for status, reason_code in cursor.fetchall():
+                    self._record_job_state(cursor, user_id, job_id, job_state_for_application(status, reason_code), epoch)
+            return True
     
     def clear_user_application_history(self, user_id: int) -> int:
         """
         Clear all application history for a user when profile/resume is updated.
         This allows the user to reapply to jobs with their updated profile.
+        
+        Constant time: the user's history epoch is bumped so reads stop seeing the old
+        entries, which stay on disk for audit until purge_stale_history_epochs() runs.
         Returns the number of entries cleared.
         """
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
-                DELETE FROM application_history 
+                SELECT queued + skipped + submitted + failed + retried
+                FROM user_app_stats WHERE user_id = ?
+            """, (user_id,))
+            row = cursor.fetchone()
+            cleared_count = row[0] if row else 0
+            
+            cursor.execute("""
+                UPDATE users SET history_epoch = history_epoch + 1 WHERE id = ?
+            """, (user_id,))
+            cursor.execute("""
+                UPDATE user_app_stats SET queued = 0, skipped = 0, submitted = 0, failed = 0, retried = 0
                 WHERE user_id = ?
             """, (user_id,))
-            return cursor.rowcount
+            return cleared_count
+    
+    def purge_stale_history_epochs(self, batch_size: int = 5000) -> int:
+        """
+        Delete history entries and job states left behind by history resets.
+        
+        Works in batches (one transaction each) so it can run alongside request traffic.
+        Returns the number of history entries deleted.
+        """
+        purged = 0
+        while True:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                deleted = 0
+                for table in ["application_history", *self._archive_tables(cursor, "application_history")]:
+                    cursor.execute(f"""
+                        DELETE FROM {table} WHERE id IN (
+                            SELECT h.id FROM {table} h
+                            JOIN users u ON u.id = h.user_id
+                            WHERE h.epoch < u.history_epoch
+                            LIMIT ?
+                        )
+                    """, (batch_size - deleted,))
+                    deleted += cursor.rowcount
+                    if deleted >= batch_size:
+                        break
+                cursor.execute("""
+                    DELETE FROM user_job_states WHERE rowid IN (
+                        SELECT s.rowid FROM user_job_states s
+                        JOIN users u ON u.id = s.user_id
+                        WHERE s.epoch < u.history_epoch
+                        LIMIT ?
+                    )
+                """, (batch_size,))
+                states_deleted = cursor.rowcount
+            purged += deleted
+            if deleted < batch_size and states_deleted < batch_size:
+                return purged
     
     def get_application_stats(self, user_id: int) -> Dict[str, int]:
-        """Get application statistics for a user."""
+        """Get application statistics for a user (read from the user_app_stats rollup)."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
-                SELECT status, COUNT(*) as count
-                FROM application_history 
+                SELECT queued, skipped, submitted, failed, retried
+                FROM user_app_stats 
                 WHERE user_id = ?
-                GROUP BY status
             """, (user_id,))
+            row = cursor.fetchone()
             
             stats = {}
-            for row in cursor.fetchall():
-                stats[row[0]] = row[1]
+            if row:
+                for status, count in zip(("queued", "skipped", "submitted", "failed", "retried"), row):
+                    if count:
+                        stats[status] = count
             
             return stats
 
+    # ==================== ANALYTICS ROLLUPS ====================
+    
+    def rebuild_application_rollups(self, since_timestamp: float = 0.0) -> int:
+        """
+        Backfill analytics rollups from application history.
+        
+        Buckets from since_timestamp onwards are recomputed from every history row
+        still stored, archived and reset (earlier epoch) rows included, matching the
+        insert triggers, which count entries regardless of later resets. Entries
+        already removed by delete_application_history_entry or
+        purge_stale_history_epochs cannot be recounted. Returns the number of
+        rollup rows written.
+        """
+        with self.get_connection() as conn:
+            return self._rebuild_application_rollups(conn, since_timestamp)
+    
+    def prune_hourly_rollups(self, retention_days: int = DEFAULT_HOURLY_ROLLUP_RETENTION_DAYS) -> int:
+        """Delete hourly rollup buckets older than retention_days (daily buckets are kept)."""
+        cutoff = datetime.now().timestamp() - retention_days * SECONDS_PER_DAY
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM application_rollups WHERE resolution = ? AND bucket_start < ?",
+                           (SECONDS_PER_HOUR, cutoff))
+            return cursor.rowcount
+    
+    def get_application_timeseries(self, user_id: Optional[int], since_timestamp: float,
+                                   until_timestamp: float, granularity: str = "day",
+                                   group_by: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get application outcome counts per hour, day or week from the rollup table.
+        
+        Args:
+            user_id: User to report on, or None for platform-wide counts
+            since_timestamp / until_timestamp: Time range (unix seconds, until exclusive)
+            granularity: "hour", "day" or "week" (weeks start on Monday, UTC); hourly
+                buckets only cover the hourly rollup retention window
+            group_by: None, "company" or "reason_code" for a per-bucket breakdown
+        
+        Returns:
+            One dict per bucket (and group) with a count for each outcome status.
+        """
+        if granularity not in ("hour", "day", "week"):
+            raise ValueError(f"Invalid granularity '{granularity}': must be 'hour', 'day' or 'week'")
+        if group_by not in (None, "company", "reason_code"):
+            raise ValueError(f"Invalid group_by '{group_by}': must be 'company' or 'reason_code'")
+        
+        resolution = SECONDS_PER_HOUR if granularity == "hour" else SECONDS_PER_DAY
+        if granularity == "week":
+            # 1970-01-01 was a Thursday: shift by 3 days so weeks start on Monday
+            bucket_expression = "bucket_start - ((bucket_start / 86400 + 3) % 7) * 86400"
+        else:
+            bucket_expression = "bucket_start"
+        group_expression = group_by if group_by else "''"
+        
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT {bucket_expression} AS bucket, {group_expression} AS grp, status, SUM(count)
+                FROM application_rollups
+                WHERE user_id = ? AND resolution = ? AND bucket_start >= ? AND bucket_start < ?
+                GROUP BY bucket, grp, status
+                ORDER BY bucket, grp
+            """, (
+                PLATFORM_ROLLUP_USER_ID if user_id is None else user_id,
+                resolution,
+                int(since_timestamp // resolution) * resolution,
+                until_timestamp
+            ))
+            
+            series = {}
+            for bucket, group, status, count in cursor.fetchall():
+                if status not in ROLLUP_STATUSES:
+                    continue
+                key = (bucket, group)
+                if key not in series:
+                    series[key] = {
+                        "bucket_start": (datetime.utcfromtimestamp(bucket).isoformat() if granularity == "hour"
+                                         else datetime.utcfromtimestamp(bucket).date().isoformat()),
+                        **({group_by: group} if group_by else {}),
+                        **({"reason": reason_code_name(group)} if group_by == "reason_code" else {}),
+                        **{status_name: 0 for status_name in ROLLUP_STATUSES}
+                    }
+                series[key][status] = count
+            return list(series.values())
+
     # ==================== ARTIFACT WORKFLOW (NEW) ====================
     
     def save_draft_artifact(self, draft_id: str, user_id: int, student_artifact_pack: Dict[str, Any], 
@@ -614,7 +1760,7 @@ class PersistentDatabase:
                 INSERT OR REPLACE INTO draft_artifacts 
                 (id, user_id, student_artifact_pack, source_profile_hash)
                 VALUES (?, ?, ?, ?)
-            """, (draft_id, user_id, json.dumps(student_artifact_pack), source_profile_hash))
+            """, (draft_id, user_id, self._store_blob(cursor, student_artifact_pack), source_profile_hash))
             return cursor.rowcount > 0
     
     def get_draft_artifact(self, user_id: int) -> Optional[Dict[str, Any]]:
@@ -634,7 +1780,7 @@ class PersistentDatabase:
                 return {
                     "id": row[0],
                     "user_id": user_id,
-                    "student_artifact_pack": json.loads(row[1]),
+                    "student_artifact_pack": self._load_json_column(cursor, row[1]),
                     "status": row[2],
                     "source_profile_hash": row[3],
                     "created_at": row[4]
@@ -653,7 +1799,7 @@ class PersistentDatabase:
                  approval_metadata, integrity_hash)
                 VALUES (?, ?, ?, ?, ?, ?, ?)
             """, (
-                snapshot_id, user_id, json.dumps(student_artifact_pack), 
+                snapshot_id, user_id, self._store_blob(cursor, student_artifact_pack), 
                 source_resume_hash, source_profile_hash, 
                 json.dumps(approval_metadata), integrity_hash
             ))
@@ -677,7 +1823,7 @@ class PersistentDatabase:
                 return {
                     "id": row[0],
                     "user_id": user_id,
-                    "student_artifact_pack": json.loads(row[1]),
+                    "student_artifact_pack": self._load_json_column(cursor, row[1]),
                     "approved_at": row[2],
                     "source_resume_hash": row[3],
                     "source_profile_hash": row[4],
@@ -694,4 +1840,153 @@ class PersistentDatabase:
             cursor.execute("""
                 DELETE FROM draft_artifacts WHERE user_id = ?
             """, (user_id,))
-            return cursor.rowcount > 0
\ No newline at end of file
+            return cursor.rowcount > 0
+    
+    # ==================== BLOB STORE ====================
+    
+    def collect_unreferenced_blobs(self) -> int:
+        """Delete blobs no longer referenced by any row. Returns the number removed."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM blobs WHERE ref_count <= 0")
+            return cursor.rowcount
+    
+    def migrate_json_columns_to_blobs(self, batch_size: int = 500,
+                                      max_seconds: float = DEFAULT_BLOB_MIGRATION_SECONDS) -> int:
+        """
+        Move inline JSON snapshots written by older versions into the blob store.
+        
+        Works in batches (one transaction each) until a batch finds nothing left to
+        convert or max_seconds have passed, so it can run alongside request traffic
+        and resume on the next call. Returns the number of rows converted.
+        """
+        deadline = time.monotonic() + max_seconds
+        converted = 0
+        while True:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                batch_converted = 0
+                for table, column in BLOB_REF_COLUMNS:
+                    cursor.execute(f"""
+                        SELECT rowid, {column} FROM {table}
+                        WHERE {column} NOT LIKE '{BLOB_REF_PREFIX}%'
+                        LIMIT ?
+                    """, (batch_size,))
+                    for rowid, value in cursor.fetchall():
+                        reference = self._store_blob(cursor, json.loads(value))
+                        cursor.execute(f"UPDATE {table} SET {column} = ? WHERE rowid = ?", (reference, rowid))
+                        batch_converted += 1
+            converted += batch_converted
+            if batch_converted == 0 or time.monotonic() >= deadline:
+                return converted
+    
+    # ==================== RETENTION & ARCHIVAL ====================
+    
+    def archive_expired_rows(self, retention_days: int = DEFAULT_RETENTION_DAYS) -> Dict[str, int]:
+        """
+        Move application history and autopilot runs older than retention_days into
+        monthly archive tables, keeping the hot tables (and their indexes) small.
+        
+        Archived history still counts toward user_app_stats and archived runs keep
+        their profile snapshot blobs alive. Returns the number of rows moved per table.
+        """
+        cutoff = datetime.now().timestamp() - retention_days * SECONDS_PER_DAY
+        month_expressions = {
+            "application_history": ("strftime('%Y%m', timestamp, 'unixepoch')", "timestamp < ?"),
+            "autopilot_runs": ("strftime('%Y%m', started_at)", "started_at < datetime(?, 'unixepoch')"),
+        }
+        
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            # Create every archive table up front: DDL scripts commit, the moves below must not be split
+            pending = []
+            for table in ARCHIVED_TABLES:
+                month_expression, condition = month_expressions[table]
+                cursor.execute(f"""
+                    SELECT DISTINCT {month_expression} FROM {table} WHERE {condition}
+                """, (cutoff,))
+                for (month,) in cursor.fetchall():
+                    if month:
+                        pending.append((table, self._ensure_archive_table(conn, table, month), month))
+            
+            moved = {table: 0 for table in ARCHIVED_TABLES}
+            for table, archive, month in pending:
+                month_expression, condition = month_expressions[table]
+                columns = ", ".join(row[1] for row in conn.execute(f"PRAGMA table_info({table})"))
+                where = f"{condition} AND {month_expression} = ?"
+                cursor.execute(f"""
+                    INSERT INTO {archive} ({columns}) SELECT {columns} FROM {table} WHERE {where}
+                """, (cutoff, month))
+                moved[table] += cursor.rowcount
+                cursor.execute(f"DELETE FROM {table} WHERE {where}", (cutoff, month))
+            return moved
+    
+    def optimize_storage(self, max_vacuum_pages: int = 0) -> Dict[str, int]:
+        """
+        Return free pages to the filesystem and refresh query planner statistics.
+        
+        Uses incremental vacuum (max_vacuum_pages=0 frees every free page). Databases
+        created before auto_vacuum was enabled get one full VACUUM to convert them.
+        """
+        conn = sqlite3.connect(self.db_path, isolation_level=None)  # VACUUM cannot run in a transaction
+        try:
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:  # 2 = INCREMENTAL
+                conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                conn.execute("VACUUM")
+            
+            free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            conn.execute(f"PRAGMA incremental_vacuum({int(max_vacuum_pages)})").fetchall()
+            freed_pages = free_pages - conn.execute("PRAGMA freelist_count").fetchone()[0]
+            
+            # Sample-based ANALYZE keeps this cheap on large tables
+            conn.execute("PRAGMA analysis_limit = 1000")
+            conn.execute("ANALYZE")
+            return {"freed_pages": freed_pages}
+        finally:
+            conn.close()
+    
+    def _archive_tables(self, cursor, table: str) -> List[str]:
+        """Monthly archive tables of a hot table, newest month first."""
+        cursor.execute("""
+            SELECT name FROM sqlite_master
+            WHERE type = 'table' AND name GLOB ?
+            ORDER BY name DESC
+        """, (f"{table}{ARCHIVE_TABLE_INFIX}[0-9][0-9][0-9][0-9][0-9][0-9]",))
+        return [row[0] for row in cursor.fetchall()]
+    
+    def _ensure_archive_table(self, conn, table: str, month: str) -> str:
+        """Create the archive table of a hot table for a YYYYMM month and return its name."""
+        archive = f"{table}{ARCHIVE_TABLE_INFIX}{month}"
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {archive} AS SELECT * FROM {table} WHERE 0")
+        self._prepare_archive_table(conn, table, archive)
+        return archive
+    
+    def _prepare_archive_table(self, conn, table: str, archive: str):
+        """Bring an archive table's columns, indexes and triggers in line with its hot table."""
+        for row in conn.execute(f"PRAGMA table_info({table})").fetchall():
+            self._ensure_column(conn, archive, row[1], row[2])
+        
+        conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{archive}_id ON {archive} (id)")
+        if table == "application_history":
+            conn.execute(f"DROP INDEX IF EXISTS idx_{archive}_user_timestamp")
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{archive}_user_epoch_timestamp ON {archive} (user_id, epoch, timestamp, id)")
+            self._create_history_stats_triggers(conn, archive)
+        elif table == "autopilot_runs":
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{archive}_user_started ON {archive} (user_id, started_at, id)")
+            self._create_blob_ref_triggers(conn, archive, "profile_snapshot")
+    
+    def _select_newest_first(self, cursor, tables: List[str], columns: str, conditions: str,
+                             params: List[Any], order_columns: Tuple[str, ...], limit: int):
+        """
+        Execute a keyset page query over a hot table and its archives, newest first.
+        
+        Each table is limited separately (using its own index) before the merge.
+        """
+        order = ", ".join(f"{column} DESC" for column in order_columns)
+        query = " UNION ALL ".join(
+            f"SELECT * FROM (SELECT {columns} FROM {table} WHERE {conditions} ORDER BY {order} LIMIT ?)"
+            for table in tables
+        )
+        cursor.execute(f"SELECT * FROM ({query}) ORDER BY {order} LIMIT ?",
+                       [*params, limit] * len(tables) + [limit])
@@ -4,7 +4,7 @@ Preserves all original logic from main.py while making it callable as a function
 """
 import json
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 
 from core.tracker import ApplicationTracker
 from backend.job_fetcher import JobFetcher  # Use JobFetcher instead of SandboxJobPortal
@@ -13,6 +13,7 @@ from core.generator import generate_application_content
 from schemas.student_schema import StudentArtifactPack
 from schemas.job_schema import JobListing
 from core.validator import validate_job_for_scoring
+from core.reason_codes import ReasonCode
 
 
 def load_json(path):
@@ -26,7 +27,9 @@ def run_autopilot(
     jobs_data: List[Dict[str, Any]],
     tracker: Optional[ApplicationTracker] = None,
     original_profile: Optional[Dict[str, Any]] = None,
-    apps_today_count: int = 0
+    apps_today_count: int = 0,
+    batch_submit: bool = False,
+    job_fetcher: Optional[JobFetcher] = None
 ) -> Dict[str, Any]:
     """
     Run the autonomous job application engine.
@@ -35,6 +38,12 @@ def run_autopilot(
         student_data: Raw student profile data (will be validated against schema)
         jobs_data: List of raw job listing data (will be validated against schema)
         tracker: Optional existing tracker, creates new one if None
+        batch_submit: Collect the run's applications and send them with
+            JobFetcher.submit_applications (shared applicant block, per-job
+            overrides) instead of one request per job
+        job_fetcher: Portal client used for submissions (e.g. a FederatedJobFetcher,
+            which routes each job to its owning portal); a JobFetcher for
+            SANDBOX_URL if None
     
     Returns:
         Dict containing:
@@ -70,7 +79,8 @@ def run_autopilot(
     # Initialize tracker and job fetcher (for real portal submissions)
     if tracker is None:
         tracker = ApplicationTracker()
-    job_fetcher = JobFetcher()  # Use JobFetcher for real HTTP submissions
+    if job_fetcher is None:
+        job_fetcher = JobFetcher()  # Use JobFetcher for real HTTP submissions
 
     # Summary counts
     queued, skipped, submitted, failed, retried = 0, 0, 0, 0, 0
@@ -81,6 +91,9 @@ def run_autopilot(
     
     # Track jobs we've already processed to avoid duplicates
     processed_jobs = set()
+    
+    # Applications waiting for the batch submission (batch_submit mode)
+    pending_submissions = []
 
     # Process each job (preserving exact original logic)
     for job in jobs:
@@ -102,9 +115,9 @@ def run_autopilot(
         queued += 1
 
         # Validate job for scoring
-        ok, not_allowed_reason = validate_job_for_scoring(student, job, apps_today)
+        ok, not_allowed_reason, reason_code = validate_job_for_scoring(student, job, apps_today)
         if not ok:
-            tracker.track(job_id=job_id, status="skipped", reason=not_allowed_reason, company=job.company, role=job.role)
+            tracker.track(job_id=job_id, status="skipped", reason=not_allowed_reason, reason_code=reason_code, company=job.company, role=job.role)
             skipped += 1
             continue
 
@@ -116,21 +129,21 @@ def run_autopilot(
 
         if score < min_score:
             reason = f"Score {score:.2f} < required {min_score:.2f}"
-            tracker.track(job_id=job_id, status="skipped", reason=reason, company=job.company, role=job.role)
+            tracker.track(job_id=job_id, status="skipped", reason=reason, reason_code=ReasonCode.SCORE_BELOW_THRESHOLD, company=job.company, role=job.role)
             skipped += 1
             continue
 
         # Generate application content
         app_content, skip_reason = generate_application_content(student, job)
         if app_content is None:
-            tracker.track(job_id=job_id, status="skipped", reason=skip_reason, company=job.company, role=job.role)
+            tracker.track(job_id=job_id, status="skipped", reason=skip_reason, reason_code=ReasonCode.NO_RELEVANT_BULLETS, company=job.company, role=job.role)
             skipped += 1
             continue
 
         # CRITICAL: Check daily limit again before incrementing and applying
         if apps_today >= student.constraints.max_apps_per_day:
             # Mark this job as skipped due to daily limit so it can be retried tomorrow
-            tracker.track(job_id=job_id, status="skipped", reason=f"Daily limit of {student.constraints.max_apps_per_day} applications reached", company=job.company, role=job.role)
+            tracker.track(job_id=job_id, status="skipped", reason=f"Daily limit of {student.constraints.max_apps_per_day} applications reached", reason_code=ReasonCode.DAILY_LIMIT_REACHED, company=job.company, role=job.role)
             skipped += 1
             break
 
@@ -156,37 +169,34 @@ def run_autopilot(
             "salary_expectation": "Negotiable"
         }
 
+        if batch_submit:
+            pending_submissions.append((job, application_for_portal))
+            continue
+
         # Submit to sandbox portal via HTTP (with retry logic)
         try:
             submission_result = job_fetcher.submit_application(job_id, application_for_portal)
-            tracker.track(
-                job_id=job_id,
-                status="submitted",
-                receipt_id=submission_result.get("receipt_id"),
-                company=job.company,
-                role=job.role
-            )
-            submitted += 1
-        except Exception as e1:
+        except Exception as e:
+            submission_result = {"success": False, "error": str(e), "retryable": True}
+        was_retried = bool(submission_result.get("retryable"))
+        if was_retried:
             try:
                 submission_result = job_fetcher.submit_application(job_id, application_for_portal)
-                tracker.track(
-                    job_id=job_id,
-                    status="retried",
-                    receipt_id=submission_result.get("receipt_id"),
-                    company=job.company,
-                    role=job.role
-                )
-                retried += 1
-            except Exception as e2:
-                tracker.track(
-                    job_id=job_id,
-                    status="failed",
-                    reason=f"Submission failed twice: {e2}",
-                    company=job.company,
-                    role=job.role
-                )
-                failed += 1
+            except Exception as e:
+                submission_result = {"success": False, "error": str(e)}
+        outcome = track_submission(tracker, job, submission_result, was_retried)
+        if outcome == "submitted":
+            submitted += 1
+        elif outcome == "retried":
+            retried += 1
+        else:
+            failed += 1
+
+    if pending_submissions:
+        batch_counts = submit_application_batch(job_fetcher, tracker, pending_submissions)
+        submitted += batch_counts["submitted"]
+        retried += batch_counts["retried"]
+        failed += batch_counts["failed"]
 
     summary = {
         "queued": queued,
@@ -204,6 +214,86 @@ def run_autopilot(
     }
 
 
+def split_shared_fields(payloads: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Split application payloads into the fields identical across all of them and
+    the per-payload remainder.
+    """
+    shared = {
+        key: value for key, value in payloads[0].items()
+        if all(key in payload and payload[key] == value for payload in payloads[1:])
+    }
+    overrides = [
+        {key: value for key, value in payload.items() if key not in shared}
+        for payload in payloads
+    ]
+    return shared, overrides
+
+
+def track_submission(
+    tracker: ApplicationTracker,
+    job: JobListing,
+    result: Dict[str, Any],
+    was_retried: bool
+) -> str:
+    """
+    Track one submission outcome; returns "submitted", "retried" or "failed".
+    
+    A result without success (the portal rejected the application, or the
+    retry also got no answer) is a SUBMISSION_FAILED failure, in both the
+    sequential and the batch path.
+    """
+    if result.get("success"):
+        status = "retried" if was_retried else "submitted"
+        tracker.track(
+            job_id=job.job_id,
+            status=status,
+            receipt_id=result.get("receipt_id"),
+            company=job.company,
+            role=job.role
+        )
+        return status
+
+    reason = f"Submission failed twice: {result.get('error')}" if was_retried else f"Submission failed: {result.get('error')}"
+    tracker.track(
+        job_id=job.job_id,
+        status="failed",
+        reason=reason,
+        reason_code=ReasonCode.SUBMISSION_FAILED,
+        company=job.company,
+        role=job.role
+    )
+    return "failed"
+
+
+def submit_application_batch(
+    job_fetcher: JobFetcher,
+    tracker: ApplicationTracker,
+    pending: List[Tuple[JobListing, Dict[str, Any]]]
+) -> Dict[str, int]:
+    """
+    Submit a run's applications in batches and track each outcome.
+    
+    Items whose batch never reached the portal are retried once (tracked as
+    "retried" if that succeeds); items the portal rejected fail immediately.
+    """
+    counts = {"submitted": 0, "retried": 0, "failed": 0}
+    applicant, overrides = split_shared_fields([payload for _, payload in pending])
+    applications = [{**override, "job_id": job.job_id} for (job, _), override in zip(pending, overrides)]
+    jobs_by_id = {job.job_id: job for job, _ in pending}
+
+    results = job_fetcher.submit_applications(applicant, applications)
+    retry_items = [item for item, result in zip(applications, results) if result.get("retryable")]
+    retry_results = job_fetcher.submit_applications(applicant, retry_items) if retry_items else []
+    outcomes = [(result, False) for result in results if not result.get("retryable")]
+    outcomes += [(result, True) for result in retry_results]
+
+    for result, was_retried in outcomes:
+        counts[track_submission(tracker, jobs_by_id[result["job_id"]], result, was_retried)] += 1
+
+    return counts
+
+
 def run_autopilot_from_files(
     student_path: str = "data/student_profile.json",
     jobs_path: str = "data/jobs.json"
@@ -0,0 +1,278 @@
+"""
+Federated job fetcher - one JobFetcher surface over several job portals.
+Queries portals concurrently, merges and deduplicates their listings, and routes submissions back to the owning portal.
+"""
+import logging
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Callable, Tuple
+from urllib.parse import urlparse
+
+from backend.http_client import normalize_portal_url
+from backend.job_fetcher import JobFetcher, PortalFormatting
+from backend.portal_health import portal_health
+
+logger = logging.getLogger(__name__)
+
+# Federated IDs of non-primary portals' jobs: "<portal job_id>@<host:port>"
+JOB_ID_SEPARATOR = "@"
+
+
+def _normalize(text: Optional[str]) -> str:
+    return " ".join(re.findall(r"[a-z0-9+#]+", (text or "").lower()))
+
+
+def description_shingles(description: Optional[str], size: int = 3) -> frozenset:
+    """Hashed word n-grams of a job description (the whole text if it is shorter than size words)."""
+    words = _normalize(description).split()
+    if len(words) < size:
+        return frozenset([hash(tuple(words))]) if words else frozenset()
+    return frozenset(hash(tuple(words[i:i + size])) for i in range(len(words) - size + 1))
+
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class FederatedJobFetcher(PortalFormatting):
+    """
+    Aggregates several job portals behind the JobFetcher methods the app uses.
+
+    Each portal gets its own JobFetcher (and so the shared pooled session for its
+    URL); calls fan out on one thread per portal, so a fetch takes as long as the
+    slowest portal rather than the sum. Portals the health monitor reports down are
+    skipped.
+
+    Jobs keep their portal job_id on the first (primary) portal; jobs from the
+    others get "<job_id>@<host:port>" so IDs never collide and every ID names its
+    owning portal. Listings with the same normalized company and role whose
+    description shingles overlap by at least similarity_threshold (Jaccard) are
+    treated as one job: the first portal in configuration order keeps it and the
+    copies are listed under "also_posted_on".
+    """
+
+    def __init__(self, portal_urls: List[str], similarity_threshold: float = 0.8, shingle_size: int = 3):
+        if not portal_urls:
+            raise ValueError("At least one portal URL is required")
+        self.portal_urls = [normalize_portal_url(url) for url in portal_urls]
+        self.portal_url = self.portal_urls[0]
+        self.fetchers = {url: JobFetcher(url) for url in self.portal_urls}
+        self.portal_keys = {url: urlparse(url).netloc or url for url in self.portal_urls}
+        # Only non-primary portals' IDs carry a suffix, so only their keys are stripped in route()
+        self.suffixed_portals = {key: url for url, key in self.portal_keys.items() if url != self.portal_url}
+        self.similarity_threshold = similarity_threshold
+        self.shingle_size = shingle_size
+
+        # Last known raw catalog per portal, kept current from each portal's change feed
+        self.catalog_lock = threading.Lock()
+        self.portal_catalogs: Dict[str, Dict[str, Dict[str, Any]]] = {url: {} for url in self.portal_urls}
+        self.duplicates_dropped = 0
+
+        logger.info(f"FederatedJobFetcher initialized with {len(self.portal_urls)} portals: {self.portal_urls}")
+
+    @property
+    def catalog_cursor(self) -> Dict[str, Optional[str]]:
+        return {url: fetcher.catalog_cursor for url, fetcher in self.fetchers.items()}
+
+    def restore_catalog_cursor(self, cursor: str) -> bool:
+        """
+        Not supported: per-portal deltas are merged into portal_catalogs, the raw
+        per-portal copies (duplicates included) that a merged catalog snapshot does
+        not contain, so the first refresh after a restart is a full one.
+        """
+        return False
+
+    # ==================== ROUTING ====================
+
+    def federated_job_id(self, portal_url: str, job_id: str) -> str:
+        if portal_url == self.portal_url:
+            return job_id
+        return f"{job_id}{JOB_ID_SEPARATOR}{self.portal_keys[portal_url]}"
+
+    def route(self, job_id: str) -> Tuple[str, str]:
+        """
+        (owning portal URL, the portal's own job_id) for a federated job ID.
+
+        IDs without the suffix of a configured non-primary portal belong to the
+        primary portal unchanged, even if they contain the separator themselves.
+        """
+        local_id, _, portal_key = job_id.rpartition(JOB_ID_SEPARATOR)
+        if local_id and portal_key in self.suffixed_portals:
+            return self.suffixed_portals[portal_key], local_id
+        return self.portal_url, job_id
+
+    def _federate(self, portal_url: str, portal_job: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            **portal_job,
+            "job_id": self.federated_job_id(portal_url, portal_job.get("job_id")),
+            "portal_url": portal_url
+        }
+
+    def _map_portals(self, call: Callable[[str, JobFetcher], Any], urls: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Run call(url, fetcher) for each reachable portal concurrently; results keyed by URL in portal order."""
+        if urls is None:
+            urls = [url for url in self.portal_urls if portal_health.is_available(url)]
+        if not urls:
+            return {}
+        with ThreadPoolExecutor(max_workers=len(urls), thread_name_prefix="portal-federation") as executor:
+            futures = {url: executor.submit(call, url, self.fetchers[url]) for url in urls}
+            return {url: future.result() for url, future in futures.items()}
+
+    # ==================== DEDUPLICATION ====================
+
+    def deduplicate(self, jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Drop reposted and cross-posted copies, keeping the first occurrence of each job.
+
+        Only jobs with the same company and role are compared, so the cost stays
+        linear in practice.
+        """
+        kept: List[Dict[str, Any]] = []
+        buckets: Dict[Tuple[str, str], List[Tuple[frozenset, Dict[str, Any]]]] = {}
+        for job in jobs:
+            key = (_normalize(job.get("company")), _normalize(job.get("role")))
+            shingles = description_shingles(job.get("description"), self.shingle_size)
+            bucket = buckets.setdefault(key, [])
+            original = next(
+                (candidate for candidate_shingles, candidate in bucket
+                 if jaccard(shingles, candidate_shingles) >= self.similarity_threshold),
+                None
+            )
+            if original is None:
+                job = {**job, "also_posted_on": []}
+                bucket.append((shingles, job))
+                kept.append(job)
+            else:
+                original["also_posted_on"].append(job["job_id"])
+
+        dropped = len(jobs) - len(kept)
+        if dropped:
+            logger.info(f"Dropped {dropped} duplicate listings across {len(self.portal_urls)} portals")
+        return kept
+
+    # ==================== FETCHING ====================
+
+    def check_portal_status(self) -> Dict[str, Any]:
+        """Federation status from the health monitor: active while any portal is."""
+        portals = {url: portal_health.snapshot(url) for url in self.portal_urls}
+        available = [url for url in self.portal_urls if portal_health.is_available(url)]
+        return {
+            "status": "active" if available else "unavailable",
+            "available_portals": len(available),
+            "portals": portals
+        }
+
+    def fetch_jobs(self, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Fetch jobs from every reachable portal concurrently, deduplicated."""
+        results = self._map_portals(lambda url, fetcher: fetcher.fetch_jobs(filters))
+        jobs = [self._federate(url, job) for url, portal_jobs in results.items() for job in portal_jobs]
+        jobs = self.deduplicate(jobs)
+        if filters and filters.get("limit"):
+            jobs = jobs[:filters["limit"]]
+        return jobs
+
+    def stream_catalog_changes(self) -> Optional[Dict[str, Any]]:
+        """
+        Refresh every portal's catalog from its change feed, concurrently, and
+        return the merged, deduplicated catalog (see JobFetcher.stream_catalog_changes).
+
+        Deduplication spans portals, so any change yields the whole merged catalog
+        with full=True; when no portal changed it returns full=False with no
+        changes. A portal that cannot be reached keeps contributing its last known
+        jobs. Returns None only if no portal could be reached.
+        """
+        results = self._map_portals(lambda url, fetcher: fetcher.fetch_catalog_changes())
+        reached = {url: result for url, result in results.items() if result is not None}
+        if not reached:
+            return None
+
+        changed = False
+        with self.catalog_lock:
+            for url, result in reached.items():
+                catalog = self.portal_catalogs[url]
+                if result["full"]:
+                    catalog.clear()
+                for job in result["jobs"]:
+                    catalog[job["job_id"]] = job
+                for job_id in result["deleted_job_ids"]:
+                    catalog.pop(job_id, None)
+                changed = changed or result["full"] or not result["not_modified"]
+
+            if not changed:
+                return {"full": False, "changes": iter(())}
+
+            merged = [
+                self._federate(url, job)
+                for url in self.portal_urls
+                for job in self.portal_catalogs[url].values()
+            ]
+        jobs = self.deduplicate(merged)
+        self.duplicates_dropped = len(merged) - len(jobs)
+        return {"full": True, "changes": (("job", job) for job in jobs)}
+
+    def convert_portal_job_to_internal_format(self, portal_job: Dict[str, Any]) -> Dict[str, Any]:
+        """Internal format plus the owning portal and the IDs of dropped duplicates."""
+        internal_job = super().convert_portal_job_to_internal_format(portal_job)
+        internal_job["portal_url"] = portal_job.get("portal_url", self.route(internal_job["job_id"])[0])
+        internal_job["also_posted_on"] = portal_job.get("also_posted_on", [])
+        return internal_job
+
+    def get_job_details(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get detailed information about a job from its owning portal."""
+        portal_url, local_id = self.route(job_id)
+        job = self.fetchers[portal_url].get_job_details(local_id)
+        return self._federate(portal_url, job) if job else None
+
+    # ==================== SUBMISSION ====================
+
+    def submit_application(self, job_id: str, application_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Submit an application to the portal that owns job_id."""
+        portal_url, local_id = self.route(job_id)
+        result = self.fetchers[portal_url].submit_application(local_id, application_data)
+        return {**result, "portal_url": portal_url}
+
+    def submit_applications(self, applicant: Dict[str, Any], applications: List[Dict[str, Any]],
+                            batch_size: int = 50) -> List[Dict[str, Any]]:
+        """
+        Batch-submit applications (see JobFetcher.submit_applications), one batch
+        stream per owning portal, concurrently. Results come back in input order
+        with the federated job_id.
+        """
+        by_portal: Dict[str, List[Tuple[int, Dict[str, Any]]]] = {}
+        for index, item in enumerate(applications):
+            portal_url, local_id = self.route(item["job_id"])
+            by_portal.setdefault(portal_url, []).append((index, {**item, "job_id": local_id}))
+
+        portal_results = self._map_portals(
+            lambda url, fetcher: fetcher.submit_applications(
+                applicant, [item for _, item in by_portal[url]], batch_size=batch_size
+            ),
+            urls=list(by_portal)
+        )
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(applications)
+        for url, items in by_portal.items():
+            for (index, _), result in zip(items, portal_results[url]):
+                results[index] = {**result, "job_id": applications[index]["job_id"], "portal_url": url}
+        return results
+
+    def get_application_status(self, application_id: str = None, receipt_id: str = None) -> Optional[Dict[str, Any]]:
+        """Look an application up on each portal in turn (application and receipt IDs are portal-unique)."""
+        for url in self.portal_urls:
+            application = self.fetchers[url].get_application_status(application_id=application_id, receipt_id=receipt_id)
+            if application:
+                return {**application, "portal_url": url}
+        return None
+
+    # ==================== STATS ====================
+
+    def coalescing_stats(self) -> Dict[str, int]:
+        """Coalescing counters (the portals share one SingleFlight)."""
+        return self.fetchers[self.portal_url].coalescing_stats()
+
+    def http_stats(self) -> Dict[str, Any]:
+        """Per-portal connection pool utilization and latency histograms."""
+        return {url: fetcher.http_stats() for url, fetcher in self.fetchers.items()}
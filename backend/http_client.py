@@ -0,0 +1,182 @@
+"""
+Shared, connection-pooled HTTP sessions for portal traffic.
+One session per base URL per process, with real timeouts, GET retries and latency metrics.
+"""
+import os
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def normalize_portal_url(url: str) -> str:
+    """Canonical form of a portal base URL (no surrounding whitespace or trailing slash), used as its key everywhere."""
+    return url.strip().rstrip("/")
+
+
+class LatencyHistogram:
+    """Bucketed latency histogram with per-bucket (non-cumulative) counts; thread-safe."""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float):
+        index = next((i for i, bound in enumerate(self.buckets) if seconds <= bound), len(self.buckets))
+        with self.lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            labels = [f"le_{bound}" for bound in self.buckets] + ["inf"]
+            return {
+                "count": self.count,
+                "avg_seconds": round(self.total / self.count, 4) if self.count else 0.0,
+                "buckets": dict(zip(labels, self.counts))
+            }
+
+
+class PortalSession(requests.Session):
+    """
+    requests.Session with a default (connect, read) timeout and per-method metrics.
+
+    requests has no session-wide timeout (setting session.timeout does nothing), so
+    every request without an explicit timeout gets this one.
+    """
+
+    def __init__(self, timeout: Tuple[float, float]):
+        super().__init__()
+        self.default_timeout = timeout
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.errors = 0
+        self.latency: Dict[str, LatencyHistogram] = {}
+
+    def request(self, method, url, *args, **kwargs):
+        kwargs.setdefault("timeout", self.default_timeout)
+        method = method.upper()
+        with self.lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            histogram = self.latency.setdefault(method, LatencyHistogram())
+
+        started = time.perf_counter()
+        try:
+            return super().request(method, url, *args, **kwargs)
+        except requests.RequestException:
+            with self.lock:
+                self.errors += 1
+            raise
+        finally:
+            histogram.observe(time.perf_counter() - started)
+            with self.lock:
+                self.in_flight -= 1
+
+
+def _pool_stats(adapter: HTTPAdapter) -> Dict[str, Any]:
+    """Connection counts of every urllib3 pool an adapter has opened."""
+    pools = {}
+    manager = adapter.poolmanager
+    for key in list(manager.pools.keys()):
+        pool = manager.pools.get(key)
+        if pool is None:
+            continue
+        idle = sum(1 for conn in list(pool.pool.queue) if conn is not None) if pool.pool else 0
+        pools[f"{pool.scheme}://{pool.host}:{pool.port}"] = {
+            "maxsize": pool.pool.maxsize if pool.pool else 0,
+            "idle_connections": idle,
+            "connections_opened": pool.num_connections,
+            "requests": pool.num_requests
+        }
+    return pools
+
+
+class HTTPClientRegistry:
+    """
+    Process-wide registry of PortalSessions keyed by base URL.
+
+    Every JobFetcher for the same portal (request handlers, autopilot runs,
+    scheduler jobs) shares one session and its keep-alive connection pool.
+    Idempotent GETs are retried at the transport level on connection errors and
+    502/503/504 with exponential backoff; other methods only retry failed connects.
+    """
+
+    def __init__(self, pool_maxsize: int = 20, connect_timeout: float = 3.05,
+                 read_timeout: float = 30.0, get_retries: int = 3, backoff_factor: float = 0.2):
+        self.pool_maxsize = pool_maxsize
+        self.timeout = (connect_timeout, read_timeout)
+        self.get_retries = get_retries
+        self.backoff_factor = backoff_factor
+        self.lock = threading.Lock()
+        self.sessions: Dict[str, PortalSession] = {}
+
+    def get_session(self, base_url: str) -> PortalSession:
+        """Return the shared session for a base URL, creating it on first use."""
+        with self.lock:
+            session = self.sessions.get(base_url)
+            if session is None:
+                session = self.sessions[base_url] = self._create_session()
+            return session
+
+    def stats(self, base_url: Optional[str] = None) -> Dict[str, Any]:
+        """Pool utilization and latency histograms, for one base URL or all of them."""
+        with self.lock:
+            sessions = dict(self.sessions)
+        if base_url is not None:
+            sessions = {base_url: sessions[base_url]} if base_url in sessions else {}
+
+        stats = {}
+        for url, session in sessions.items():
+            adapter = session.get_adapter(url)
+            with session.lock:
+                in_flight, peak, errors = session.in_flight, session.peak_in_flight, session.errors
+                histograms = dict(session.latency)
+            stats[url] = {
+                "pool_maxsize": self.pool_maxsize,
+                "in_flight": in_flight,
+                "peak_in_flight": peak,
+                "utilization": round(in_flight / self.pool_maxsize, 3),
+                "errors": errors,
+                "pools": _pool_stats(adapter),
+                "latency": {method: histogram.snapshot() for method, histogram in histograms.items()}
+            }
+        return stats
+
+    def _create_session(self) -> PortalSession:
+        retry = Retry(
+            total=self.get_retries,
+            connect=self.get_retries,
+            read=self.get_retries,
+            status=self.get_retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_maxsize,
+                              max_retries=retry, pool_block=False)
+        session = PortalSession(self.timeout)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+
+http_clients = HTTPClientRegistry(
+    pool_maxsize=int(os.environ.get("PORTAL_POOL_MAXSIZE", 20)),
+    connect_timeout=float(os.environ.get("PORTAL_CONNECT_TIMEOUT", 3.05)),
+    read_timeout=float(os.environ.get("PORTAL_READ_TIMEOUT", 30)),
+    get_retries=int(os.environ.get("PORTAL_GET_RETRIES", 3))
+)
@@ -0,0 +1,263 @@
+"""
+Process-wide cache of the portal job catalog.
+Jobs are held in the internal format and kept current in the background from the portal's change feed.
+"""
+import logging
+import os
+import threading
+import time
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+from backend.catalog_snapshot import CatalogSnapshot, write_snapshot
+from backend.job_fetcher import JobFetcher
+
+logger = logging.getLogger(__name__)
+
+
+class JobCatalog:
+    """
+    In-memory job catalog shared by every request in the process.
+
+    The first read loads the catalog synchronously. After that reads never wait on
+    the portal: a background thread pulls changes every ttl_seconds (retry_seconds
+    while the portal is unreachable) and the current catalog keeps being served in
+    the meantime, including while the portal is down. Refreshes transfer and
+    convert only jobs changed since the previous one, streamed as NDJSON
+    (JobFetcher.stream_catalog_changes).
+
+    version increases only when the catalog content changes, so downstream caches
+    can key on it instead of hashing the jobs.
+
+    With a snapshot_path, every content change is also written to disk
+    (catalog_snapshot) and a new process starts from that file: reads are served
+    from the snapshot straight away and the background refresh replaces it,
+    including while the portal is still unreachable.
+    """
+
+    def __init__(self, fetcher: JobFetcher, ttl_seconds: float = 60.0, retry_seconds: float = 5.0,
+                 snapshot_path: Optional[str] = None):
+        self.fetcher = fetcher
+        self.ttl_seconds = ttl_seconds
+        self.retry_seconds = retry_seconds
+        self.snapshot_path = snapshot_path
+
+        self.lock = threading.Lock()
+        self.refresh_lock = threading.Lock()
+        self.jobs: List[Dict[str, Any]] = []
+        self.skill_index: Dict[str, List[int]] = {}  # Lowercased required skill -> positions in jobs
+        self.version = 0
+        self.loaded = False
+        self.available = False
+        self.checked_at = 0.0  # Last refresh attempt, successful or not
+        self.changed_at = 0.0  # Last time the catalog content changed
+
+        self.refreshes = 0
+        self.not_modified = 0
+        self.deltas = 0
+        self.failures = 0
+        self.restored_at = 0.0  # When the catalog was loaded from the on-disk snapshot
+        self.snapshot_saves = 0
+
+        self.stop_event = threading.Event()
+        self.wake_event = threading.Event()
+        self.refresher: Optional[threading.Thread] = None
+
+        if snapshot_path:
+            self._load_snapshot()
+
+    def snapshot(self) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Current (version, jobs).
+
+        The job list is shared between callers and must not be mutated.
+        """
+        self._ensure_refresher()
+        if not self.loaded:
+            self.refresh(force=False)
+        elif self.is_stale():
+            # Serve what we have and let the refresher revalidate now
+            self.wake_event.set()
+
+        with self.lock:
+            return self.version, self.jobs
+
+    def is_stale(self) -> bool:
+        """Whether the catalog is due for revalidation."""
+        return time.time() - self.checked_at >= self._refresh_interval()
+
+    def refresh(self, force: bool = True) -> bool:
+        """
+        Revalidate the catalog against the portal. Returns True if it changed.
+
+        Concurrent callers are serialized; with force=False a caller that waited
+        behind another refresh does not repeat it.
+        """
+        with self.refresh_lock:
+            if not force and self.checked_at and not self.is_stale():
+                return False
+
+            # Portal jobs are streamed straight into the converter, one at a time
+            full, changed_jobs, deleted_job_ids = False, [], set()
+            result = self.fetcher.stream_catalog_changes()
+            if result is not None:
+                full = result["full"]
+                try:
+                    for kind, item in result["changes"]:
+                        if kind == "job":
+                            changed_jobs.append(self.fetcher.convert_portal_job_to_internal_format(item))
+                        else:
+                            deleted_job_ids.add(item)
+                except Exception as e:
+                    logger.error(f"Job catalog stream interrupted: {e}")
+                    result = None
+
+            with self.lock:
+                self.checked_at = time.time()
+                self.refreshes += 1
+                self.available = result is not None
+
+                if result is None:
+                    self.failures += 1
+                    return False
+                if not full and not changed_jobs and not deleted_job_ids:
+                    self.not_modified += 1
+                    return False
+
+                if full:
+                    # Compare content before bumping the version (a relisted catalog may be identical)
+                    jobs = changed_jobs
+                    changed = not self.loaded or jobs != self.jobs
+                else:
+                    self.deltas += 1
+                    jobs, changed = self._merge_changes(changed_jobs, deleted_job_ids)
+
+                if changed:
+                    self.jobs = jobs
+                    self.skill_index = build_skill_index(jobs)
+                    self.version += 1
+                    self.changed_at = self.checked_at
+                    self.loaded = True
+                    logger.info(f"Job catalog updated to version {self.version} ({len(jobs)} jobs)")
+
+            if changed and self.snapshot_path:
+                self._save_snapshot()
+            return changed
+
+    def jobs_with_skills(self, skills: Iterable[str]) -> List[Dict[str, Any]]:
+        """Catalog jobs requiring any of skills (case-insensitive), via the skill index."""
+        with self.lock:
+            rows = sorted({row for skill in skills for row in self.skill_index.get(skill.lower(), ())})
+            return [self.jobs[row] for row in rows]
+
+    def status(self) -> Dict[str, Any]:
+        """Portal availability and catalog freshness, without contacting the portal."""
+        with self.lock:
+            now = time.time()
+            return {
+                "status": "active" if self.available else "unavailable",
+                "loaded": self.loaded,
+                "catalog_version": self.version,
+                "job_count": len(self.jobs),
+                "cursor": self.fetcher.catalog_cursor,
+                "age_seconds": round(now - self.checked_at, 1) if self.checked_at else None,
+                "last_changed": self.changed_at or None,
+                "refreshes": self.refreshes,
+                "not_modified": self.not_modified,
+                "deltas": self.deltas,
+                "failures": self.failures,
+                "restored_from_snapshot": self.restored_at or None,
+                "snapshot_saves": self.snapshot_saves
+            }
+
+    def close(self):
+        """Stop the background refresher."""
+        self.stop_event.set()
+        self.wake_event.set()
+
+    def _merge_changes(self, changed_jobs: List[Dict[str, Any]],
+                       deleted_job_ids: set) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Apply a delta: updated jobs are replaced in place, new ones appended and deleted
+        ones dropped. Returns the new job list and whether anything actually differs.
+        """
+        changed_by_id = {job["job_id"]: job for job in changed_jobs}
+        changed = False
+        jobs = []
+        for job in self.jobs:
+            job_id = job["job_id"]
+            if job_id in deleted_job_ids:
+                changed = True
+                continue
+            updated = changed_by_id.pop(job_id, job)
+            changed = changed or (updated is not job and updated != job)
+            jobs.append(updated)
+        added = [job for job in changed_by_id.values() if job["job_id"] not in deleted_job_ids]
+        jobs.extend(added)
+        return jobs, changed or bool(added)
+
+    def _load_snapshot(self):
+        """Start from the on-disk snapshot, if there is a usable one; it is revalidated on first read."""
+        if not os.path.exists(self.snapshot_path):
+            return
+        started = time.perf_counter()
+        try:
+            with CatalogSnapshot(self.snapshot_path) as snapshot:
+                self.jobs = snapshot.jobs()
+                self.skill_index = snapshot.skill_index()
+                self.version = snapshot.version
+                self.changed_at = snapshot.saved_at
+                # A cursor lets the first refresh be a delta against the snapshot's content
+                if snapshot.cursor and not self.fetcher.restore_catalog_cursor(snapshot.cursor):
+                    logger.info("Job catalog fetcher cannot resume from the snapshot cursor; first refresh is a full one")
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable job catalog snapshot {self.snapshot_path}: {e}")
+            self.jobs, self.skill_index, self.version, self.changed_at = [], {}, 0, 0.0
+            return
+        self.loaded = True
+        self.restored_at = time.time()
+        logger.info(
+            f"Job catalog restored from snapshot: version {self.version}, {len(self.jobs)} jobs "
+            f"in {(time.perf_counter() - started) * 1000:.1f} ms"
+        )
+
+    def _save_snapshot(self):
+        """Persist the current catalog (called under refresh_lock, so writes never interleave)."""
+        with self.lock:
+            jobs, skill_index, version = self.jobs, self.skill_index, self.version
+        cursor = self.fetcher.catalog_cursor
+        try:
+            write_snapshot(self.snapshot_path, jobs, skill_index, version,
+                           cursor=cursor if isinstance(cursor, str) else None)
+            self.snapshot_saves += 1
+        except Exception as e:
+            logger.error(f"Failed to write job catalog snapshot {self.snapshot_path}: {e}")
+
+    def _refresh_interval(self) -> float:
+        return self.ttl_seconds if self.available else min(self.retry_seconds, self.ttl_seconds)
+
+    def _ensure_refresher(self):
+        with self.lock:
+            if self.refresher is not None or self.stop_event.is_set():
+                return
+            self.refresher = threading.Thread(target=self._refresh_loop, name="job-catalog-refresher", daemon=True)
+        self.refresher.start()
+
+    def _refresh_loop(self):
+        while not self.stop_event.is_set():
+            self.wake_event.wait(self._refresh_interval())
+            self.wake_event.clear()
+            if self.stop_event.is_set():
+                break
+            try:
+                self.refresh(force=False)
+            except Exception as e:
+                logger.error(f"Job catalog refresh failed: {e}")
+
+
+def build_skill_index(jobs: List[Dict[str, Any]]) -> Dict[str, List[int]]:
+    """Map each lowercased required skill to the positions of the jobs requiring it."""
+    index: Dict[str, List[int]] = {}
+    for row, job in enumerate(jobs):
+        for skill in {skill.lower() for skill in job.get("required_skills") or []}:
+            index.setdefault(skill, []).append(row)
+    return index
@@ -5,185 +5,48 @@ Integrates with the main system to pull jobs from real job boards.
 Enhanced to work with the comprehensive sandbox portal.
 """
 import requests
+import itertools
 import json
 import time
 import os
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator, Tuple
 import logging
 
+from backend.http_client import http_clients, normalize_portal_url
+from backend.portal_health import portal_health
+from backend.single_flight import SingleFlight
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class JobFetcher:
-    """Fetches jobs from external job portals."""
-    
-    def __init__(self, portal_url: str = None):
-        # Use environment variable for sandbox URL, fallback to localhost for development
-        if portal_url is None:
-            portal_url = os.environ.get('SANDBOX_URL', 'http://localhost:5001')
-        
-        self.portal_url = portal_url
-        self.session = requests.Session()
-        self.session.timeout = 30
-        
-        logger.info(f"JobFetcher initialized with portal URL: {self.portal_url}")
-        
-    def check_portal_status(self) -> Dict[str, Any]:
-        """Check if the job portal is available."""
-        try:
-            response = self.session.get(f"{self.portal_url}/api/portal/status")
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            logger.error(f"Failed to check portal status: {e}")
-            return {"status": "unavailable", "error": str(e)}
-    
-    def fetch_jobs(self, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
-        """Fetch jobs from the external portal."""
-        try:
-            # Build query parameters
-            params = {}
-            if filters:
-                if filters.get('location'):
-                    params['location'] = filters['location']
-                if filters.get('job_type'):
-                    params['job_type'] = filters['job_type']
-                if filters.get('experience_level'):
-                    params['experience_level'] = filters['experience_level']
-                if filters.get('company'):
-                    params['company'] = filters['company']
-                if filters.get('search'):
-                    params['search'] = filters['search']
-                if filters.get('skills'):
-                    params['skills'] = ','.join(filters['skills'])
-                if filters.get('limit'):
-                    params['limit'] = filters['limit']
-            
-            logger.info(f"Fetching jobs from portal with filters: {params}")
-            
-            response = self.session.get(f"{self.portal_url}/api/jobs", params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if data.get('success'):
-                jobs = data.get('jobs', [])
-                logger.info(f"Successfully fetched {len(jobs)} jobs from portal")
-                return jobs
-            else:
-                logger.error(f"Portal returned error: {data}")
-                return []
-                
-        except Exception as e:
-            logger.error(f"Failed to fetch jobs from portal: {e}")
-            return []
-    
-    def get_job_details(self, job_id: str) -> Optional[Dict[str, Any]]:
-        """Get detailed information about a specific job."""
-        try:
-            response = self.session.get(f"{self.portal_url}/api/jobs/{job_id}")
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if data.get('success'):
-                return data.get('job')
-            else:
-                logger.error(f"Failed to get job details: {data}")
-                return None
-                
-        except Exception as e:
-            logger.error(f"Failed to get job details for {job_id}: {e}")
-            return None
-    
-    def submit_application(self, job_id: str, application_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Submit an application to a job through the portal."""
-        print(f"REAL JOBFETCHER CALLED: Submitting to job {job_id}")
-        try:
-            logger.info(f"Submitting application to job {job_id}")
-            
-            response = self.session.post(
-                f"{self.portal_url}/api/jobs/{job_id}/apply",
-                json=application_data,
-                headers={'Content-Type': 'application/json'}
-            )
-            
-            data = response.json()
-            
-            if response.status_code == 200 and data.get('success'):
-                logger.info(f"Application submitted successfully: {data.get('application_id')}")
-                print(f"REAL JOBFETCHER SUCCESS: Receipt {data.get('receipt_id')}")
-                return {
-                    "success": True,
-                    "application_id": data.get('application_id'),
-                    "receipt_id": data.get('receipt_id'),
-                    "message": data.get('message'),
-                    "status": "submitted",
-                    "receipt": data.get('receipt')
-                }
-            else:
-                logger.error(f"Application submission failed: {data}")
-                print(f"REAL JOBFETCHER FAILED: {data}")
-                return {
-                    "success": False,
-                    "error": data.get('error', 'Unknown error'),
-                    "status": "failed"
-                }
-                
-        except Exception as e:
-            logger.error(f"Failed to submit application to {job_id}: {e}")
-            print(f"REAL JOBFETCHER EXCEPTION: {e}")
-            return {
-                "success": False,
-                "error": str(e),
-                "status": "failed"
-            }
-    
-    def get_application_status(self, application_id: str = None, receipt_id: str = None) -> Optional[Dict[str, Any]]:
-        """Get application status by application ID or receipt ID."""
-        try:
-            if receipt_id:
-                response = self.session.get(f"{self.portal_url}/api/applications/receipt/{receipt_id}")
-            elif application_id:
-                response = self.session.get(f"{self.portal_url}/api/applications/{application_id}")
-            else:
-                logger.error("Either application_id or receipt_id must be provided")
-                return None
-            
-            response.raise_for_status()
-            data = response.json()
-            
-            if data.get('success'):
-                return data.get('application')
-            else:
-                logger.error(f"Failed to get application status: {data}")
-                return None
-                
-        except Exception as e:
-            logger.error(f"Failed to get application status: {e}")
-            return None
+# Shared by every JobFetcher in the process so concurrent identical portal GETs
+# (from any request, worker thread or scheduler job) make a single HTTP call
+portal_requests = SingleFlight()
+
+class PortalFormatting:
+    """Conversions between portal payloads and internal formats, shared by the sync and async fetchers."""
     
-    def get_companies(self) -> List[Dict[str, Any]]:
-        """Get all companies from the portal."""
-        try:
-            response = self.session.get(f"{self.portal_url}/api/companies")
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if data.get('success'):
-                companies = data.get('companies', [])
-                logger.info(f"Successfully fetched {len(companies)} companies from portal")
-                return companies
-            else:
-                logger.error(f"Portal returned error: {data}")
-                return []
-                
-        except Exception as e:
-            logger.error(f"Failed to fetch companies from portal: {e}")
-            return []
+    def build_job_query_params(self, filters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Build /api/jobs query parameters from job filters."""
+        params = {}
+        if filters:
+            if filters.get('location'):
+                params['location'] = filters['location']
+            if filters.get('job_type'):
+                params['job_type'] = filters['job_type']
+            if filters.get('experience_level'):
+                params['experience_level'] = filters['experience_level']
+            if filters.get('company'):
+                params['company'] = filters['company']
+            if filters.get('search'):
+                params['search'] = filters['search']
+            if filters.get('skills'):
+                params['skills'] = ','.join(filters['skills'])
+            if filters.get('limit'):
+                params['limit'] = filters['limit']
+        return params
     
     def convert_portal_job_to_internal_format(self, portal_job: Dict[str, Any]) -> Dict[str, Any]:
         """Convert portal job format to internal database format."""
@@ -204,7 +67,6 @@ class JobFetcher:
             "experience_level": portal_job.get("experience_level"),
             "department": portal_job.get("department"),
             "preferred_skills": portal_job.get("preferred_skills", []),
-            "views": portal_job.get("views", 0),
             "applications_count": portal_job.get("applications_count", 0)
         }
     
@@ -339,69 +201,444 @@ class JobFetcher:
         else:
             return "3"
 
-def sync_jobs_from_portal():
-    """Sync jobs from the sandbox portal to our internal database."""
-    from database import PersistentDatabase
+
+class JobFetcher(PortalFormatting):
+    """Fetches jobs from external job portals."""
     
-    fetcher = JobFetcher()
-    db = PersistentDatabase()
+    def __init__(self, portal_url: str = None, single_flight: Optional[SingleFlight] = None):
+        # Use environment variable for sandbox URL, fallback to localhost for development
+        if portal_url is None:
+            portal_url = os.environ.get('SANDBOX_URL', 'http://localhost:5001')
+        
+        self.portal_url = normalize_portal_url(portal_url)
+        # Shared pooled session (keep-alive across fetchers and threads, real timeouts, GET retries)
+        self.session = http_clients.get_session(self.portal_url)
+        self.single_flight = single_flight or portal_requests
+        
+        # Incremental catalog sync state (see fetch_catalog_changes)
+        self.catalog_cursor: Optional[str] = None
+        self.catalog_etag: Optional[str] = None
+        
+        logger.info(f"JobFetcher initialized with portal URL: {self.portal_url}")
     
-    # Check portal status
-    status = fetcher.check_portal_status()
-    if status.get("status") != "active":
-        logger.error(f"Portal is not available: {status}")
-        return False
+    def _get(self, path: str, params: Optional[Dict[str, Any]] = None,
+             headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        """
+        GET a portal path; concurrent identical requests share one HTTP call.
+        
+        The body is read before the response is handed to the waiting callers, each
+        of which parses it on its own (so no parsed data is shared).
+        """
+        key = (
+            "GET", self.portal_url, path,
+            tuple(sorted((params or {}).items())),
+            tuple(sorted((headers or {}).items()))
+        )
+        
+        def send() -> requests.Response:
+            response = self.session.get(f"{self.portal_url}{path}", params=params, headers=headers)
+            response.content  # Load the body once, inside the shared call
+            return response
+        
+        return self.single_flight.do(key, send)
+    
+    def coalescing_stats(self) -> Dict[str, int]:
+        """How many portal GETs were executed vs. served from another caller's in-flight request."""
+        return self.single_flight.stats()
+    
+    def http_stats(self) -> Dict[str, Any]:
+        """Connection pool utilization and latency histograms of this portal's shared session."""
+        return http_clients.stats(self.portal_url).get(self.portal_url, {})
+        
+    def check_portal_status(self) -> Dict[str, Any]:
+        """Check if the job portal is available."""
+        try:
+            response = self._get("/api/portal/status")
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            logger.error(f"Failed to check portal status: {e}")
+            return {"status": "unavailable", "error": str(e)}
+    
+    def fetch_jobs(self, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Fetch jobs from the external portal."""
+        try:
+            params = self.build_job_query_params(filters)
+            
+            logger.info(f"Fetching jobs from portal with filters: {params}")
+            
+            response = self._get("/api/jobs", params=params)
+            response.raise_for_status()
+            
+            data = response.json()
+            
+            if data.get('success'):
+                jobs = data.get('jobs', [])
+                logger.info(f"Successfully fetched {len(jobs)} jobs from portal")
+                return jobs
+            else:
+                logger.error(f"Portal returned error: {data}")
+                return []
+                
+        except Exception as e:
+            logger.error(f"Failed to fetch jobs from portal: {e}")
+            return []
+    
+    def iter_jobs(self, filters: Optional[Dict[str, Any]] = None, page_size: int = 200) -> Iterator[Dict[str, Any]]:
+        """
+        Yield portal jobs one at a time, requesting page_size jobs per call.
+        
+        Only one page is held in memory. Unlike fetch_jobs, failures are raised
+        rather than ending the iteration, so a partial listing never looks complete.
+        """
+        params = self.build_job_query_params(filters)
+        params['page_size'] = page_size
+        
+        while True:
+            response = self._get("/api/jobs", params=dict(params))
+            response.raise_for_status()
+            data = response.json()
+            
+            if not data.get('success'):
+                raise RuntimeError(f"Portal returned error: {data.get('error', data)}")
+            
+            yield from data.get('jobs', [])
+            
+            if not data.get('next_page_token'):
+                return
+            params['page_token'] = data['next_page_token']
     
-    logger.info(f"Portal status: {status}")
+    def restore_catalog_cursor(self, cursor: str) -> bool:
+        """
+        Resume the change feed from a cursor saved with a copy of the catalog (e.g.
+        a JobCatalog snapshot), so the next fetch_catalog_changes is a delta.
+        """
+        self.catalog_cursor = cursor
+        self.catalog_etag = None
+        return True
+    
+    def fetch_catalog_changes(self) -> Optional[Dict[str, Any]]:
+        """
+        Fetch what changed in the job catalog since this fetcher's previous call.
+        
+        The first call returns the whole catalog with full=True. Later calls send the
+        portal's change cursor and return only added/updated jobs plus the IDs of
+        deleted ones (full=False), so their cost follows churn, not catalog size.
+        full=True again means the portal could not honour the cursor and the
+        caller must replace its copy. Portals without change cursors are
+        revalidated with If-None-Match instead ({"not_modified": True} when
+        unchanged). Returns None if the portal could not be reached; the cursor
+        is kept for the next attempt.
+        
+        The cursor lives on the fetcher, so each consumer of the deltas needs its own.
+        """
+        try:
+            if self.catalog_cursor:
+                response = self._get("/api/jobs", params={'updated_since': self.catalog_cursor})
+            else:
+                headers = {'If-None-Match': self.catalog_etag} if self.catalog_etag else {}
+                response = self._get("/api/jobs", headers=headers)
+            
+            if response.status_code == 304:
+                return {"not_modified": True, "full": False, "jobs": [], "deleted_job_ids": []}
+            
+            response.raise_for_status()
+            data = response.json()
+            
+            if not data.get('success'):
+                logger.error(f"Portal returned error: {data}")
+                return None
+            
+            full = data.get('full', self.catalog_cursor is None)
+            self.catalog_cursor = data.get('cursor')
+            self.catalog_etag = None if self.catalog_cursor else response.headers.get('ETag')
+            
+            jobs = data.get('jobs', [])
+            deleted_job_ids = data.get('deleted_job_ids', [])
+            if not full:
+                logger.info(f"Catalog delta: {len(jobs)} changed, {len(deleted_job_ids)} deleted")
+            return {
+                "not_modified": not full and not jobs and not deleted_job_ids,
+                "full": full,
+                "jobs": jobs,
+                "deleted_job_ids": deleted_job_ids
+            }
+            
+        except Exception as e:
+            logger.error(f"Failed to fetch job catalog changes from portal: {e}")
+            return None
     
-    # Fetch jobs from portal
-    portal_jobs = fetcher.fetch_jobs()
+    def stream_catalog_changes(self) -> Optional[Dict[str, Any]]:
+        """
+        Streaming variant of fetch_catalog_changes.
+        
+        Returns {"full": bool, "changes": iterator}, where the iterator yields
+        ("job", portal_job) and ("deleted", job_id) pairs parsed one NDJSON line at
+        a time, so the response body is never held in memory. The cursor only
+        advances once the iterator has been exhausted; an interrupted stream raises
+        and the next call resumes from the old cursor. Streams are not coalesced
+        (see _get). Returns None if the portal could not be reached.
+        """
+        params = {'format': 'ndjson'}
+        if self.catalog_cursor:
+            params['updated_since'] = self.catalog_cursor
+        
+        try:
+            response = self.session.get(f"{self.portal_url}/api/jobs", params=params, stream=True)
+            response.raise_for_status()
+        except Exception as e:
+            logger.error(f"Failed to stream job catalog from portal: {e}")
+            return None
+        
+        if not response.headers.get('Content-Type', '').startswith('application/x-ndjson'):
+            # Portal without streaming support: fall back to a buffered listing
+            response.close()
+            result = self.fetch_catalog_changes()
+            if result is None:
+                return None
+            changes = [("job", job) for job in result["jobs"]] + [("deleted", job_id) for job_id in result["deleted_job_ids"]]
+            return {"full": result["full"], "changes": iter(changes)}
+        
+        return {
+            "full": response.headers.get('X-Catalog-Full', 'true') == 'true',
+            "changes": self._iter_ndjson_changes(response, response.headers.get('X-Change-Cursor'))
+        }
     
-    if not portal_jobs:
-        logger.warning("No jobs fetched from portal")
-        return False
+    def _iter_ndjson_changes(self, response: requests.Response, cursor: Optional[str]) -> Iterator[Tuple[str, Any]]:
+        with response:
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                record = json.loads(line)
+                if "job" in record:
+                    yield "job", record["job"]
+                elif "deleted_job_id" in record:
+                    yield "deleted", record["deleted_job_id"]
+        self.catalog_cursor = cursor
     
-    # Convert and store jobs
-    added_count = 0
-    updated_count = 0
+    def get_job_details(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get detailed information about a specific job."""
+        try:
+            response = self._get(f"/api/jobs/{job_id}")
+            response.raise_for_status()
+            
+            data = response.json()
+            
+            if data.get('success'):
+                return data.get('job')
+            else:
+                logger.error(f"Failed to get job details: {data}")
+                return None
+                
+        except Exception as e:
+            logger.error(f"Failed to get job details for {job_id}: {e}")
+            return None
     
-    for portal_job in portal_jobs:
+    def submit_application(self, job_id: str, application_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Submit an application to a job through the portal.
+        
+        Failures that never got a portal answer carry retryable=True, like
+        submit_applications' results.
+        """
+        print(f"REAL JOBFETCHER CALLED: Submitting to job {job_id}")
         try:
-            # Convert to internal format
-            internal_job = fetcher.convert_portal_job_to_internal_format(portal_job)
+            logger.info(f"Submitting application to job {job_id}")
+            
+            response = self.session.post(
+                f"{self.portal_url}/api/jobs/{job_id}/apply",
+                json=application_data,
+                headers={'Content-Type': 'application/json'}
+            )
             
-            # Check if job already exists
-            existing_job = None
+            data = response.json()
+            
+            if response.status_code == 200 and data.get('success'):
+                logger.info(f"Application submitted successfully: {data.get('application_id')}")
+                print(f"REAL JOBFETCHER SUCCESS: Receipt {data.get('receipt_id')}")
+                return {
+                    "success": True,
+                    "application_id": data.get('application_id'),
+                    "receipt_id": data.get('receipt_id'),
+                    "message": data.get('message'),
+                    "status": "submitted",
+                    "receipt": data.get('receipt')
+                }
+            else:
+                logger.error(f"Application submission failed: {data}")
+                print(f"REAL JOBFETCHER FAILED: {data}")
+                return {
+                    "success": False,
+                    "error": data.get('error', 'Unknown error'),
+                    "status": "failed"
+                }
+                
+        except Exception as e:
+            logger.error(f"Failed to submit application to {job_id}: {e}")
+            print(f"REAL JOBFETCHER EXCEPTION: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "status": "failed",
+                "retryable": True  # No portal answer; safe to resubmit
+            }
+    
+    def submit_applications(self, applicant: Dict[str, Any], applications: List[Dict[str, Any]],
+                            batch_size: int = 50) -> List[Dict[str, Any]]:
+        """
+        Submit many applications with POST /api/applications/batch.
+        
+        applicant holds the fields shared by every application (sent once per batch);
+        each entry of applications has a job_id plus its per-job overrides (e.g.
+        cover_letter). Returns one result per entry, in order, shaped like
+        submit_application's plus the job_id. Results of batches that never got
+        a portal answer carry retryable=True. Portals without the batch endpoint
+        get one request per application.
+        """
+        results = []
+        for start in range(0, len(applications), batch_size):
+            chunk = applications[start:start + batch_size]
             try:
-                with db.get_connection() as conn:
-                    cursor = conn.cursor()
-                    cursor.execute("SELECT * FROM job_listings WHERE job_id = ?", (internal_job["job_id"],))
-                    existing_job = cursor.fetchone()
+                logger.info(f"Submitting batch of {len(chunk)} applications")
+                response = self.session.post(
+                    f"{self.portal_url}/api/applications/batch",
+                    json={"applicant": applicant, "applications": chunk}
+                )
+                
+                if response.status_code in (404, 405):
+                    logger.warning("Portal has no batch endpoint, submitting applications one by one")
+                    for item in chunk:
+                        overrides = {key: value for key, value in item.items() if key != 'job_id'}
+                        result = self.submit_application(item['job_id'], {**applicant, **overrides})
+                        results.append({**result, "job_id": item['job_id']})
+                    continue
+                
+                response.raise_for_status()
+                data = response.json()
+                
+                item_results = data.get('results', [])
+                for index, item in enumerate(chunk):
+                    item_result = item_results[index] if index < len(item_results) else {"error": "No result returned for this application"}
+                    if item_result.get('success'):
+                        results.append({
+                            "success": True,
+                            "job_id": item['job_id'],
+                            "application_id": item_result.get('application_id'),
+                            "receipt_id": item_result.get('receipt_id'),
+                            "message": item_result.get('message'),
+                            "status": "submitted",
+                            "receipt": item_result.get('receipt')
+                        })
+                    else:
+                        results.append({
+                            "success": False,
+                            "job_id": item['job_id'],
+                            "error": item_result.get('error', 'Unknown error'),
+                            "status": "failed"
+                        })
+                
+                logger.info(f"Batch submitted: {data.get('submitted', 0)} succeeded, {data.get('failed', 0)} failed")
+                
             except Exception as e:
-                logger.error(f"Error checking existing job: {e}")
+                logger.error(f"Failed to submit application batch: {e}")
+                for item in chunk:
+                    results.append({
+                        "success": False,
+                        "job_id": item['job_id'],
+                        "error": str(e),
+                        "status": "failed",
+                        "retryable": True
+                    })
+        
+        return results
+    
+    def get_application_status(self, application_id: str = None, receipt_id: str = None) -> Optional[Dict[str, Any]]:
+        """Get application status by application ID or receipt ID."""
+        try:
+            if receipt_id:
+                response = self._get(f"/api/applications/receipt/{receipt_id}")
+            elif application_id:
+                response = self._get(f"/api/applications/{application_id}")
+            else:
+                logger.error("Either application_id or receipt_id must be provided")
+                return None
+            
+            response.raise_for_status()
+            data = response.json()
+            
+            if data.get('success'):
+                return data.get('application')
+            else:
+                logger.error(f"Failed to get application status: {data}")
+                return None
+                
+        except Exception as e:
+            logger.error(f"Failed to get application status: {e}")
+            return None
+    
+    def get_companies(self) -> List[Dict[str, Any]]:
+        """Get all companies from the portal."""
+        try:
+            response = self._get("/api/companies")
+            response.raise_for_status()
+            
+            data = response.json()
             
-            if existing_job:
-                # Update existing job
-                try:
-                    # Update logic would go here
-                    updated_count += 1
-                    logger.info(f"Updated job: {internal_job['job_id']}")
-                except Exception as e:
-                    logger.error(f"Failed to update job {internal_job['job_id']}: {e}")
+            if data.get('success'):
+                companies = data.get('companies', [])
+                logger.info(f"Successfully fetched {len(companies)} companies from portal")
+                return companies
             else:
-                # Add new job
-                try:
-                    db.add_job_listing(internal_job)
-                    added_count += 1
-                    logger.info(f"Added new job: {internal_job['job_id']} - {internal_job['company']} - {internal_job['role']}")
-                except Exception as e:
-                    logger.error(f"Failed to add job {internal_job['job_id']}: {e}")
-                    
+                logger.error(f"Portal returned error: {data}")
+                return []
+                
         except Exception as e:
-            logger.error(f"Failed to process job: {e}")
+            logger.error(f"Failed to fetch companies from portal: {e}")
+            return []
+
+def sync_jobs_from_portal(db=None) -> Optional[Dict[str, int]]:
+    """
+    Sync jobs from the sandbox portal to our internal database.
+    
+    Uses a single bulk upsert with content-hash change detection and returns
+    the added/changed/removed counts, or None if the portal could not be synced.
+    """
+    if db is None:
+        from database import PersistentDatabase
+        db = PersistentDatabase()
+    
+    fetcher = JobFetcher()
+    
+    # Check portal status (background health monitor, no round trip)
+    if not portal_health.is_available(fetcher.portal_url):
+        logger.error(f"Portal is not available: {portal_health.snapshot(fetcher.portal_url)}")
+        return None
+    
+    # Stream jobs page by page into the converter and the bulk upsert (skip malformed entries)
+    def internal_jobs():
+        for portal_job in fetcher.iter_jobs():
+            internal_job = fetcher.convert_portal_job_to_internal_format(portal_job)
+            if not internal_job.get("job_id") or not internal_job.get("company") or not internal_job.get("role"):
+                logger.error(f"Skipping malformed portal job: {portal_job.get('job_id')}")
+                continue
+            yield internal_job
+    
+    try:
+        jobs = internal_jobs()
+        first_job = next(jobs, None)
+        if first_job is None:
+            logger.warning("No jobs fetched from portal")
+            return None
+        counts = db.sync_job_listings(itertools.chain([first_job], jobs), source=fetcher.portal_url)
+    except Exception as e:
+        logger.error(f"Failed to sync jobs from portal: {e}")
+        return None
     
-    logger.info(f"Job sync complete: {added_count} added, {updated_count} updated")
-    return True
+    logger.info(
+        f"Job sync complete: {counts['added']} added, {counts['changed']} changed, "
+        f"{counts['removed']} removed, {counts['unchanged']} unchanged"
+    )
+    return counts
 
 if __name__ == "__main__":
     # Test the job fetcher
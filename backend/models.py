@@ -159,6 +159,14 @@ class SaveProfileResponse(BaseModel):
     profile_id: Optional[int] = None
 
 
+class ProfilePatchResponse(BaseModel):
+    """Response for a JSON Patch profile update."""
+    success: bool
+    version: int
+    changed_fields: List[str]
+    history_cleared: bool
+
+
 class ProfileValidationResponse(BaseModel):
     """Response for profile validation."""
     success: bool
@@ -193,7 +201,7 @@ class JobListingResponse(BaseModel):
     min_experience_years: int
     description: Optional[str] = None
     salary_range: Optional[str] = None
-    job_type: str
+    job_type: Optional[str] = None
     posted_date: Optional[str] = None
     expires_date: Optional[str] = None
     created_at: str
@@ -206,6 +214,16 @@ class JobListingsResponse(BaseModel):
     total_count: int
 
 
+class JobSearchResponse(BaseModel):
+    """Paginated full-text job search results (BM25 ordered)."""
+    success: bool
+    query: str
+    jobs: List[JobListingResponse]
+    total_count: int
+    limit: int
+    offset: int
+
+
 # ==================== AUTOPILOT ====================
 
 class RunAutopilotRequest(BaseModel):
@@ -232,6 +250,13 @@ class AutopilotStatusResponse(BaseModel):
     completed_at: Optional[str] = None
 
 
+class AutopilotRunsResponse(BaseModel):
+    """Page of autopilot runs (newest first)."""
+    success: bool
+    runs: List[AutopilotStatusResponse]
+    next_cursor: Optional[str] = None  # Pass as `cursor` to fetch the next page
+
+
 # ==================== APPLICATION HISTORY ====================
 
 class ApplicationHistoryEntry(BaseModel):
@@ -243,6 +268,7 @@ class ApplicationHistoryEntry(BaseModel):
     role: str
     status: str
     skip_reason: Optional[str] = None
+    reason_code: int = 0  # core.reason_codes.ReasonCode
     receipt_id: Optional[str] = None
     timestamp: float
     created_at: str
@@ -254,6 +280,7 @@ class ApplicationHistoryResponse(BaseModel):
     history: List[ApplicationHistoryEntry]
     total_count: int
     stats: Dict[str, int]
+    next_cursor: Optional[str] = None  # Pass as `cursor` to fetch the next page
 
 
 class DeleteHistoryRequest(BaseModel):
@@ -262,6 +289,19 @@ class DeleteHistoryRequest(BaseModel):
     history_id: int
 
 
+# ==================== ANALYTICS ====================
+
+class AnalyticsTimeseriesResponse(BaseModel):
+    """Application outcome counts per time bucket (served from rollups)."""
+    success: bool
+    scope: str  # "user" or "platform"
+    granularity: str
+    group_by: Optional[str] = None
+    since: str
+    until: str
+    series: List[Dict[str, Any]]
+
+
 # ==================== DASHBOARD ====================
 
 class UserDashboardResponse(BaseModel):
@@ -0,0 +1,187 @@
+"""
+Background health monitor for the configured job portals.
+Probes each portal on an interval so request paths read an in-memory flag instead of making a status call.
+"""
+import os
+import logging
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+import requests
+
+from backend.http_client import LatencyHistogram, normalize_portal_url
+
+logger = logging.getLogger(__name__)
+
+
+class PortalHealth:
+    """Latest probe results for one portal."""
+
+    def __init__(self, portal_url: str):
+        self.portal_url = portal_url
+        self.available = False
+        self.probes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.checked_at = 0.0
+        self.last_ok_at = 0.0
+        self.changed_at = 0.0  # Last availability flip
+        self.latency_seconds: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.portal_stats: Dict[str, Any] = {}
+        self.latency = LatencyHistogram()
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            "portal_url": self.portal_url,
+            "status": "active" if self.available else "unavailable",
+            "latency_ms": round(self.latency_seconds * 1000, 1) if self.latency_seconds is not None else None,
+            "age_seconds": round(now - self.checked_at, 1) if self.checked_at else None,
+            "last_ok": self.last_ok_at or None,
+            "since": self.changed_at or None,
+            "probes": self.probes,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "last_error": self.last_error,
+            "stats": self.portal_stats,
+            "latency": self.latency.snapshot()
+        }
+
+
+class PortalHealthMonitor:
+    """
+    Probes GET /api/portal/status on every configured portal every interval_seconds
+    from a daemon thread and keeps the result in memory.
+
+    is_available() is a dictionary read; only the very first check of a portal
+    probes synchronously. A portal is marked down after failure_threshold failed
+    probes in a row and up again after one successful probe. Probes use their own
+    session without transport retries, so each one measures a single round trip.
+    """
+
+    def __init__(self, portal_urls: List[str], interval_seconds: float = 15.0,
+                 timeout_seconds: float = 3.0, failure_threshold: int = 2):
+        self.interval_seconds = interval_seconds
+        self.timeout_seconds = timeout_seconds
+        self.failure_threshold = failure_threshold
+
+        self.lock = threading.Lock()
+        self.portals: Dict[str, PortalHealth] = {url: PortalHealth(url) for url in portal_urls}
+        self.session = requests.Session()
+
+        self.stop_event = threading.Event()
+        self.prober: Optional[threading.Thread] = None
+
+    def add_portal(self, portal_url: str):
+        """Start monitoring another portal (no-op if it is already monitored)."""
+        with self.lock:
+            self.portals.setdefault(portal_url, PortalHealth(portal_url))
+
+    def is_available(self, portal_url: str) -> bool:
+        """Whether a portal answered its latest probes. Unknown portals are added and probed once."""
+        self._ensure_prober()
+        with self.lock:
+            health = self.portals.get(portal_url)
+        if health is None or not health.checked_at:
+            self.add_portal(portal_url)
+            self.probe(portal_url)
+        with self.lock:
+            return self.portals[portal_url].available
+
+    def snapshot(self, portal_url: Optional[str] = None) -> Dict[str, Any]:
+        """Latest probe results, for one portal or all of them, without contacting any portal."""
+        self._ensure_prober()
+        with self.lock:
+            if portal_url is not None:
+                health = self.portals.get(portal_url)
+                return health.snapshot() if health else {"portal_url": portal_url, "status": "unknown"}
+            return {url: health.snapshot() for url, health in self.portals.items()}
+
+    def probe(self, portal_url: str) -> bool:
+        """Probe one portal now and record the outcome. Returns the resulting availability."""
+        started = time.perf_counter()
+        error, portal_stats = None, {}
+        try:
+            response = self.session.get(f"{portal_url}/api/portal/status", timeout=self.timeout_seconds)
+            response.raise_for_status()
+            data = response.json()
+            if data.get("status") != "active":
+                error = f"Portal reported status {data.get('status')!r}"
+            portal_stats = data.get("stats", {})
+        except Exception as e:
+            error = str(e)
+        elapsed = time.perf_counter() - started
+
+        with self.lock:
+            health = self.portals.setdefault(portal_url, PortalHealth(portal_url))
+            was_available = health.available
+            health.probes += 1
+            health.checked_at = time.time()
+            health.latency_seconds = elapsed
+            health.latency.observe(elapsed)
+
+            if error is None:
+                health.consecutive_failures = 0
+                health.last_error = None
+                health.last_ok_at = health.checked_at
+                health.portal_stats = portal_stats
+                health.available = True
+            else:
+                health.failures += 1
+                health.consecutive_failures += 1
+                health.last_error = error
+                # A never-reached portal is down right away; a known-good one after repeated failures
+                if not health.last_ok_at or health.consecutive_failures >= self.failure_threshold:
+                    health.available = False
+
+            if health.available != was_available:
+                health.changed_at = health.checked_at
+                log = logger.info if health.available else logger.warning
+                log(f"Portal {portal_url} is {'up' if health.available else 'down'}"
+                    + (f": {error}" if error else f" ({elapsed * 1000:.0f} ms)"))
+            return health.available
+
+    def probe_all(self):
+        """Probe every monitored portal once, concurrently."""
+        with self.lock:
+            urls = list(self.portals)
+        threads = [threading.Thread(target=self.probe, args=(url,), daemon=True) for url in urls]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def close(self):
+        """Stop the background prober."""
+        self.stop_event.set()
+
+    def _ensure_prober(self):
+        with self.lock:
+            if self.prober is not None or self.stop_event.is_set():
+                return
+            self.prober = threading.Thread(target=self._probe_loop, name="portal-health-monitor", daemon=True)
+        self.prober.start()
+
+    def _probe_loop(self):
+        while not self.stop_event.is_set():
+            try:
+                self.probe_all()
+            except Exception as e:
+                logger.error(f"Portal health probe failed: {e}")
+            self.stop_event.wait(self.interval_seconds)
+
+
+def configured_portal_urls() -> List[str]:
+    """Portals from PORTAL_URLS (comma-separated), defaulting to SANDBOX_URL."""
+    urls = os.environ.get("PORTAL_URLS") or os.environ.get("SANDBOX_URL", "http://localhost:5001")
+    return [normalize_portal_url(url) for url in urls.split(",") if url.strip()]
+
+
+portal_health = PortalHealthMonitor(
+    configured_portal_urls(),
+    interval_seconds=float(os.environ.get("PORTAL_HEALTH_INTERVAL_SECONDS", 15)),
+    timeout_seconds=float(os.environ.get("PORTAL_HEALTH_TIMEOUT_SECONDS", 3)),
+    failure_threshold=int(os.environ.get("PORTAL_HEALTH_FAILURE_THRESHOLD", 2))
+)
@@ -0,0 +1,77 @@
+"""
+In-process LRU cache of parsed user profiles.
+Entries carry the profile row version so other processes' writes are detected.
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+
+class ProfileCache:
+    """
+    Memory-bounded LRU cache of parsed profiles keyed by user_id.
+
+    Each entry stores the user_profiles.version it was read at. Callers compare it
+    against the current version in the database before trusting a hit, which keeps
+    multi-worker deployments consistent without any shared cache process.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries: "OrderedDict[int, Tuple[int, Dict[str, Any], int]]" = OrderedDict()  # user_id -> (version, profile, size)
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """Return (version, profile) for a cached user, or None."""
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[0], entry[1]
+
+    def put(self, user_id: int, version: int, profile: Dict[str, Any], size: int):
+        """Cache a parsed profile; size is its approximate footprint in bytes."""
+        if size > self.max_bytes:
+            return
+
+        with self.lock:
+            self._remove(user_id)
+            self.entries[user_id] = (version, profile, size)
+            self.current_bytes += size
+
+            while self.current_bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self.entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+
+    def invalidate(self, user_id: int):
+        """Drop a user's cached profile (call after any write)."""
+        with self.lock:
+            self._remove(user_id)
+
+    def clear(self):
+        """Drop all cached profiles."""
+        with self.lock:
+            self.entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Cache size and hit/miss counters."""
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+    def _remove(self, user_id: int):
+        entry = self.entries.pop(user_id, None)
+        if entry is not None:
+            self.current_bytes -= entry[2]
@@ -0,0 +1,183 @@
+"""
+Partial profile updates (RFC 6902 JSON Patch) and field-level change notifications.
+"""
+import copy
+import threading
+from typing import Dict, Any, List, Callable, Set
+
+
+# Top-level profile fields that feed job ranking and the apply/skip decision.
+# Changing any of them invalidates ranking caches and resets application history;
+# edits to other fields (basic_info, certificates...) do neither.
+RANKING_FIELDS = frozenset({"skill_vocab", "skills", "constraints"})
+
+# Bookkeeping fields that never count as a change
+IGNORED_FIELDS = frozenset({"last_modified"})
+
+
+class JsonPatchError(ValueError):
+    """A patch operation is malformed or cannot be applied to the document."""
+
+
+class ProfileVersionConflict(RuntimeError):
+    """The profile changed since the version the client based its patch on."""
+
+
+def _parse_pointer(pointer: str) -> List[str]:
+    """Split an RFC 6901 JSON pointer into unescaped reference tokens."""
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise JsonPatchError(f"Invalid JSON pointer: {pointer!r}")
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+def _resolve_parent(document: Any, tokens: List[str]) -> Any:
+    """Walk to the container holding the last token."""
+    target = document
+    for token in tokens[:-1]:
+        target = _child(target, token)
+    return target
+
+
+def _child(container: Any, token: str) -> Any:
+    if isinstance(container, dict):
+        if token not in container:
+            raise JsonPatchError(f"Path segment {token!r} not found")
+        return container[token]
+    if isinstance(container, list):
+        return container[_list_index(container, token)]
+    raise JsonPatchError(f"Cannot descend into {type(container).__name__} at {token!r}")
+
+
+def _list_index(container: list, token: str, allow_end: bool = False) -> int:
+    if allow_end and token == "-":
+        return len(container)
+    if not token.isdigit() or (len(token) > 1 and token.startswith("0")):
+        raise JsonPatchError(f"Invalid array index {token!r}")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise JsonPatchError(f"Array index {index} out of range")
+    return index
+
+
+def _get(document: Any, pointer: str) -> Any:
+    target = document
+    for token in _parse_pointer(pointer):
+        target = _child(target, token)
+    return target
+
+
+def _add(document: Any, pointer: str, value: Any) -> Any:
+    tokens = _parse_pointer(pointer)
+    if not tokens:
+        return value
+    parent = _resolve_parent(document, tokens)
+    if isinstance(parent, dict):
+        parent[tokens[-1]] = value
+    elif isinstance(parent, list):
+        parent.insert(_list_index(parent, tokens[-1], allow_end=True), value)
+    else:
+        raise JsonPatchError(f"Cannot add to {type(parent).__name__} at {pointer!r}")
+    return document
+
+
+def _remove(document: Any, pointer: str) -> Any:
+    tokens = _parse_pointer(pointer)
+    if not tokens:
+        raise JsonPatchError("Cannot remove the whole document")
+    parent = _resolve_parent(document, tokens)
+    if isinstance(parent, dict):
+        if tokens[-1] not in parent:
+            raise JsonPatchError(f"Path {pointer!r} not found")
+        return parent.pop(tokens[-1])
+    if isinstance(parent, list):
+        return parent.pop(_list_index(parent, tokens[-1]))
+    raise JsonPatchError(f"Cannot remove from {type(parent).__name__} at {pointer!r}")
+
+
+def apply_json_patch(document: Dict[str, Any], operations: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Apply RFC 6902 operations (add, remove, replace, move, copy, test) to a document.
+
+    The input document is not modified. The patch is atomic: any failing operation
+    raises JsonPatchError and nothing is applied.
+    """
+    if not isinstance(operations, list):
+        raise JsonPatchError("Patch must be a list of operations")
+
+    result = copy.deepcopy(document)
+    for operation in operations:
+        if not isinstance(operation, dict) or "op" not in operation or "path" not in operation:
+            raise JsonPatchError(f"Invalid patch operation: {operation!r}")
+        op, path = operation["op"], operation["path"]
+
+        if op in ("add", "replace", "test") and "value" not in operation:
+            raise JsonPatchError(f"'{op}' operation requires a value")
+        if op in ("move", "copy") and "from" not in operation:
+            raise JsonPatchError(f"'{op}' operation requires 'from'")
+
+        if op == "add":
+            result = _add(result, path, copy.deepcopy(operation["value"]))
+        elif op == "remove":
+            _remove(result, path)
+        elif op == "replace":
+            _get(result, path)  # Target must exist
+            if _parse_pointer(path):
+                _remove(result, path)
+            result = _add(result, path, copy.deepcopy(operation["value"]))
+        elif op == "move":
+            if path.startswith(operation["from"] + "/"):
+                raise JsonPatchError("Cannot move a value into one of its children")
+            result = _add(result, path, _remove(result, operation["from"]))
+        elif op == "copy":
+            result = _add(result, path, copy.deepcopy(_get(result, operation["from"])))
+        elif op == "test":
+            if _get(result, path) != operation["value"]:
+                raise JsonPatchError(f"Test failed at {path!r}")
+        else:
+            raise JsonPatchError(f"Unknown patch operation '{op}'")
+
+    if not isinstance(result, dict):
+        raise JsonPatchError("Patched profile must remain a JSON object")
+    return result
+
+
+def changed_fields(old: Dict[str, Any], new: Dict[str, Any]) -> Set[str]:
+    """Top-level profile fields whose value differs between two documents."""
+    return {
+        field for field in set(old) | set(new)
+        if field not in IGNORED_FIELDS and old.get(field) != new.get(field)
+    }
+
+
+class ProfileChangePublisher:
+    """
+    In-process publisher of profile field changes.
+
+    Subscribers are called with (user_id, changed_fields) after a profile write is
+    committed. Caches derived from the profile subscribe here and drop only what the
+    changed fields affect.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers: List[Callable[[int, Set[str]], None]] = []
+
+    def subscribe(self, callback: Callable[[int, Set[str]], None]):
+        with self.lock:
+            self.subscribers.append(callback)
+
+    def publish(self, user_id: int, fields: Set[str]):
+        if not fields:
+            return
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for callback in subscribers:
+            callback(user_id, set(fields))
+
+
+def affects_ranking(fields: Set[str]) -> bool:
+    """Whether a set of changed fields invalidates job rankings."""
+    return bool(fields & RANKING_FIELDS)
+
@@ -0,0 +1,74 @@
+"""
+In-process cache of AI job rankings per user.
+Entries are keyed by the ranking-relevant profile fields and the job catalog version they were computed from.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+from backend.profile_changes import RANKING_FIELDS
+
+
+def ranking_key(profile_data: Dict[str, Any], catalog_version: int) -> str:
+    """
+    Fingerprint of everything a ranking depends on.
+
+    Only RANKING_FIELDS of the profile are included, so basic_info edits keep the
+    cached ranking while skill or constraint edits (from any worker) miss it. The
+    jobs are represented by the process-local JobCatalog version.
+    """
+    ranking_inputs = {field: profile_data.get(field) for field in sorted(RANKING_FIELDS)}
+    payload = json.dumps([ranking_inputs, catalog_version], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RankingCache:
+    """
+    LRU cache holding the latest ranked job list per user.
+
+    Ranked jobs are copied on the way in and out because callers annotate them
+    with per-request status.
+    """
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries: "OrderedDict[int, Tuple[str, List[Dict[str, Any]]]]" = OrderedDict()  # user_id -> (key, ranked_jobs)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Return a copy of the cached ranking if it was computed for this key, else None."""
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is None or entry[0] != key:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(user_id)
+            self.hits += 1
+            return [dict(job) for job in entry[1]]
+
+    def put(self, user_id: int, key: str, ranked_jobs: List[Dict[str, Any]]):
+        """Cache a user's ranking, replacing any previous one."""
+        with self.lock:
+            self.entries.pop(user_id, None)
+            self.entries[user_id] = (key, [dict(job) for job in ranked_jobs])
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        """Drop a user's cached ranking."""
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+    def stats(self) -> Dict[str, int]:
+        """Cache size and hit/miss counters."""
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses
+            }
@@ -13,11 +13,13 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Any
 import logging
 
-from backend.database import PersistentDatabase
+from backend.database import PersistentDatabase, decode_json_column, DEFAULT_RETENTION_DAYS
 from backend.ai_agents import rank_jobs_for_user, convert_user_profile_to_student_artifact_pack
 from backend.engine import run_autopilot
 from core.tracker import ApplicationTracker
+from core.reason_codes import ReasonCode
 from backend.job_fetcher import JobFetcher
+from backend.portal_health import portal_health
 
 # Configure logging to file
 os.makedirs('backend/logs', exist_ok=True)
@@ -54,6 +56,7 @@ class AutonomousAIAgent:
         schedule.every().day.at("09:00").do(self.run_daily_autopilot)  # Morning
         schedule.every().day.at("14:00").do(self.run_daily_autopilot)  # Afternoon
         schedule.every().day.at("18:00").do(self.run_daily_autopilot)  # Evening
+        schedule.every().day.at("03:00").do(self.run_database_maintenance)  # Quiet hours
         
         self.running = True
         
@@ -92,6 +95,34 @@ class AutonomousAIAgent:
         except Exception as e:
             logger.error(f"Daily autopilot failed: {e}")
             
+    def run_database_maintenance(self):
+        """
+        Housekeeping: purge history hidden by resets, archive history and runs past the
+        retention horizon, move legacy inline snapshots into the blob store, drop
+        unreferenced blobs, expired login sessions and old hourly rollups, then vacuum/analyze.
+        """
+        logger.info("🧹 Running database maintenance...")
+        
+        try:
+            retention_days = int(os.environ.get("HISTORY_RETENTION_DAYS", DEFAULT_RETENTION_DAYS))
+            purged = self.db.purge_stale_history_epochs()
+            archived = self.db.archive_expired_rows(retention_days)
+            migrated = self.db.migrate_json_columns_to_blobs()
+            removed = self.db.collect_unreferenced_blobs()
+            expired_sessions = self.db.delete_expired_sessions()
+            pruned_rollups = self.db.prune_hourly_rollups()
+            storage = self.db.optimize_storage()
+            logger.info(
+                f"✅ Maintenance complete: {purged} reset history entries purged, "
+                f"{archived['application_history']} history entries and "
+                f"{archived['autopilot_runs']} runs archived, {migrated} snapshots moved to blob store, "
+                f"{removed} unreferenced blobs removed, {expired_sessions} expired sessions removed, "
+                f"{pruned_rollups} hourly rollup buckets pruned, "
+                f"{storage['freed_pages']} pages freed"
+            )
+        except Exception as e:
+            logger.error(f"Database maintenance failed: {e}")
+            
     def get_eligible_users(self) -> List[Dict[str, Any]]:
         """Get users eligible for autonomous autopilot."""
         eligible_users = []
@@ -109,7 +140,7 @@ class AutonomousAIAgent:
             
             for row in cursor.fetchall():
                 user_id, email, profile_data_json, student_id = row
-                profile_data = json.loads(profile_data_json)
+                profile_data = decode_json_column(profile_data_json)
                 
                 # Check if user is eligible for autopilot today
                 if self.is_user_eligible_today(user_id, profile_data):
@@ -129,20 +160,9 @@ class AutonomousAIAgent:
         constraints = profile_data.get('constraints', {})
         max_apps_per_day = constraints.get('max_apps_per_day', 5)
         
-        # Check how many applications were made today
-        today = datetime.now().date()
-        today_start = datetime.combine(today, datetime.min.time()).timestamp()
-        today_end = datetime.combine(today, datetime.max.time()).timestamp()
-        
-        with self.db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT COUNT(*) FROM application_history 
-                WHERE user_id = ? AND timestamp >= ? AND timestamp <= ?
-                AND status IN ('submitted', 'retried')
-            """, (user_id, today_start, today_end))
-            
-            applications_today = cursor.fetchone()[0]
+        # Check how many applications were made today (current history epoch only)
+        today_start = datetime.combine(datetime.now().date(), datetime.min.time()).timestamp()
+        applications_today = self.db.count_user_applications_since(user_id, today_start)
             
         # User is eligible if they haven't reached their daily limit
         remaining_apps = max_apps_per_day - applications_today
@@ -159,14 +179,13 @@ class AutonomousAIAgent:
         logger.info(f"🎯 Processing autopilot for user {user_id} ({user_data['email']})")
         
         try:
-            # Check if sandbox portal is available
-            portal_status = self.job_fetcher.check_portal_status()
-            if portal_status.get("status") != "active":
+            # Check if sandbox portal is available (background health monitor, no round trip)
+            if not portal_health.is_available(self.job_fetcher.portal_url):
                 logger.warning(f"❌ Sandbox portal not available - cannot process applications")
-                logger.warning(f"Portal status: {portal_status}")
+                logger.warning(f"Portal status: {portal_health.snapshot(self.job_fetcher.portal_url)}")
                 return
             
-            logger.info(f"✅ Sandbox portal active: {portal_status.get('stats', {})}")
+            logger.info(f"✅ Sandbox portal active: {portal_health.snapshot(self.job_fetcher.portal_url).get('stats', {})}")
             
             # Fetch fresh jobs from sandbox portal
             portal_jobs = self.job_fetcher.fetch_jobs()
@@ -183,11 +202,8 @@ class AutonomousAIAgent:
                 all_jobs.append(internal_job)
             
             # Get application history to avoid reapplying
-            application_history = self.db.get_user_application_history(user_id, limit=1000)
-            applied_job_ids = set()
-            for app in application_history:
-                # Exclude ALL previously processed jobs to avoid duplicates
-                applied_job_ids.add(app["job_id"])
+            # Exclude ALL previously processed jobs to avoid duplicates
+            applied_job_ids = self.db.get_user_job_id_sets(user_id)["processed"]
             
             logger.info(f"📝 User {user_id} has applied to {len(applied_job_ids)} jobs previously")
             
@@ -321,19 +337,20 @@ class AutonomousAIAgent:
                 
                 if random.random() < demo_skip_chance:
                     skip_reasons = [
-                        f"Company '{job['company']}' not in preferred list",
-                        f"Location '{job.get('location')}' not preferred",
-                        f"Salary range '{job.get('salary_range')}' below expectations",
-                        f"Job requires {job.get('min_experience_years', 0)} years experience",
-                        "Application deadline too soon",
-                        "Company culture mismatch"
+                        (f"Company '{job['company']}' not in preferred list", ReasonCode.PREFERENCE_MISMATCH),
+                        (f"Location '{job.get('location')}' not preferred", ReasonCode.LOCATION_MISMATCH),
+                        (f"Salary range '{job.get('salary_range')}' below expectations", ReasonCode.PREFERENCE_MISMATCH),
+                        (f"Job requires {job.get('min_experience_years', 0)} years experience", ReasonCode.EXPERIENCE_TOO_HIGH),
+                        ("Application deadline too soon", ReasonCode.PREFERENCE_MISMATCH),
+                        ("Company culture mismatch", ReasonCode.PREFERENCE_MISMATCH)
                     ]
-                    reason = random.choice(skip_reasons)
+                    reason, reason_code = random.choice(skip_reasons)
                     logger.info(f"⏭️ Skipping {job['company']} - {job['role']} ({reason})")
                     applications.append({
                         "job_id": job['job_id'],
                         "status": "skipped",
                         "reason": reason,
+                        "reason_code": reason_code,
                         "timestamp": time.time()
                     })
                     continue
@@ -345,6 +362,7 @@ class AutonomousAIAgent:
                         "job_id": job['job_id'],
                         "status": "skipped",
                         "reason": f"Company '{job['company']}' is in blocked list",
+                        "reason_code": ReasonCode.BLOCKED_COMPANY,
                         "timestamp": time.time()
                     })
                     continue
@@ -356,6 +374,7 @@ class AutonomousAIAgent:
                         "job_id": job['job_id'],
                         "status": "skipped",
                         "reason": f"Location '{job.get('location')}' not in preferred locations",
+                        "reason_code": ReasonCode.LOCATION_MISMATCH,
                         "timestamp": time.time()
                     })
                     continue
@@ -370,6 +389,7 @@ class AutonomousAIAgent:
                         "job_id": job['job_id'],
                         "status": "skipped",
                         "reason": f"Requires {job_min_experience} years experience, user has {user_experience}",
+                        "reason_code": ReasonCode.EXPERIENCE_TOO_HIGH,
                         "timestamp": time.time()
                     })
                     continue
@@ -385,6 +405,7 @@ class AutonomousAIAgent:
                         "job_id": job['job_id'],
                         "status": "skipped",
                         "reason": f"Only {len(matching_skills)} matching skills out of {len(job_skills)} required",
+                        "reason_code": ReasonCode.SKILL_MISMATCH,
                         "timestamp": time.time()
                     })
                     continue
@@ -404,6 +425,7 @@ class AutonomousAIAgent:
                         "job_id": job['job_id'],
                         "status": "failed",
                         "reason": reason,
+                        "reason_code": ReasonCode.PORTAL_ERROR,
                         "timestamp": time.time()
                     })
                     continue
@@ -442,6 +464,7 @@ class AutonomousAIAgent:
                             "job_id": job['job_id'],
                             "status": "failed",
                             "reason": result.get('error', 'Unknown error'),
+                            "reason_code": ReasonCode.SUBMISSION_FAILED,
                             "timestamp": time.time()
                         })
                 
@@ -454,6 +477,7 @@ class AutonomousAIAgent:
                     "job_id": job['job_id'],
                     "status": "failed",
                     "reason": str(e),
+                    "reason_code": ReasonCode.UNEXPECTED_ERROR,
                     "timestamp": time.time()
                 })
         
@@ -461,19 +485,8 @@ class AutonomousAIAgent:
             
     def get_today_application_count(self, user_id: int) -> int:
         """Get number of applications made today by user."""
-        today = datetime.now().date()
-        today_start = datetime.combine(today, datetime.min.time()).timestamp()
-        today_end = datetime.combine(today, datetime.max.time()).timestamp()
-        
-        with self.db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT COUNT(*) FROM application_history 
-                WHERE user_id = ? AND timestamp >= ? AND timestamp <= ?
-                AND status IN ('submitted', 'retried')
-            """, (user_id, today_start, today_end))
-            
-            return cursor.fetchone()[0]
+        today_start = datetime.combine(datetime.now().date(), datetime.min.time()).timestamp()
+        return self.db.count_user_applications_since(user_id, today_start)
             
     def convert_database_job_to_engine_format(self, db_job: Dict[str, Any]) -> Dict[str, Any]:
         """Convert database job format to engine JobListing format."""
@@ -0,0 +1,154 @@
+"""
+Persistent login sessions with an in-process read-through cache.
+Last-login and session-activity writes are buffered and flushed in batches.
+"""
+import atexit
+import hashlib
+import logging
+import secrets
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from backend.database import PersistentDatabase
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SESSION_TTL_SECONDS = 30 * 24 * 60 * 60
+
+
+def hash_token(token: str) -> str:
+    """Tokens are only ever stored as their SHA-256 hex digest."""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class SessionStore:
+    """
+    Session store backed by the user_sessions table.
+
+    Token checks are served from memory. A cached session is re-read from the
+    database after revalidate_seconds, so logouts and deactivations from other
+    workers take effect within that window. Logins and request activity are
+    buffered and written by a background thread every flush_interval seconds
+    (or once flush_batch_size entries are pending) in a single transaction.
+    """
+
+    def __init__(self, db: PersistentDatabase, ttl_seconds: float = DEFAULT_SESSION_TTL_SECONDS,
+                 revalidate_seconds: float = 60.0, flush_interval: float = 5.0,
+                 flush_batch_size: int = 500):
+        self.db = db
+        self.ttl_seconds = ttl_seconds
+        self.revalidate_seconds = revalidate_seconds
+        self.flush_interval = flush_interval
+        self.flush_batch_size = flush_batch_size
+
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.sessions: Dict[str, Tuple[int, float, float]] = {}  # token_hash -> (user_id, expires_at, validated_at)
+        self.pending_logins: Dict[int, float] = {}  # user_id -> login time
+        self.pending_touches: Dict[str, float] = {}  # token_hash -> last request time
+
+        self.stop_event = threading.Event()
+        self.flusher: Optional[threading.Thread] = None
+
+    def create(self, user_id: int) -> str:
+        """Start a session for a user and return its (unhashed) token."""
+        token = secrets.token_urlsafe(32)
+        token_hash = hash_token(token)
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+
+        self.db.create_session(token_hash, user_id, now, expires_at)
+        with self.lock:
+            self.sessions[token_hash] = (user_id, expires_at, now)
+            self.pending_logins[user_id] = now
+        self._after_buffered_write()
+        return token
+
+    def resolve(self, token: str) -> Optional[int]:
+        """Return the user ID for a live session token, or None."""
+        token_hash = hash_token(token)
+        now = time.time()
+
+        with self.lock:
+            cached = self.sessions.get(token_hash)
+        if cached is None or now - cached[2] >= self.revalidate_seconds:
+            session = self.db.get_session(token_hash)
+            if session is None:
+                with self.lock:
+                    self.sessions.pop(token_hash, None)
+                    self.pending_touches.pop(token_hash, None)
+                return None
+            expires_at = session["expires_at"]
+            if cached is not None:
+                # Activity not flushed yet has already slid the expiry forward
+                expires_at = max(expires_at, cached[1])
+            cached = (session["user_id"], expires_at, now)
+
+        user_id, expires_at, validated_at = cached
+        if expires_at <= now:
+            with self.lock:
+                self.sessions.pop(token_hash, None)
+                self.pending_touches.pop(token_hash, None)
+            return None
+
+        with self.lock:
+            self.sessions[token_hash] = (user_id, now + self.ttl_seconds, validated_at)
+            self.pending_touches[token_hash] = now
+        self._after_buffered_write()
+        return user_id
+
+    def revoke(self, token: str) -> bool:
+        """End a session. Returns True if it existed."""
+        token_hash = hash_token(token)
+        with self.lock:
+            self.sessions.pop(token_hash, None)
+            self.pending_touches.pop(token_hash, None)
+        return self.db.delete_session(token_hash)
+
+    def flush(self):
+        """Write all buffered logins and session activity in one transaction."""
+        with self.flush_lock:
+            with self.lock:
+                last_logins, self.pending_logins = self.pending_logins, {}
+                touches, self.pending_touches = self.pending_touches, {}
+                now = time.time()
+                for token_hash in [h for h, entry in self.sessions.items() if entry[1] <= now]:
+                    del self.sessions[token_hash]
+
+            if not last_logins and not touches:
+                return
+            try:
+                self.db.record_session_activity(last_logins, touches, self.ttl_seconds)
+            except Exception as e:
+                logger.error(f"Session activity flush failed: {e}")
+                with self.lock:
+                    # Requeue, keeping anything newer that arrived meanwhile
+                    for user_id, logged_in_at in last_logins.items():
+                        self.pending_logins[user_id] = max(logged_in_at, self.pending_logins.get(user_id, 0))
+                    for token_hash, seen_at in touches.items():
+                        if token_hash in self.sessions:
+                            self.pending_touches[token_hash] = max(seen_at, self.pending_touches.get(token_hash, 0))
+
+    def close(self):
+        """Stop the background flusher and write anything still buffered."""
+        self.stop_event.set()
+        if self.flusher is not None and self.flusher is not threading.current_thread():
+            self.flusher.join(timeout=self.flush_interval + 1)
+        self.flush()
+
+    def _after_buffered_write(self):
+        with self.lock:
+            pending = len(self.pending_logins) + len(self.pending_touches)
+            start_flusher = self.flusher is None and not self.stop_event.is_set()
+            if start_flusher:
+                self.flusher = threading.Thread(target=self._flush_loop, name="session-flusher", daemon=True)
+        if start_flusher:
+            self.flusher.start()
+            atexit.register(self.close)
+        if pending >= self.flush_batch_size:
+            self.flush()
+
+    def _flush_loop(self):
+        while not self.stop_event.wait(self.flush_interval):
+            self.flush()
@@ -0,0 +1,106 @@
+"""
+Request coalescing: concurrent callers asking for the same key share one in-flight call.
+"""
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class _Call:
+    """One in-flight synchronous call and its outcome."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent identical calls.
+
+    While a call for a key is running, further callers with the same key wait for
+    it and receive its result (or exception) instead of starting their own. Nothing
+    is cached: once the call finishes the next caller starts a new one. Results
+    are shared between callers, so they should be treated as read-only.
+
+    do() serves threads; do_async() serves coroutines on an event loop. Both feed
+    the same counters.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls: Dict[Hashable, _Call] = {}
+        self.async_calls: Dict[Hashable, asyncio.Future] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run fn() for key, or wait for the call already running for it."""
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = _Call()
+                self.executions += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await fn() for key, or await the call already running for it on this event loop."""
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop), key)  # Futures belong to one loop
+
+        with self.lock:
+            future = self.async_calls.get(flight_key)
+            leader = future is None
+            if leader:
+                future = self.async_calls[flight_key] = loop.create_future()
+                self.executions += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            # Shielded so a cancelled waiter does not cancel the shared call
+            return await asyncio.shield(future)
+
+        try:
+            result = await fn()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved so unshared failures are not logged as unhandled
+            raise
+        finally:
+            with self.lock:
+                del self.async_calls[flight_key]
+
+    def stats(self) -> Dict[str, int]:
+        """Executed and coalesced call counts."""
+        with self.lock:
+            return {
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "in_flight": len(self.calls) + len(self.async_calls)
+            }
@@ -0,0 +1,68 @@
+from enum import IntEnum
+from typing import Optional
+
+
+class ReasonCode(IntEnum):
+    """
+    Structured reason for a skipped or failed application.
+
+    Stored as an integer next to the human-readable reason text, so classification
+    (e.g. "is this skip permanent?") never has to parse the text.
+    """
+    NONE = 0                    # Submitted, queued, or no reason given
+    OTHER = 1                   # Free-text reason that matches no specific code
+
+    # Hard validation gates (core.validator)
+    MISSING_CONSTRAINTS = 10
+    BLOCKED_COMPANY = 11
+    SKILL_MISMATCH = 12
+    EXPERIENCE_TOO_HIGH = 13
+
+    # Engine / portal filters
+    SCORE_BELOW_THRESHOLD = 20
+    NO_RELEVANT_BULLETS = 21
+    LOCATION_MISMATCH = 22
+    PREFERENCE_MISMATCH = 23
+
+    # Temporary - the job may be retried on a later day
+    DAILY_LIMIT_REACHED = 30
+
+    # Submission failures
+    SUBMISSION_FAILED = 40
+    PORTAL_ERROR = 41
+    UNEXPECTED_ERROR = 42
+
+
+# Skips that do not rule the job out for good
+DEFERRED_REASON_CODES = frozenset({ReasonCode.DAILY_LIMIT_REACHED})
+
+
+# Substring patterns (lowercase) for rows written before reason codes existed, first match wins
+LEGACY_REASON_PATTERNS = (
+    (("daily limit", "maximum allowed applications per day", "exceeded the maximum allowed applications"),
+     ReasonCode.DAILY_LIMIT_REACHED),
+    (("constraints not defined",), ReasonCode.MISSING_CONSTRAINTS),
+    (("blocked",), ReasonCode.BLOCKED_COMPANY),
+    (("no_relevant_verified_bullets",), ReasonCode.NO_RELEVANT_BULLETS),
+    (("score ",), ReasonCode.SCORE_BELOW_THRESHOLD),
+    (("matching skills", "skills but user only matches"), ReasonCode.SKILL_MISMATCH),
+    (("years experience", "years of experience"), ReasonCode.EXPERIENCE_TOO_HIGH),
+    (("location",), ReasonCode.LOCATION_MISMATCH),
+    (("submission failed",), ReasonCode.SUBMISSION_FAILED),
+)
+
+
+def classify_legacy_reason(reason: Optional[str]) -> ReasonCode:
+    """
+    Map a free-text skip/fail reason to a ReasonCode.
+
+    Only for input that carries no code (legacy rows and callers that predate codes).
+    """
+    if not reason:
+        return ReasonCode.NONE
+
+    reason_lower = reason.lower()
+    for markers, code in LEGACY_REASON_PATTERNS:
+        if any(marker in reason_lower for marker in markers):
+            return code
+    return ReasonCode.OTHER
@@ -23,6 +23,7 @@ class ApplicationTracker:
         job_id: str,
         status: str,
         reason: Optional[str] = None,
+        reason_code: Optional[int] = None,
         receipt_id: Optional[str] = None,
         timestamp: Optional[float] = None,
         company: Optional[str] = None,
@@ -35,6 +36,7 @@ class ApplicationTracker:
             job_id (str): Identifier for the job.
             status (str): One of "queued", "skipped", "submitted", "failed", "retried".
             reason (Optional[str]): Why it was skipped or failed.
+            reason_code (Optional[int]): core.reason_codes.ReasonCode for the reason.
             receipt_id (Optional[str]): If submitted, the receipt id.
             timestamp (Optional[float]): Timestamp, defaults to now.
             company (Optional[str]): Company name for the job.
@@ -48,6 +50,7 @@ class ApplicationTracker:
             "job_id": job_id,
             "status": status,
             "reason": reason if status in {"skipped", "failed"} else None,
+            "reason_code": int(reason_code) if status in {"skipped", "failed"} and reason_code is not None else None,
             "receipt_id": receipt_id if status == "submitted" else None,
             "timestamp": timestamp if timestamp is not None else time.time(),
             "company": company,
@@ -57,6 +60,8 @@ class ApplicationTracker:
         # Clear irrelevant fields for readability
         if entry["reason"] is None:
             entry.pop("reason")
+        if entry["reason_code"] is None:
+            entry.pop("reason_code")
         if entry["receipt_id"] is None:
             entry.pop("receipt_id")
 
@@ -75,6 +80,8 @@ class ApplicationTracker:
         ]
         if "reason" in entry:
             log_parts.append(f"reason='{entry['reason']}'")
+        if "reason_code" in entry:
+            log_parts.append(f"reason_code={entry['reason_code']}")
         if "receipt_id" in entry:
             log_parts.append(f"receipt_id='{entry['receipt_id']}'")
 
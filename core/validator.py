@@ -1,12 +1,13 @@
 from typing import Tuple
 from schemas.student_schema import StudentArtifactPack
 from schemas.job_schema import JobListing
+from core.reason_codes import ReasonCode
 
 def validate_job_for_scoring(
     student: StudentArtifactPack,
     job: JobListing,
     apps_today: int
-) -> Tuple[bool, str]:
+) -> Tuple[bool, str, ReasonCode]:
     """
     Determines whether a job should be considered for scoring or skipped.
 
@@ -16,18 +17,19 @@ def validate_job_for_scoring(
         apps_today (int): The number of applications made by the student today.
 
     Returns:
-        (allowed: bool, reason: str): Whether the job is allowed and reason for skip if not.
+        (allowed: bool, reason: str, reason_code: ReasonCode): Whether the job is allowed,
+        and the reason (text and code) for the skip if not. The code is ReasonCode.NONE when allowed.
     """
 
     constraints = student.constraints
     skill_vocab = set(student.skill_vocab)
 
     if not student.constraints:
-        return (False, "Student constraints not defined; refusing to score job.")
+        return (False, "Student constraints not defined; refusing to score job.", ReasonCode.MISSING_CONSTRAINTS)
 
     # 1. Blocked company check
     if constraints and job.company in getattr(constraints, "blocked_companies", []):
-        return (False, f"Company '{job.company}' is in the student's blocked_companies list.")
+        return (False, f"Company '{job.company}' is in the student's blocked_companies list.", ReasonCode.BLOCKED_COMPANY)
 
     # 2. Applications per day limit check - REMOVED
     # This is now handled in the engine to properly stop processing and keep remaining jobs as will_apply
@@ -47,14 +49,15 @@ def validate_job_for_scoring(
     if match_ratio < min_match_threshold:
         return (
             False,
-            f"Job requires {required_skills_count} skills but user only matches {matched_skills_count} ({match_ratio:.1%}). Missing: {unknown_skills}"
+            f"Job requires {required_skills_count} skills but user only matches {matched_skills_count} ({match_ratio:.1%}). Missing: {unknown_skills}",
+            ReasonCode.SKILL_MISMATCH
         )
 
     # 4. Experience requirement check - be more lenient
     # Allow applying to jobs requiring up to 2 years of experience
     # since students often have project experience that counts
     if job.min_experience_years > 2:
-        return (False, f"Job requires {job.min_experience_years} years of experience, which exceeds the 2-year limit for student applications")
+        return (False, f"Job requires {job.min_experience_years} years of experience, which exceeds the 2-year limit for student applications", ReasonCode.EXPERIENCE_TOO_HIGH)
 
     # If all checks pass
-    return (True, "Job passes all hard validation gates.")
\ No newline at end of file
+    return (True, "Job passes all hard validation gates.", ReasonCode.NONE)
\ No newline at end of file
@@ -90,6 +90,16 @@ export const api = {
     return response.data
   },
 
+  // Partially update profile with JSON Patch operations (pass profile.version to detect conflicts)
+  patchProfile: async (operations, version = null) => {
+    const headers = { ...getAuthHeaders(), 'Content-Type': 'application/json-patch+json' }
+    if (version !== null) {
+      headers['If-Match'] = `"${version}"`
+    }
+    const response = await axios.patch(`${API_BASE}/profile`, operations, { headers })
+    return response.data
+  },
+
   // ==================== JOB LISTINGS ====================
 
   // Get job listings
@@ -144,11 +154,18 @@ export const api = {
   // ==================== APPLICATION HISTORY ====================
 
   // Get application history
-  getApplicationHistory: async (limit = 100, statusFilter = null) => {
+  // Pass the previous response's next_cursor as cursor to load the next page
+  getApplicationHistory: async (limit = 100, statusFilter = null, cursor = null, includeArchived = false) => {
     let url = `${API_BASE}/history/applications?limit=${limit}`
     if (statusFilter) {
       url += `&status_filter=${statusFilter}`
     }
+    if (cursor) {
+      url += `&cursor=${encodeURIComponent(cursor)}`
+    }
+    if (includeArchived) {
+      url += `&include_archived=true`
+    }
     const response = await axios.get(url, {
       headers: getAuthHeaders()
     })
@@ -7,13 +7,16 @@ Simulates a real job portal with comprehensive features:
 - Submission receipts and tracking
 - Company profiles and job categories
 """
+import os
 import json
+import bisect
+import hashlib
 import time
 import uuid
 import random
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
-from flask import Flask, request, jsonify, render_template_string
+from flask import Flask, Response, request, jsonify, render_template_string
 from flask_cors import CORS
 
 app = Flask(__name__)
@@ -30,6 +33,111 @@ PORTAL_STATS = {
     "companies": 0
 }
 
+# Change feed for incremental catalog sync (GET /api/jobs?updated_since=<cursor>).
+# Every job add/update/delete takes the next sequence number; deletions leave a tombstone.
+# View counters are not changes: they would turn every page view into a catalog delta.
+CHANGE_FEED_ID = uuid.uuid4().hex[:12]  # Cursors issued by an earlier portal process are not honoured
+CHANGE_SEQ = 0
+JOB_CHANGE_SEQ = {}  # job_id -> sequence number of the job's last add/update
+JOB_TOMBSTONES = {}  # job_id -> sequence number at which the job was deleted (in sequence order)
+MAX_TOMBSTONES = 10000
+OLDEST_HONOURED_SEQ = 0  # Cursors before the newest compacted tombstone get a full listing
+
+# Listing position of every job, assigned once and only ever increasing. Page tokens are
+# the ordinal of the last job served, so adds and deletes between page requests never
+# shift later pages. LISTING_ORDINALS/LISTING_JOB_IDS keep the catalog in ordinal order
+# (new ordinals are appended, so they stay sorted) and a page starts at a bisect.
+JOB_ORDINALS = {}
+NEXT_JOB_ORDINAL = 1
+LISTING_ORDINALS = []
+LISTING_JOB_IDS = []
+JOBS_BY_ID = {}
+JOBS_BY_ID_KEY = None  # (JOBS_DB identity, length, change sequence) JOBS_BY_ID was built from
+
+
+def job_ordinal(job_id):
+    """Stable listing position of a job, assigned on first sight."""
+    global NEXT_JOB_ORDINAL
+    if job_id not in JOB_ORDINALS:
+        JOB_ORDINALS[job_id] = NEXT_JOB_ORDINAL
+        LISTING_ORDINALS.append(NEXT_JOB_ORDINAL)
+        LISTING_JOB_IDS.append(job_id)
+        NEXT_JOB_ORDINAL += 1
+    return JOB_ORDINALS[job_id]
+
+
+def jobs_by_id():
+    """job_id -> job for JOBS_DB, rebuilt only after the catalog changed."""
+    global JOBS_BY_ID, JOBS_BY_ID_KEY
+    key = (id(JOBS_DB), len(JOBS_DB), CHANGE_SEQ)
+    if key != JOBS_BY_ID_KEY:
+        JOBS_BY_ID = {j['job_id']: j for j in JOBS_DB}
+        for job_id in JOBS_BY_ID:
+            job_ordinal(job_id)  # Jobs loaded without record_job_changes still get a position
+        JOBS_BY_ID_KEY = key
+    return JOBS_BY_ID
+
+
+def record_job_changes(changed_ids=(), deleted_ids=()):
+    """Advance the change feed for jobs that were added/updated or deleted."""
+    global CHANGE_SEQ, OLDEST_HONOURED_SEQ
+    for job_id in changed_ids:
+        CHANGE_SEQ += 1
+        JOB_CHANGE_SEQ[job_id] = CHANGE_SEQ
+        JOB_TOMBSTONES.pop(job_id, None)
+        job_ordinal(job_id)
+    unlisted = False
+    for job_id in deleted_ids:
+        CHANGE_SEQ += 1
+        JOB_CHANGE_SEQ.pop(job_id, None)
+        # A re-added job is listed (and paged) at the end
+        unlisted = JOB_ORDINALS.pop(job_id, None) is not None or unlisted
+        JOB_TOMBSTONES.pop(job_id, None)  # Re-insert so the dict stays in sequence order
+        JOB_TOMBSTONES[job_id] = CHANGE_SEQ
+    if unlisted:
+        # One pass for the whole batch, so clearing the catalog stays linear
+        kept = [(ordinal, job_id) for ordinal, job_id in zip(LISTING_ORDINALS, LISTING_JOB_IDS)
+                if JOB_ORDINALS.get(job_id) == ordinal]
+        LISTING_ORDINALS[:] = [ordinal for ordinal, _ in kept]
+        LISTING_JOB_IDS[:] = [job_id for _, job_id in kept]
+    
+    # Compact the oldest tombstones; cursors that could still need them are no longer honoured
+    while len(JOB_TOMBSTONES) > MAX_TOMBSTONES:
+        oldest_job_id = next(iter(JOB_TOMBSTONES))
+        OLDEST_HONOURED_SEQ = JOB_TOMBSTONES.pop(oldest_job_id)
+
+
+def current_change_cursor():
+    """Opaque cursor for the current position of the change feed."""
+    return f"{CHANGE_FEED_ID}:{CHANGE_SEQ}"
+
+
+def ndjson_response(jobs, deleted_job_ids=(), full=True):
+    """
+    Stream jobs as NDJSON: one {"job": ...} line per job, then one {"deleted_job_id": ...}
+    line per tombstone. The change cursor and full flag travel in response headers.
+    """
+    cursor = current_change_cursor()
+    
+    def generate():
+        for job in jobs:
+            yield json.dumps({"job": job}) + "\n"
+        for job_id in deleted_job_ids:
+            yield json.dumps({"deleted_job_id": job_id}) + "\n"
+    
+    return Response(generate(), mimetype='application/x-ndjson', headers={
+        "X-Change-Cursor": cursor,
+        "X-Catalog-Full": "true" if full else "false"
+    })
+
+
+def parse_change_cursor(cursor):
+    """Sequence number of a cursor from this portal process, or None if it cannot be honoured."""
+    feed_id, _, seq = cursor.partition(':')
+    if feed_id != CHANGE_FEED_ID or not seq.isdigit() or not OLDEST_HONOURED_SEQ <= int(seq) <= CHANGE_SEQ:
+        return None
+    return int(seq)
+
 def initialize_sandbox_companies():
     """Initialize realistic company profiles with focus on Indian companies."""
     
@@ -687,6 +795,11 @@ Build scalable backend systems using Python and modern cloud technologies.
     # Combine all jobs
     all_jobs = sandbox_jobs + additional_jobs
     
+    new_job_ids = {j['job_id'] for j in all_jobs}
+    record_job_changes(
+        changed_ids=[j['job_id'] for j in all_jobs],
+        deleted_ids=[j['job_id'] for j in JOBS_DB if j['job_id'] not in new_job_ids]
+    )
     JOBS_DB = all_jobs
     PORTAL_STATS["total_jobs"] = len(all_jobs)
     PORTAL_STATS["active_jobs"] = len([j for j in all_jobs if j["status"] == "active"])
@@ -2285,6 +2398,7 @@ def post_job_api():
         
         # Add to jobs database
         JOBS_DB.append(new_job)
+        record_job_changes(changed_ids=[job_id])
         
         # Update portal stats
         global PORTAL_STATS
@@ -3014,6 +3128,10 @@ def get_portal_status():
 def get_jobs():
     """Get all available jobs from the sandbox portal with enhanced filtering."""
     
+    updated_since = request.args.get('updated_since')
+    if updated_since is not None:
+        return get_job_changes(updated_since)
+    
     # Filter parameters
     location = request.args.get('location')
     job_type = request.args.get('job_type') 
@@ -3056,10 +3174,34 @@ def get_jobs():
     if limit:
         filtered_jobs = filtered_jobs[:limit]
     
-    return jsonify({
+    if request.args.get('format') == 'ndjson':
+        return ndjson_response(filtered_jobs)
+    
+    # Optional pagination (page_token is the ordinal of the last job on the previous page)
+    total_count = len(filtered_jobs)
+    next_page_token = None
+    page_size = request.args.get('page_size', type=int)
+    if page_size:
+        after = request.args.get('page_token', default=0, type=int)
+        listing = jobs_by_id()
+        # Unfiltered downloads page straight off the ordered listing
+        wanted = None if total_count == len(JOBS_DB) else {j['job_id'] for j in filtered_jobs}
+        page = []
+        for index in range(bisect.bisect_right(LISTING_ORDINALS, after), len(LISTING_JOB_IDS)):
+            job_id = LISTING_JOB_IDS[index]
+            if job_id in listing and (wanted is None or job_id in wanted):
+                if len(page) == page_size:
+                    next_page_token = str(JOB_ORDINALS[page[-1]['job_id']])
+                    break
+                page.append(listing[job_id])
+        filtered_jobs = page
+    
+    response = jsonify({
         "success": True,
         "jobs": filtered_jobs,
-        "total_count": len(filtered_jobs),
+        "total_count": total_count,
+        "next_page_token": next_page_token,
+        "cursor": current_change_cursor(),
         "filters_applied": {
             "location": location,
             "job_type": job_type,
@@ -3069,6 +3211,44 @@ def get_jobs():
             "skills": skills
         }
     })
+    
+    # ETag from the change feed position, so clients can revalidate with If-None-Match
+    # (304 when unchanged); view counters in the body do not invalidate it
+    response.set_etag(hashlib.sha1(f"{current_change_cursor()}?{request.query_string.decode()}".encode()).hexdigest())
+    return response.make_conditional(request)
+
+
+def get_job_changes(cursor):
+    """
+    Jobs added or updated since a change cursor, plus tombstones for deleted jobs.
+    
+    An unknown or stale cursor (e.g. after a portal restart) gets the full catalog
+    with "full": true, so the client replaces its copy instead of merging.
+    """
+    if any(request.args.get(name) for name in ('location', 'job_type', 'experience_level', 'company', 'search', 'skills', 'limit', 'page_size')):
+        return jsonify({
+            "success": False,
+            "error": "updated_since cannot be combined with filters"
+        }), 400
+    
+    since = parse_change_cursor(cursor)
+    if since is None:
+        changed_jobs, deleted_job_ids, full = list(JOBS_DB), [], True
+    else:
+        changed_jobs = [j for j in JOBS_DB if JOB_CHANGE_SEQ.get(j['job_id'], 0) > since]
+        deleted_job_ids = [job_id for job_id, seq in JOB_TOMBSTONES.items() if seq > since]
+        full = False
+    
+    if request.args.get('format') == 'ndjson':
+        return ndjson_response(changed_jobs, deleted_job_ids, full)
+    
+    return jsonify({
+        "success": True,
+        "full": full,
+        "jobs": changed_jobs,
+        "deleted_job_ids": deleted_job_ids,
+        "cursor": current_change_cursor()
+    })
 
 @app.route('/api/jobs/<job_id>', methods=['GET'])
 def get_job_details(job_id):
@@ -3082,7 +3262,7 @@ def get_job_details(job_id):
             "error": f"Job {job_id} not found"
         }), 404
     
-    # Increment view count
+    # Increment view count (not a catalog change, see record_job_changes)
     job['views'] = job.get('views', 0) + 1
     
     # Get company details
@@ -3125,52 +3305,52 @@ def get_company_details(company_id):
         "jobs_count": len(company_jobs)
     })
 
-@app.route('/api/jobs/<job_id>/apply', methods=['POST'])
-def apply_to_job(job_id):
-    """Submit an application to a specific job with comprehensive validation."""
+def create_application(job_id, application_data):
+    """
+    Validate and store one application. Returns (response body, HTTP status).
+    
+    Shared by the single-job apply endpoint and the batch endpoint.
+    """
     
     # Find the job
     job = next((j for j in JOBS_DB if j['job_id'] == job_id), None)
     
     if not job:
-        return jsonify({
+        return {
             "success": False,
             "error": f"Job {job_id} not found"
-        }), 404
+        }, 404
     
     if job['status'] != 'active':
-        return jsonify({
+        return {
             "success": False,
             "error": f"Job {job_id} is no longer accepting applications"
-        }), 400
-    
-    # Get application data
-    application_data = request.get_json()
+        }, 400
     
     if not application_data:
-        return jsonify({
+        return {
             "success": False,
             "error": "Application data is required"
-        }), 400
+        }, 400
     
     # Validate required fields
     required_fields = ['applicant_name', 'email', 'cover_letter', 'skills']
     missing_fields = [field for field in required_fields if not application_data.get(field)]
     
     if missing_fields:
-        return jsonify({
+        return {
             "success": False,
             "error": f"Missing required fields: {missing_fields}"
-        }), 400
+        }, 400
     
     # Validate email format
     import re
     email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
     if not re.match(email_pattern, application_data['email']):
-        return jsonify({
+        return {
             "success": False,
             "error": "Invalid email format"
-        }), 400
+        }, 400
     
     # Check for duplicate application (same email + job_id)
     existing_application = next(
@@ -3180,12 +3360,12 @@ def apply_to_job(job_id):
     )
     
     if existing_application:
-        return jsonify({
+        return {
             "success": False,
             "error": f"Duplicate application detected. You have already applied to this position on {existing_application['applied_at']}",
             "existing_receipt_id": existing_application['receipt_id'],
             "existing_application_id": existing_application['application_id']
-        }), 409  # 409 Conflict status code
+        }, 409  # 409 Conflict status code
     
     # Generate application ID and receipt
     application_id = str(uuid.uuid4())
@@ -3223,9 +3403,7 @@ def apply_to_job(job_id):
     
     # Update job application count
     job['applications_count'] = job.get('applications_count', 0) + 1
-    
-    # Simulate processing delay
-    time.sleep(0.2)
+    record_job_changes(changed_ids=[job_id])
     
     # Generate confirmation receipt
     receipt = {
@@ -3247,7 +3425,7 @@ def apply_to_job(job_id):
         }
     }
     
-    return jsonify({
+    return {
         "success": True,
         "application_id": application_id,
         "receipt_id": receipt_id,
@@ -3256,6 +3434,70 @@ def apply_to_job(job_id):
         "confirmation": f"Your application for {job['role']} at {job['company']} has been received",
         "receipt": receipt,
         "next_steps": "You will receive an email confirmation within 24 hours"
+    }, 200
+
+
+@app.route('/api/jobs/<job_id>/apply', methods=['POST'])
+def apply_to_job(job_id):
+    """Submit an application to a specific job with comprehensive validation."""
+    
+    result, status_code = create_application(job_id, request.get_json())
+    
+    if result["success"]:
+        # Simulate processing delay
+        time.sleep(0.2)
+    
+    return jsonify(result), status_code
+
+
+MAX_BATCH_APPLICATIONS = 100
+
+
+@app.route('/api/applications/batch', methods=['POST'])
+def apply_batch():
+    """
+    Submit applications to several jobs in one request.
+    
+    Body: {"applicant": {...shared fields...}, "applications": [{"job_id": ..., ...overrides}]}.
+    Each item is the applicant block merged with its overrides and validated like a
+    single application; the response lists a receipt or an error per item, in order.
+    """
+    data = request.get_json()
+    
+    if not data or not isinstance(data.get('applications'), list) or not data['applications']:
+        return jsonify({
+            "success": False,
+            "error": "A non-empty applications list is required"
+        }), 400
+    
+    if len(data['applications']) > MAX_BATCH_APPLICATIONS:
+        return jsonify({
+            "success": False,
+            "error": f"At most {MAX_BATCH_APPLICATIONS} applications per batch"
+        }), 400
+    
+    applicant = data.get('applicant') or {}
+    results = []
+    for item in data['applications']:
+        job_id = item.get('job_id') if isinstance(item, dict) else None
+        if not job_id:
+            results.append({"success": False, "job_id": job_id, "status_code": 400, "error": "job_id is required"})
+            continue
+        
+        overrides = {key: value for key, value in item.items() if key != 'job_id'}
+        result, status_code = create_application(job_id, {**applicant, **overrides})
+        results.append({**result, "job_id": job_id, "status_code": status_code})
+    
+    submitted = sum(1 for result in results if result["success"])
+    if submitted:
+        # Simulate processing delay (once per batch)
+        time.sleep(0.2)
+    
+    return jsonify({
+        "success": True,
+        "results": results,
+        "submitted": submitted,
+        "failed": len(results) - submitted
     })
 
 @app.route('/api/applications', methods=['GET'])
@@ -3336,6 +3578,7 @@ def delete_application(application_id):
     job = next((j for j in JOBS_DB if j['job_id'] == application['job_id']), None)
     if job and job.get('applications_count', 0) > 0:
         job['applications_count'] -= 1
+        record_job_changes(changed_ids=[job['job_id']])
     
     return jsonify({
         "success": True,
@@ -3374,6 +3617,7 @@ def update_job_skills(job_id):
         # Update the skills
         old_skills = job['required_skills']
         job['required_skills'] = new_skills
+        record_job_changes(changed_ids=[job_id])
         
         return jsonify({
             "success": True,
@@ -3406,6 +3650,7 @@ def delete_job(job_id):
         
         # Remove the job
         JOBS_DB = [j for j in JOBS_DB if j['job_id'] != job_id]
+        record_job_changes(deleted_ids=[job_id])
         
         # Update stats
         PORTAL_STATS["total_jobs"] = len(JOBS_DB)
@@ -3450,6 +3695,7 @@ def bulk_delete_jobs():
         
         # Remove all found jobs
         JOBS_DB = [j for j in JOBS_DB if j['job_id'] not in job_ids]
+        record_job_changes(deleted_ids=[j['job_id'] for j in deleted_jobs])
         
         # Update stats
         PORTAL_STATS["total_jobs"] = len(JOBS_DB)
@@ -3474,6 +3720,7 @@ def clear_all_jobs():
         global JOBS_DB, PORTAL_STATS
         
         deleted_count = len(JOBS_DB)
+        record_job_changes(deleted_ids=[j['job_id'] for j in JOBS_DB])
         JOBS_DB = []
         
         # Update stats
@@ -3519,7 +3766,9 @@ def clear_all_applications():
     
     # Reset application counts for all jobs
     for job in JOBS_DB:
-        job['applications_count'] = 0
+        if job.get('applications_count'):
+            job['applications_count'] = 0
+            record_job_changes(changed_ids=[job['job_id']])
     
     return jsonify({
         "success": True,
@@ -3537,6 +3786,7 @@ def generate_bulk_jobs():
     try:
         # Clear existing jobs first
         initial_count = len(JOBS_DB)
+        record_job_changes(deleted_ids=[j['job_id'] for j in JOBS_DB])
         JOBS_DB.clear()
         
         # Reinitialize companies and jobs
@@ -3576,6 +3826,7 @@ def delete_all_jobs():
         deleted_companies = len(COMPANIES_DB)
         
         # Clear all jobs, applications, and companies
+        record_job_changes(deleted_ids=[j['job_id'] for j in JOBS_DB])
         JOBS_DB.clear()
         APPLICATIONS_DB.clear()
         COMPANIES_DB.clear()
@@ -3610,7 +3861,9 @@ if __name__ == '__main__':
     initialize_sandbox_jobs()
     
     print("=" * 60)
-    print("🌐 Sandbox Portal running on http://localhost:5001")
+    # PORT lets several sandbox portals run side by side (e.g. PORT=5002 for a second one)
+    port = int(os.environ.get('PORT', 5001))
+    print(f"🌐 Sandbox Portal running on http://localhost:{port}")
     print("📋 Available endpoints:")
     print("   🏠  GET  / - Homepage with job listings")
     print("   📄  GET  /jobs - Browse all jobs")
@@ -3647,4 +3900,4 @@ if __name__ == '__main__':
     print("=" * 60)
     print()
     
-    app.run(host='0.0.0.0', port=5001, debug=False)
\ No newline at end of file
+    app.run(host='0.0.0.0', port=port, debug=False)
\ No newline at end of file
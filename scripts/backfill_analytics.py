@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Backfill the analytics rollups from application history.
+Recomputes daily buckets for the given window (default: all history).
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.database import PersistentDatabase
+
+
+def backfill(db_path: str, days: int = None):
+    """Rebuild rollup buckets for the last `days` days (or all history)."""
+    db = PersistentDatabase(db_path)
+    since = time.time() - days * 86400 if days else 0.0
+    
+    started = time.time()
+    rows = db.rebuild_application_rollups(since)
+    print(f"Rebuilt {rows} rollup rows in {time.time() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--db", default="data/platform.db", help="Path to the platform database")
+    parser.add_argument("--days", type=int, default=None, help="Only rebuild the last N days")
+    args = parser.parse_args()
+    
+    backfill(args.db, args.days)
@@ -0,0 +1,595 @@
+"""
+Tests for the persistent platform database layer
+"""
+import json
+import pytest
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Fresh database with a single user."""
+    from backend.database import PersistentDatabase
+
+    database = PersistentDatabase(str(tmp_path / "platform.db"))
+    database.create_user("student@example.com", "hash")
+    return database
+
+
+def _app(job_id, status, reason=None, timestamp=1000.0):
+    return {
+        "job_id": job_id,
+        "status": status,
+        "reason": reason,
+        "timestamp": timestamp,
+        "company": "Test Company",
+        "role": "Software Engineer"
+    }
+
+
+def test_job_state_sets(db):
+    """Test applied/excluded job sets are folded from history."""
+    run_id = db.create_autopilot_run(1, ["job-1", "job-2", "job-3", "job-4"])
+    db.save_application_history(1, run_id, [
+        _app("job-1", "submitted"),
+        _app("job-2", "skipped", "Score 0.40 < required 0.70"),
+        _app("job-3", "skipped", "Daily limit of 5 applications reached"),
+        _app("job-4", "failed", "Submission failed twice"),
+    ])
+    # A later permanent skip must not override the daily-limit skip
+    db.save_application_history(1, run_id, [_app("job-3", "skipped", "Company culture mismatch")])
+
+    job_sets = db.get_user_job_id_sets(1)
+    assert job_sets["applied"] == {"job-1"}
+    assert job_sets["excluded"] == {"job-2"}
+    assert job_sets["processed"] == {"job-1", "job-2", "job-3", "job-4"}
+
+
+def test_job_state_follows_history_deletes(db):
+    """Test job states are re-derived when history entries are deleted or cleared."""
+    run_id = db.create_autopilot_run(1, ["job-1"])
+    db.save_application_history(1, run_id, [
+        _app("job-1", "skipped", "Score 0.40 < required 0.70"),
+        _app("job-1", "submitted"),
+    ])
+    submitted_entry = db.get_user_application_history(1, status_filter="submitted")[0]
+
+    assert db.delete_application_history_entry(1, submitted_entry["id"])
+    assert db.get_user_job_id_sets(1)["excluded"] == {"job-1"}
+
+    assert db.clear_user_application_history(1) == 1
+    assert db.get_user_job_id_sets(1)["processed"] == set()
+
+
+def test_count_user_applications_since(db):
+    """Test counting successful applications after a timestamp."""
+    run_id = db.create_autopilot_run(1, ["job-1", "job-2", "job-3"])
+    db.save_application_history(1, run_id, [
+        _app("job-1", "submitted", timestamp=100.0),
+        _app("job-2", "retried", timestamp=200.0),
+        _app("job-3", "skipped", "Score too low", timestamp=300.0),
+    ])
+
+    assert db.count_user_applications_since(1, 150.0) == 1
+    assert db.count_user_applications_since(1, 0.0) == 2
+
+
+def test_find_jobs_matching_skills(db):
+    """Test skill matching is computed from the normalized job_skills table."""
+    for job_id, skills in [
+        ("job-1", ["Python", "SQL"]),
+        ("job-2", ["python", "React", "SQL"]),
+        ("job-3", ["Java"]),
+    ]:
+        db.add_job_listing({
+            "job_id": job_id,
+            "company": "Test Company",
+            "role": "Software Engineer",
+            "location": "Remote",
+            "required_skills": skills,
+            "min_experience_years": 0
+        })
+
+    matches = db.find_jobs_matching_skills(["python", "react", " SQL "])
+    assert [job["job_id"] for job in matches] == ["job-2", "job-1"]
+    assert matches[0]["skill_overlap"] == 3
+    assert matches[0]["required_skills"] == ["python", "React", "SQL"]
+
+    # Re-adding a listing replaces its skills
+    db.add_job_listing({
+        "job_id": "job-3",
+        "company": "Test Company",
+        "role": "Software Engineer",
+        "location": "Remote",
+        "required_skills": ["Python"],
+        "min_experience_years": 0
+    })
+    assert {job["job_id"] for job in db.find_jobs_matching_skills(["Python"])} == {"job-1", "job-2", "job-3"}
+    assert db.find_jobs_matching_skills(["Java"]) == []
+
+
+def test_search_job_listings(db):
+    """Test full-text search stays in sync with job listing writes."""
+    db.add_job_listing({
+        "job_id": "job-1",
+        "company": "Acme Analytics",
+        "role": "Data Engineer",
+        "location": "Remote",
+        "required_skills": ["Python", "Spark"],
+        "min_experience_years": 0,
+        "description": "Build data pipelines."
+    })
+    db.add_job_listing({
+        "job_id": "job-2",
+        "company": "Globex",
+        "role": "Frontend Developer",
+        "location": "Remote",
+        "required_skills": ["React"],
+        "min_experience_years": 0,
+        "description": "Work with our data team on dashboards."
+    })
+
+    results = db.search_job_listings("data")
+    assert results["total_count"] == 2
+    assert results["jobs"][0]["job_id"] == "job-1"  # Role hit ranks above description hit
+
+    assert [job["job_id"] for job in db.search_job_listings("spar")["jobs"]] == ["job-1"]
+    assert db.search_job_listings("data", limit=1, offset=1)["jobs"][0]["job_id"] == "job-2"
+
+    # Replacing a listing re-indexes it
+    db.add_job_listing({
+        "job_id": "job-1",
+        "company": "Acme Analytics",
+        "role": "Backend Engineer",
+        "location": "Remote",
+        "required_skills": ["Go"],
+        "min_experience_years": 0,
+        "description": "Build APIs."
+    })
+    assert db.search_job_listings("spark")["total_count"] == 0
+    assert db.search_job_listings("backend go")["total_count"] == 1
+
+
+def test_sync_job_listings(db):
+    """Test bulk sync reports and applies inserts, updates and deactivations."""
+    def portal_job(job_id, role="Software Engineer", skills=("Python",)):
+        return {
+            "job_id": job_id,
+            "company": "Test Company",
+            "role": role,
+            "location": "Remote",
+            "required_skills": list(skills),
+            "min_experience_years": 0
+        }
+
+    counts = db.sync_job_listings([portal_job("job-1"), portal_job("job-2")], source="portal-a")
+    assert counts == {"added": 2, "changed": 0, "removed": 0, "unchanged": 0}
+
+    counts = db.sync_job_listings(
+        [portal_job("job-1"), portal_job("job-3", role="Data Engineer", skills=("SQL",))],
+        source="portal-a"
+    )
+    assert counts == {"added": 1, "changed": 0, "removed": 1, "unchanged": 1}
+    assert db.get_job_by_id("job-2") is None
+
+    counts = db.sync_job_listings([portal_job("job-1", skills=("Go",)), portal_job("job-3", "Data Engineer", ("SQL",))],
+                                  source="portal-a")
+    assert counts == {"added": 0, "changed": 1, "removed": 0, "unchanged": 1}
+    assert db.get_job_by_id("job-1")["required_skills"] == ["Go"]
+    assert [job["job_id"] for job in db.find_jobs_matching_skills(["go"])] == ["job-1"]
+    assert db.find_jobs_matching_skills(["python"]) == []
+
+    # Listings from other sources are never deactivated
+    db.sync_job_listings([portal_job("job-9")], source="portal-b")
+    assert db.get_job_by_id("job-1") is not None
+
+
+def test_history_keyset_pagination(db):
+    """Test history pages chain through (timestamp, id) cursors without gaps."""
+    run_id = db.create_autopilot_run(1, [])
+    db.save_application_history(1, run_id, [
+        _app(f"job-{i}", "submitted", timestamp=float(i // 2)) for i in range(7)
+    ])
+
+    seen = []
+    before = None
+    while True:
+        page = db.get_user_application_history(1, limit=3, before=before)
+        if not page:
+            break
+        seen.extend(entry["job_id"] for entry in page)
+        before = (page[-1]["timestamp"], page[-1]["id"])
+
+    assert seen == [f"job-{i}" for i in reversed(range(7))]
+
+
+def test_page_cursor_round_trip():
+    """Test page cursors encode and decode keyset positions."""
+    from backend.database import encode_page_cursor, decode_page_cursor
+
+    assert decode_page_cursor(encode_page_cursor(1700000000.5, 42)) == (1700000000.5, 42)
+    assert decode_page_cursor(encode_page_cursor("2024-01-01 10:00:00", 7)) == ("2024-01-01 10:00:00", 7)
+    with pytest.raises(ValueError):
+        decode_page_cursor("not-a-cursor")
+
+
+def test_get_autopilot_run(db):
+    """Test direct run lookup is scoped to the owning user."""
+    run_id = db.create_autopilot_run(1, ["job-1"])
+
+    assert db.get_autopilot_run(1, run_id)["job_ids"] == ["job-1"]
+    assert db.get_autopilot_run(2, run_id) is None
+
+
+def test_application_stats_rollup(db):
+    """Test the stats rollup follows history inserts, deletes and clears."""
+    run_id = db.create_autopilot_run(1, [])
+    db.save_application_history(1, run_id, [
+        _app("job-1", "submitted"),
+        _app("job-2", "submitted"),
+        _app("job-3", "skipped", "Score too low"),
+    ])
+    assert db.get_application_stats(1) == {"submitted": 2, "skipped": 1}
+
+    skipped_entry = db.get_user_application_history(1, status_filter="skipped")[0]
+    db.delete_application_history_entry(1, skipped_entry["id"])
+    assert db.get_application_stats(1) == {"submitted": 2}
+
+    db.clear_user_application_history(1)
+    assert db.get_application_stats(1) == {}
+
+
+def test_application_timeseries(db):
+    """Test daily/weekly analytics are served from the rollups."""
+    db.create_user("other@example.com", "hash")
+    day = 86400
+    monday = 19723 * day  # 2024-01-01
+    run_id = db.create_autopilot_run(1, [])
+    db.save_application_history(1, run_id, [
+        _app("job-1", "submitted", timestamp=monday + 10),
+        _app("job-2", "skipped", "Score too low", timestamp=monday + 20),
+        _app("job-3", "submitted", timestamp=monday + day + 5),
+    ])
+    db.save_application_history(2, run_id, [_app("job-1", "failed", "Server error", timestamp=monday + 30)])
+
+    daily = db.get_application_timeseries(1, monday, monday + 7 * day)
+    assert daily == [
+        {"bucket_start": "2024-01-01", "submitted": 1, "skipped": 1, "failed": 0, "retried": 0},
+        {"bucket_start": "2024-01-02", "submitted": 1, "skipped": 0, "failed": 0, "retried": 0},
+    ]
+
+    weekly = db.get_application_timeseries(None, monday, monday + 7 * day, granularity="week")
+    assert weekly == [{"bucket_start": "2024-01-01", "submitted": 2, "skipped": 1, "failed": 1, "retried": 0}]
+
+    hourly = db.get_application_timeseries(1, monday, monday + day, granularity="hour")
+    assert hourly == [{"bucket_start": "2024-01-01T00:00:00", "submitted": 1, "skipped": 1, "failed": 0, "retried": 0}]
+
+    # Reasons are rolled up by code, so per-job reason texts do not create new rollup rows
+    db.save_application_history(1, run_id, [_app("job-4", "skipped", "Score 0.41 < required 0.60", timestamp=monday + 40)])
+    by_reason = db.get_application_timeseries(1, monday, monday + day, group_by="reason_code")
+    assert {row["reason_code"]: row["skipped"] for row in by_reason} == {0: 0, 20: 2}
+    assert {row["reason"] for row in by_reason} == {"none", "score_below_threshold"}
+    platform_by_reason = db.get_application_timeseries(None, monday, monday + day, group_by="reason_code")
+    assert {row["reason"]: row["skipped"] + row["failed"] for row in platform_by_reason} == {
+        "none": 0, "score_below_threshold": 2, "other": 1
+    }
+
+    # Clearing history (UI only) keeps analytics, and a backfill agrees with the trigger-fed counts
+    before_clear = db.get_application_timeseries(1, monday, monday + 7 * day)
+    db.clear_user_application_history(1)
+    assert db.get_application_timeseries(1, monday, monday + 7 * day) == before_clear
+    assert db.prune_hourly_rollups() > 0
+    assert db.get_application_timeseries(1, monday, monday + day, granularity="hour") == []
+    db.rebuild_application_rollups()
+    assert db.get_application_timeseries(1, monday, monday + 7 * day) == before_clear
+
+
+def test_snapshot_blob_dedup(db):
+    """Test identical snapshots share one reference-counted blob."""
+    pack = {
+        "source_resume_hash": "hash",
+        "skill_vocab": ["python"],
+        "education": [],
+        "projects": [],
+        "constraints": {"min_match_score": 0.5, "max_apps_per_day": 5}
+    }
+    db.create_autopilot_run_with_profile(1, pack, ["job-1"])
+    db.create_autopilot_run_with_profile(1, dict(reversed(list(pack.items()))), ["job-2"])
+    db.save_draft_artifact("draft-1", 1, pack, "profile-hash")
+    db.save_draft_artifact("draft-1", 1, pack, "profile-hash")
+
+    with db.get_connection() as conn:
+        blobs = conn.execute("SELECT ref_count FROM blobs").fetchall()
+    assert blobs == [(3,)]
+    assert db.get_draft_artifact(1)["student_artifact_pack"] == pack
+
+    db.save_draft_artifact("draft-1", 1, {**pack, "skill_vocab": ["go"]}, "profile-hash")
+    db.delete_draft_artifacts(1)
+    assert db.collect_unreferenced_blobs() == 1
+
+
+def test_migrate_json_columns_to_blobs(db):
+    """Test legacy inline JSON snapshots are moved into the blob store."""
+    pack = {"source_resume_hash": "hash", "skill_vocab": [], "education": [], "projects": []}
+    with db.get_connection() as conn:
+        for draft in range(5):
+            conn.execute("""
+                INSERT INTO draft_artifacts (id, user_id, student_artifact_pack, source_profile_hash)
+                VALUES (?, 1, ?, 'profile-hash')
+            """, (f"draft-{draft}", json.dumps(pack)))
+
+    # One call drains every batch; an exhausted time budget stops after the first
+    assert db.migrate_json_columns_to_blobs(batch_size=2, max_seconds=0) == 2
+    assert db.migrate_json_columns_to_blobs(batch_size=2) == 3
+    assert db.migrate_json_columns_to_blobs() == 0
+    assert db.get_draft_artifact(1)["student_artifact_pack"] == pack
+
+
+def test_text_column_codec():
+    """Test large text values are compressed with a codec byte and small ones stay plain."""
+    from backend.database import encode_text_column, decode_text_column, TEXT_CODEC_ZLIB
+
+    assert encode_text_column("short") == "short"
+    assert encode_text_column(None) is None
+
+    long_text = "Python developer with SQL experience. " * 100
+    encoded = encode_text_column(long_text)
+    assert isinstance(encoded, bytes) and encoded[0] == TEXT_CODEC_ZLIB
+    assert len(encoded) < len(long_text) // 10
+    assert decode_text_column(encoded) == long_text
+
+    with pytest.raises(ValueError):
+        decode_text_column(bytes([99]) + b"data")
+
+
+def test_get_user_profile_projection(db, monkeypatch):
+    """Test resume_text is stored compressed and only read when asked for."""
+    monkeypatch.setattr(db, "validate_user_profile", lambda profile: True)
+    resume_text = "Built data pipelines in Python. " * 200
+    profile_data = {"student_id": "student-1", "skill_vocab": ["python"]}
+    db.create_user_profile(1, "student-1", profile_data, resume_hash="hash", resume_text=resume_text)
+
+    assert db.get_user_profile(1)["resume_text"] is None
+    assert db.get_user_profile(1)["profile_data"] == profile_data
+    assert db.get_user_profile(1, include_resume_text=True)["resume_text"] == resume_text
+
+    with db.get_connection() as conn:
+        stored = conn.execute("SELECT resume_text FROM user_profiles WHERE user_id = 1").fetchone()[0]
+    assert isinstance(stored, bytes)
+
+
+def test_profile_cache_version_invalidation(db, monkeypatch, tmp_path):
+    """Test cached profiles are invalidated by local writes and by other processes' writes."""
+    from backend.database import PersistentDatabase
+
+    monkeypatch.setattr(PersistentDatabase, "validate_user_profile", lambda self, profile: True)
+    db.create_user_profile(1, "student-1", {"skill_vocab": ["python"]})
+
+    assert db.get_user_profile(1)["profile_data"] == {"skill_vocab": ["python"]}
+    assert db.get_user_profile(1)["profile_data"] == {"skill_vocab": ["python"]}
+    assert db.profile_cache.stats()["hits"] == 1
+
+    db.update_user_profile(1, {"skill_vocab": ["go"]})
+    assert db.get_user_profile(1)["profile_data"] == {"skill_vocab": ["go"]}
+
+    # A second instance stands in for another worker process sharing the database file
+    other_worker = PersistentDatabase(db.db_path)
+    other_worker.update_user_profile(1, {"skill_vocab": ["rust"]})
+    assert db.get_user_profile(1)["profile_data"] == {"skill_vocab": ["rust"]}
+
+
+def test_profile_cache_memory_bound():
+    """Test the profile cache evicts least recently used entries past its byte budget."""
+    from backend.profile_cache import ProfileCache
+
+    cache = ProfileCache(max_bytes=100)
+    cache.put(1, 0, {"id": 1}, 40)
+    cache.put(2, 0, {"id": 2}, 40)
+    cache.get(1)
+    cache.put(3, 0, {"id": 3}, 40)
+
+    assert cache.get(2) is None
+    assert cache.get(1) == (0, {"id": 1})
+    assert cache.stats()["bytes"] == 80
+
+
+def test_archive_expired_rows(db):
+    """Test old history and runs move to monthly archives and stay readable."""
+    from datetime import datetime
+
+    pack = {
+        "source_resume_hash": "hash",
+        "skill_vocab": [],
+        "education": [],
+        "projects": [],
+        "constraints": {"min_match_score": 0.5, "max_apps_per_day": 5}
+    }
+    old_run = db.create_autopilot_run_with_profile(1, pack, ["job-1", "job-2"])
+    new_run = db.create_autopilot_run(1, ["job-3"])
+    with db.get_connection() as conn:
+        conn.execute("UPDATE autopilot_runs SET started_at = '2024-01-15 09:00:00' WHERE id = ?", (old_run,))
+    now = datetime.now().timestamp()
+    db.save_application_history(1, old_run, [
+        _app("job-1", "submitted", timestamp=1704067200.0),  # 2024-01-01
+        _app("job-2", "skipped", "Score too low", timestamp=1706745600.0),  # 2024-02-01
+    ])
+    db.save_application_history(1, new_run, [_app("job-3", "submitted", timestamp=now)])
+    stats = db.get_application_stats(1)
+
+    assert db.archive_expired_rows(retention_days=30) == {"application_history": 2, "autopilot_runs": 1}
+    assert db.archive_expired_rows(retention_days=30) == {"application_history": 0, "autopilot_runs": 0}
+
+    assert [entry["job_id"] for entry in db.get_user_application_history(1)] == ["job-3"]
+    archived = db.get_user_application_history(1, limit=2, include_archived=True)
+    assert [entry["job_id"] for entry in archived] == ["job-3", "job-2"]
+    page = db.get_user_application_history(1, before=(archived[-1]["timestamp"], archived[-1]["id"]),
+                                           include_archived=True)
+    assert [entry["job_id"] for entry in page] == ["job-1"]
+
+    assert db.get_application_stats(1) == stats
+    assert db.get_user_job_id_sets(1)["applied"] == {"job-1", "job-3"}
+    assert [run["id"] for run in db.get_user_autopilot_runs(1)] == [new_run]
+    assert db.get_autopilot_run(1, old_run)["job_ids"] == ["job-1", "job-2"]
+    assert db.collect_unreferenced_blobs() == 0
+    db.rebuild_application_rollups()
+    assert sum(row["submitted"] for row in db.get_application_timeseries(1, 0, now + 1)) == 2
+
+    assert db.clear_user_application_history(1) == 3
+    assert db.get_application_stats(1) == {}
+    assert db.optimize_storage()["freed_pages"] >= 0
+
+
+def test_history_reset_epoch(db):
+    """Test clearing history bumps the epoch and old entries are purged later."""
+    run_id = db.create_autopilot_run(1, ["job-1", "job-2"])
+    db.save_application_history(1, run_id, [
+        _app("job-1", "submitted"),
+        _app("job-2", "skipped", "Score 0.40 < required 0.70"),
+    ])
+
+    assert db.clear_user_application_history(1) == 2
+    assert db.get_user_application_history(1) == []
+    assert db.get_application_stats(1) == {}
+    assert db.get_user_job_id_sets(1)["processed"] == set()
+    assert db.count_user_applications_since(1, 0) == 0
+
+    # Old entries stay on disk until purged; new ones land in the new epoch
+    db.save_application_history(1, run_id, [_app("job-2", "submitted", timestamp=2000.0)])
+    assert db.get_user_job_id_sets(1)["applied"] == {"job-2"}
+    with db.get_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM application_history").fetchone()[0] == 3
+
+    assert db.purge_stale_history_epochs(batch_size=1) == 2
+    assert db.get_application_stats(1) == {"submitted": 1}
+    assert [entry["job_id"] for entry in db.get_user_application_history(1)] == ["job-2"]
+    with db.get_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM user_job_states").fetchone()[0] == 1
+
+
+def test_scheduler_daily_limit_after_reset(db):
+    """Test the scheduler's daily count ignores submissions cleared by a history reset."""
+    import time
+    from backend.scheduler import AutonomousAIAgent
+
+    agent = AutonomousAIAgent.__new__(AutonomousAIAgent)
+    agent.db = db
+    profile = {"constraints": {"max_apps_per_day": 2}}
+
+    run_id = db.create_autopilot_run(1, ["job-1", "job-2"])
+    db.save_application_history(1, run_id, [
+        _app("job-1", "submitted", timestamp=time.time()),
+        _app("job-2", "retried", timestamp=time.time()),
+    ])
+    assert agent.get_today_application_count(1) == 2
+    assert not agent.is_user_eligible_today(1, profile)
+
+    # The reset hides today's submissions before the nightly purge removes them
+    db.clear_user_application_history(1)
+    assert agent.get_today_application_count(1) == 0
+    assert agent.is_user_eligible_today(1, profile)
+
+
+def test_reason_codes(db):
+    """Test skip classification uses reason codes, falling back to the text for code-less input."""
+    from core.reason_codes import ReasonCode
+
+    run_id = db.create_autopilot_run(1, ["job-1", "job-2", "job-3"])
+    db.save_application_history(1, run_id, [
+        {**_app("job-1", "skipped", "Come back tomorrow"), "reason_code": ReasonCode.DAILY_LIMIT_REACHED},
+        _app("job-2", "skipped", "Daily limit of 5 applications reached"),
+        {**_app("job-3", "skipped", "Score 0.40 < required 0.70"), "reason_code": ReasonCode.SCORE_BELOW_THRESHOLD},
+    ])
+
+    job_sets = db.get_user_job_id_sets(1)
+    assert job_sets["excluded"] == {"job-3"}
+    assert job_sets["processed"] == {"job-1", "job-2", "job-3"}
+
+    deferred = db.get_user_application_history(1, reason_code=ReasonCode.DAILY_LIMIT_REACHED)
+    assert sorted(entry["job_id"] for entry in deferred) == ["job-1", "job-2"]
+    assert all(entry["reason_code"] == ReasonCode.DAILY_LIMIT_REACHED for entry in deferred)
+
+
+def test_apply_json_patch():
+    """Test RFC 6902 operations and atomic failure."""
+    from backend.profile_changes import apply_json_patch, JsonPatchError
+
+    document = {"basic_info": {"name": "A"}, "skills": ["python"], "a/b": 1}
+    patched = apply_json_patch(document, [
+        {"op": "add", "path": "/skills/-", "value": "sql"},
+        {"op": "replace", "path": "/basic_info/name", "value": "B"},
+        {"op": "copy", "from": "/skills/0", "path": "/primary"},
+        {"op": "move", "from": "/a~1b", "path": "/c"},
+        {"op": "test", "path": "/c", "value": 1},
+    ])
+    assert patched == {"basic_info": {"name": "B"}, "skills": ["python", "sql"], "primary": "python", "c": 1}
+    assert document["skills"] == ["python"]
+
+    with pytest.raises(JsonPatchError):
+        apply_json_patch(document, [{"op": "test", "path": "/skills/0", "value": "go"}])
+    with pytest.raises(JsonPatchError):
+        apply_json_patch(document, [{"op": "replace", "path": "/missing", "value": 1}])
+
+
+def test_patch_user_profile(db):
+    """Test patches rewrite the profile only when it changes and report changed fields."""
+    from backend.profile_changes import ProfileVersionConflict
+
+    db.create_user_profile(1, "student-1", {
+        "student_id": "student-1",
+        "basic_info": {"name": "A", "email": "a@example.com"},
+        "skill_vocab": ["python", "sql"],
+        "skills": ["python"]
+    })
+
+    result = db.patch_user_profile(1, [{"op": "replace", "path": "/basic_info/name", "value": "B"}])
+    assert result["changed_fields"] == ["basic_info"]
+    assert result["version"] == 1
+    assert db.get_user_profile(1)["profile_data"]["basic_info"]["name"] == "B"
+
+    noop = db.patch_user_profile(1, [{"op": "test", "path": "/skills/0", "value": "python"}])
+    assert noop == {"version": 1, "changed_fields": [], "profile_data": result["profile_data"]}
+
+    with pytest.raises(ProfileVersionConflict):
+        db.patch_user_profile(1, [{"op": "add", "path": "/skills/-", "value": "sql"}], expected_version=0)
+    with pytest.raises(ValueError):
+        db.patch_user_profile(1, [{"op": "add", "path": "/skills/-", "value": "rust"}])
+    assert db.get_user_profile(1)["version"] == 1
+
+
+def test_session_store(db):
+    """Test sessions persist across store instances and activity is written in batches."""
+    from backend.session_store import SessionStore, hash_token
+
+    store = SessionStore(db, flush_batch_size=1000)
+    token = store.create(1)
+    assert store.resolve(token) == 1
+    assert store.resolve("not-a-token") is None
+    assert db.get_user_by_email("student@example.com")["last_login"] is None
+
+    # Tokens are stored hashed, and a fresh store (restart / other worker) sees the session
+    assert db.get_session(token) is None
+    assert SessionStore(db).resolve(token) == 1
+
+    store.flush()
+    assert db.get_user_by_email("student@example.com")["last_login"] is not None
+    seen_at = db.get_session(hash_token(token))["last_seen_at"]
+    assert store.pending_logins == {} and store.pending_touches == {}
+
+    # Older buffered activity does not overwrite newer
+    db.record_session_activity({}, {hash_token(token): seen_at - 10}, store.ttl_seconds)
+    assert db.get_session(hash_token(token))["last_seen_at"] == seen_at
+
+    assert store.revoke(token)
+    assert store.resolve(token) is None
+    assert not store.revoke(token)
+
+    expired = SessionStore(db, ttl_seconds=-1)
+    expired_token = expired.create(1)
+    assert expired.resolve(expired_token) is None
+    assert db.delete_expired_sessions() == 1
+    store.close()
+    expired.close()
@@ -0,0 +1,584 @@
+"""
+Tests for portal integration: job fetcher, shared catalog and sandbox portal API
+"""
+import pytest
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _portal_job(job_id, company="Test Company", role="Software Engineer"):
+    return {
+        "job_id": job_id,
+        "company": company,
+        "role": role,
+        "location": "Remote",
+        "required_skills": ["python"],
+        "job_type": "Full-time"
+    }
+
+
+class StubFetcher:
+    """Stands in for JobFetcher's catalog change methods with a scripted portal."""
+
+    def __init__(self, jobs):
+        from backend.job_fetcher import JobFetcher
+
+        self.jobs = jobs
+        self.changed = []
+        self.deleted = []
+        self.down = False
+        self.calls = 0
+        self.catalog_cursor = None
+        self.restored_cursor = None
+        self.convert_portal_job_to_internal_format = JobFetcher("http://portal.invalid").convert_portal_job_to_internal_format
+
+    def fetch_catalog_changes(self):
+        self.calls += 1
+        if self.down:
+            return None
+        if self.catalog_cursor is None:
+            self.catalog_cursor = "feed:1"
+            return {"not_modified": False, "full": True, "jobs": list(self.jobs), "deleted_job_ids": []}
+        changed, deleted = self.changed, self.deleted
+        self.changed, self.deleted = [], []
+        return {"not_modified": not changed and not deleted, "full": False, "jobs": changed, "deleted_job_ids": deleted}
+
+    def restore_catalog_cursor(self, cursor):
+        self.restored_cursor = cursor
+        return False  # Scripted portal always starts with a full listing
+
+    def stream_catalog_changes(self):
+        result = self.fetch_catalog_changes()
+        if result is None:
+            return None
+        changes = [("job", job) for job in result["jobs"]] + [("deleted", job_id) for job_id in result["deleted_job_ids"]]
+        return {"full": result["full"], "changes": iter(changes)}
+
+
+def test_job_catalog_revalidation():
+    """Test the catalog loads once, merges deltas and serves stale data when the portal is down."""
+    from backend.job_catalog import JobCatalog
+
+    fetcher = StubFetcher([_portal_job("job-1"), _portal_job("job-2")])
+    catalog = JobCatalog(fetcher, ttl_seconds=3600)
+    try:
+        version, jobs = catalog.snapshot()
+        assert version == 1
+        assert [job["job_id"] for job in jobs] == ["job-1", "job-2"]
+        assert jobs[0]["source"] == "sandbox_portal"
+
+        # Fresh catalog: no portal traffic
+        assert catalog.snapshot()[0] == 1
+        assert fetcher.calls == 1
+
+        # Nothing changed: same version
+        assert not catalog.refresh()
+        assert catalog.status()["not_modified"] == 1
+
+        # Delta: one deletion, one update, one new job
+        fetcher.deleted = ["job-1"]
+        fetcher.changed = [_portal_job("job-2", role="Data Engineer"), _portal_job("job-3")]
+        assert catalog.refresh()
+        version, jobs = catalog.snapshot()
+        assert version == 2
+        assert [(job["job_id"], job["role"]) for job in jobs] == [
+            ("job-2", "Data Engineer"), ("job-3", "Software Engineer")
+        ]
+
+        # A delta that changes nothing keeps the version
+        fetcher.changed = [_portal_job("job-3")]
+        assert not catalog.refresh()
+        assert catalog.status()["deltas"] == 2
+
+        # Portal down: keep serving the last catalog
+        fetcher.down = True
+        assert not catalog.refresh()
+        assert catalog.status()["status"] == "unavailable"
+        assert catalog.snapshot() == (2, jobs)
+    finally:
+        catalog.close()
+
+
+def test_sandbox_jobs_etag():
+    """Test the sandbox portal answers If-None-Match with 304 until the catalog changes."""
+    from sandbox import job_portal
+
+    job_portal.JOBS_DB = [_portal_job("job-1")]
+    job_portal.record_job_changes(changed_ids=["job-1"])
+    client = job_portal.app.test_client()
+
+    response = client.get("/api/jobs")
+    etag = response.headers["ETag"]
+    assert response.status_code == 200
+    assert client.get("/api/jobs", headers={"If-None-Match": etag}).status_code == 304
+
+    # Page views are not catalog changes
+    client.get("/api/jobs/job-1")
+    assert client.get("/api/jobs", headers={"If-None-Match": etag}).status_code == 304
+
+    job_portal.JOBS_DB.append(_portal_job("job-2"))
+    job_portal.record_job_changes(changed_ids=["job-2"])
+    response = client.get("/api/jobs", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_single_flight_coalescing():
+    """Test concurrent identical calls share one execution on both the thread and asyncio paths."""
+    import asyncio
+    import threading
+    import time
+    from backend.single_flight import SingleFlight
+
+    flight = SingleFlight()
+    release = threading.Event()
+    executions = []
+
+    def slow_call():
+        executions.append(1)
+        release.wait(5)
+        return {"jobs": 3}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("jobs", slow_call))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    while flight.stats()["coalesced"] < 4:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert len(executions) == 1
+    assert results == [{"jobs": 3}] * 5
+    assert flight.stats() == {"executions": 1, "coalesced": 4, "in_flight": 0}
+
+    # A finished call is not cached
+    assert flight.do("jobs", lambda: "again") == "again"
+
+    async def gather():
+        async def slow_async():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("portal down")
+        return await asyncio.gather(*[flight.do_async("status", slow_async) for _ in range(3)],
+                                    return_exceptions=True)
+
+    errors = asyncio.run(gather())
+    assert all(isinstance(error, RuntimeError) for error in errors)
+    assert flight.stats() == {"executions": 3, "coalesced": 6, "in_flight": 0}
+
+
+def test_http_client_retries_and_timeouts():
+    """Test pooled sessions retry GETs on 503, never retry POSTs, enforce the read timeout and record metrics."""
+    import threading
+    import time
+    import requests
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from backend.http_client import HTTPClientRegistry
+
+    hits = {"GET": 0, "POST": 0}
+
+    class FlakyPortal(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _respond(self, status):
+            self.send_response(status)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        def do_GET(self):
+            hits["GET"] += 1
+            if self.path == "/slow":
+                time.sleep(0.5)
+            self._respond(503 if hits["GET"] < 3 else 200)
+
+        def do_POST(self):
+            hits["POST"] += 1
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            self._respond(503)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FlakyPortal)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    try:
+        registry = HTTPClientRegistry(read_timeout=0.2, get_retries=3, backoff_factor=0)
+        session = registry.get_session(base_url)
+        assert registry.get_session(base_url) is session
+
+        assert session.get(f"{base_url}/api/jobs").status_code == 200
+        assert hits["GET"] == 3
+
+        assert session.post(f"{base_url}/api/jobs/job-1/apply", json={}).status_code == 503
+        assert hits["POST"] == 1
+
+        with pytest.raises(requests.exceptions.ConnectionError):
+            session.get(f"{base_url}/slow")
+
+        stats = registry.stats()[base_url]
+        assert stats["latency"]["GET"]["count"] == 2
+        assert stats["latency"]["POST"]["count"] == 1
+        assert stats["errors"] == 1 and stats["in_flight"] == 0
+        assert stats["pools"][f"http://127.0.0.1:{server.server_port}"]["connections_opened"] >= 1
+    finally:
+        server.shutdown()
+
+
+def test_async_job_fetcher():
+    """Test the async fetcher against the sandbox portal, with concurrent identical GETs coalesced."""
+    import asyncio
+    import threading
+    from werkzeug.serving import make_server
+    from sandbox import job_portal
+    from backend.async_job_fetcher import AsyncJobFetcher
+    from backend.single_flight import SingleFlight
+
+    job_portal.JOBS_DB = [_portal_job("job-1"), _portal_job("job-2", company="Other Co")]
+    server = make_server("127.0.0.1", 0, job_portal.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    async def exercise():
+        async with AsyncJobFetcher(f"http://127.0.0.1:{server.server_port}", single_flight=flight) as fetcher:
+            listings = await asyncio.gather(*[fetcher.fetch_jobs({"limit": 10}) for _ in range(5)])
+            details = await fetcher.get_job_details("job-2")
+            missing = await fetcher.get_job_details("job-404")
+            status = await fetcher.check_portal_status()
+            submission = await fetcher.submit_application("job-404", {"applicant_name": "A"})
+            catalog = await fetcher.fetch_catalog_changes()
+            unchanged = await fetcher.fetch_catalog_changes()
+            return listings, details, missing, status, submission, catalog, unchanged
+
+    flight = SingleFlight()
+    try:
+        listings, details, missing, status, submission, catalog, unchanged = asyncio.run(exercise())
+    finally:
+        server.shutdown()
+
+    assert all([job["job_id"] for job in jobs] == ["job-1", "job-2"] for jobs in listings)
+    assert flight.stats()["coalesced"] >= 1
+    assert details["company"] == "Other Co"
+    assert missing is None
+    assert status["status"] == "active"
+    assert submission["success"] is False and submission["status"] == "failed"
+    assert catalog["full"] and len(catalog["jobs"]) == 2
+    assert unchanged["not_modified"] and not unchanged["full"]
+
+
+def test_sandbox_change_feed():
+    """Test the fetcher keeps the portal change cursor and receives only deltas and tombstones."""
+    import threading
+    from werkzeug.serving import make_server
+    from sandbox import job_portal
+    from backend.job_fetcher import JobFetcher
+    from backend.single_flight import SingleFlight
+
+    job_portal.JOBS_DB = [_portal_job("job-1"), _portal_job("job-2")]
+    job_portal.record_job_changes(changed_ids=["job-1", "job-2"])
+    server = make_server("127.0.0.1", 0, job_portal.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    portal = job_portal.app.test_client()
+    try:
+        fetcher = JobFetcher(f"http://127.0.0.1:{server.server_port}", single_flight=SingleFlight())
+
+        full = fetcher.fetch_catalog_changes()
+        assert full["full"] and len(full["jobs"]) == 2
+        assert fetcher.catalog_cursor == job_portal.current_change_cursor()
+
+        assert fetcher.fetch_catalog_changes()["not_modified"]
+
+        portal.post("/api/jobs/job-2/update-skills", json={"required_skills": ["go"]})
+        portal.delete("/api/jobs/job-1")
+        delta = fetcher.fetch_catalog_changes()
+        assert not delta["full"]
+        assert [job["job_id"] for job in delta["jobs"]] == ["job-2"]
+        assert delta["jobs"][0]["required_skills"] == ["go"]
+        assert delta["deleted_job_ids"] == ["job-1"]
+
+        # Cursor from another portal process: full relisting
+        fetcher.catalog_cursor = "other-feed:5"
+        relisted = fetcher.fetch_catalog_changes()
+        assert relisted["full"] and [job["job_id"] for job in relisted["jobs"]] == ["job-2"]
+
+        # Compacted tombstones: cursors older than the oldest kept tombstone get a full listing
+        stale_cursor = job_portal.current_change_cursor()
+        original_max = job_portal.MAX_TOMBSTONES
+        job_portal.MAX_TOMBSTONES = 1
+        try:
+            job_portal.record_job_changes(deleted_ids=["gone-1", "gone-2"])
+        finally:
+            job_portal.MAX_TOMBSTONES = original_max
+        assert list(job_portal.JOB_TOMBSTONES) == ["gone-2"]
+        assert job_portal.parse_change_cursor(stale_cursor) is None
+        assert job_portal.parse_change_cursor(job_portal.current_change_cursor()) is not None
+
+        assert portal.get("/api/jobs?updated_since=x&limit=5").status_code == 400
+    finally:
+        server.shutdown()
+
+
+def test_paginated_and_streamed_catalog():
+    """Test page-by-page iteration and the NDJSON change stream, which only advances the cursor once consumed."""
+    import threading
+    from werkzeug.serving import make_server
+    from sandbox import job_portal
+    from backend.job_fetcher import JobFetcher
+    from backend.single_flight import SingleFlight
+
+    job_ids = [f"job-{i:03d}" for i in range(1, 8)]
+    job_portal.JOBS_DB = [_portal_job(job_id) for job_id in job_ids]
+    job_portal.record_job_changes(changed_ids=job_ids)
+    server = make_server("127.0.0.1", 0, job_portal.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        fetcher = JobFetcher(f"http://127.0.0.1:{server.server_port}", single_flight=SingleFlight())
+
+        assert [job["job_id"] for job in fetcher.iter_jobs(page_size=3)] == job_ids
+        assert [job["job_id"] for job in fetcher.iter_jobs({"limit": 4}, page_size=3)] == job_ids[:4]
+
+        # Page tokens are stable keys: a delete between page requests neither skips nor repeats jobs
+        portal = job_portal.app.test_client()
+        first_page = portal.get("/api/jobs?page_size=3").get_json()
+        portal.delete("/api/jobs/job-002")
+        second_page = portal.get(f"/api/jobs?page_size=3&page_token={first_page['next_page_token']}").get_json()
+        assert [job["job_id"] for job in second_page["jobs"]] == job_ids[3:6]
+        job_ids.remove("job-002")
+
+        stream = fetcher.stream_catalog_changes()
+        assert stream["full"]
+        assert fetcher.catalog_cursor is None
+        assert [item["job_id"] for kind, item in stream["changes"]] == job_ids
+        assert fetcher.catalog_cursor == job_portal.current_change_cursor()
+
+        job_portal.app.test_client().delete("/api/jobs/job-001")
+        delta = fetcher.stream_catalog_changes()
+        assert not delta["full"]
+        assert list(delta["changes"]) == [("deleted", "job-001")]
+    finally:
+        server.shutdown()
+
+
+def test_batch_application_submission():
+    """Test batched submission: shared applicant block, per-item receipts and errors, in order."""
+    import threading
+    from werkzeug.serving import make_server
+    from sandbox import job_portal
+    from backend.job_fetcher import JobFetcher
+    from backend.engine import split_shared_fields
+    from backend.single_flight import SingleFlight
+
+    job_portal.JOBS_DB = [{**_portal_job(job_id), "status": "active"} for job_id in ("job-001", "job-002")]
+    job_portal.record_job_changes(changed_ids=["job-001", "job-002"])
+    server = make_server("127.0.0.1", 0, job_portal.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        fetcher = JobFetcher(f"http://127.0.0.1:{server.server_port}", single_flight=SingleFlight())
+
+        payloads = [
+            {"applicant_name": "Batch Tester", "email": "batch@example.com", "skills": ["Python"],
+             "cover_letter": f"Letter for {job_id}"}
+            for job_id in ("job-001", "job-002", "job-404", "job-001")
+        ]
+        applicant, overrides = split_shared_fields(payloads)
+        assert set(applicant) == {"applicant_name", "email", "skills"}
+        assert overrides[0] == {"cover_letter": "Letter for job-001"}
+
+        applications = [{**override, "job_id": job_id}
+                        for override, job_id in zip(overrides, ("job-001", "job-002", "job-404", "job-001"))]
+        results = fetcher.submit_applications(applicant, applications, batch_size=3)
+
+        assert [result["job_id"] for result in results] == ["job-001", "job-002", "job-404", "job-001"]
+        assert [result["success"] for result in results] == [True, True, False, False]
+        assert all(result["receipt_id"] for result in results[:2])
+        assert "not found" in results[2]["error"]
+        assert "Duplicate" in results[3]["error"]
+        assert not any(result.get("retryable") for result in results)
+    finally:
+        server.shutdown()
+
+
+def test_submission_outcomes_match_across_modes():
+    """Test sequential and batch autopilot runs track portal rejections and retries the same way."""
+    from backend.engine import run_autopilot
+
+    class RejectingFetcher:
+        """Rejects job-002; the first attempt at job-003 gets no portal answer."""
+
+        def __init__(self):
+            self.attempts = {}
+
+        def submit_application(self, job_id, application_data):
+            self.attempts[job_id] = self.attempts.get(job_id, 0) + 1
+            if job_id == "job-002":
+                return {"success": False, "error": "Job is not accepting applications", "status": "failed"}
+            if job_id == "job-003" and self.attempts[job_id] == 1:
+                return {"success": False, "error": "Connection reset", "status": "failed", "retryable": True}
+            return {"success": True, "receipt_id": f"receipt-{job_id}", "status": "submitted"}
+
+        def submit_applications(self, applicant, applications, batch_size=50):
+            return [{**self.submit_application(item["job_id"], {**applicant, **item}), "job_id": item["job_id"]}
+                    for item in applications]
+
+    student = {
+        "source_resume_hash": "test-hash",
+        "skill_vocab": ["python"],
+        "education": [],
+        "projects": [{
+            "name": "API", "description": "Payments API", "skills": ["python"],
+            "bullets": [{"description": "Built the payments API in Python", "skills": ["python"], "verified": True}]
+        }],
+        "constraints": {"max_apps_per_day": 10, "min_match_score": 0.0, "blocked_companies": []}
+    }
+    jobs = [
+        {"job_id": job_id, "company": "Test Company", "role": "Software Engineer", "location": "Remote",
+         "required_skills": ["python"], "min_experience_years": 0}
+        for job_id in ("job-001", "job-002", "job-003")
+    ]
+
+    outcomes = {}
+    for batch_submit in (False, True):
+        result = run_autopilot(student, jobs, batch_submit=batch_submit, job_fetcher=RejectingFetcher())
+        assert result["success"], result["error"]
+        outcomes[batch_submit] = result["summary"]
+        statuses = {event["job_id"]: event["status"] for event in result["tracker"].get_applications()
+                    if event["status"] != "queued"}
+        assert statuses == {"job-001": "submitted", "job-002": "failed", "job-003": "retried"}
+    assert outcomes[False] == outcomes[True]
+    assert outcomes[False]["failed"] == 1
+
+
+def test_portal_health_monitor():
+    """Test the health monitor's availability flag, failure threshold and snapshot."""
+    import threading
+    from werkzeug.serving import make_server
+    from sandbox import job_portal
+    from backend.portal_health import PortalHealthMonitor
+
+    server = make_server("127.0.0.1", 0, job_portal.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    portal_url = f"http://127.0.0.1:{server.server_port}"
+    monitor = PortalHealthMonitor([portal_url], timeout_seconds=1, failure_threshold=2)
+    monitor.close()  # No background prober: probes are driven by hand below
+    try:
+        assert monitor.is_available(portal_url)
+        snapshot = monitor.snapshot(portal_url)
+        assert snapshot["status"] == "active"
+        assert snapshot["latency_ms"] is not None
+        assert snapshot["stats"] == job_portal.PORTAL_STATS
+
+        server.shutdown()
+        server.server_close()
+        assert monitor.probe(portal_url)  # One failure is tolerated
+        assert not monitor.probe(portal_url)
+        assert not monitor.is_available(portal_url)
+        assert monitor.snapshot(portal_url)["consecutive_failures"] == 2
+
+        # A portal that never answered is down after its first probe
+        assert not monitor.is_available("http://127.0.0.1:9")
+        assert set(monitor.snapshot()) == {portal_url, "http://127.0.0.1:9"}
+    finally:
+        monitor.close()
+
+
+def test_federated_job_fetcher():
+    """Test concurrent fetch across portals, cross-post deduplication and submission routing."""
+    import threading
+    from werkzeug.serving import make_server
+    from sandbox import job_portal
+    from backend.federated_fetcher import FederatedJobFetcher
+
+    description = "Build and operate Python services for our payments platform with a small team"
+    primary, repost, other = (
+        {**_portal_job("job-1", company="Acme"), "description": description},
+        {**_portal_job("job-2", company="ACME "), "description": description + " today"},
+        {**_portal_job("job-3", company="Acme"), "description": "Design the mobile app onboarding flow"}
+    )
+    fetcher = FederatedJobFetcher(["http://portal-a.invalid", "http://portal-b.invalid:8080"])
+    assert [job["job_id"] for job in fetcher.deduplicate([primary, repost, other])] == ["job-1", "job-3"]
+    assert fetcher.deduplicate([primary, repost])[0]["also_posted_on"] == ["job-2"]
+    assert fetcher.route("job-7@portal-b.invalid:8080") == ("http://portal-b.invalid:8080", "job-7")
+    assert fetcher.route("job-7") == ("http://portal-a.invalid", "job-7")
+    assert fetcher.route("ops@acme") == ("http://portal-a.invalid", "ops@acme")
+    assert fetcher.route("ops@portal-a.invalid") == ("http://portal-a.invalid", "ops@portal-a.invalid")
+
+    # Two portals serving the same listings: every job is a cross-post of the primary's
+    job_portal.JOBS_DB = [
+        {**_portal_job(job_id, role=role), "status": "active", "description": f"{role} role"}
+        for job_id, role in (("job-001", "Backend Engineer"), ("job-002", "Data Analyst"))
+    ]
+    job_portal.record_job_changes(changed_ids=["job-001", "job-002"])
+    servers = [make_server("127.0.0.1", 0, job_portal.app, threaded=True) for _ in range(2)]
+    for server in servers:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        urls = [f"http://127.0.0.1:{server.server_port}" for server in servers]
+        fetcher = FederatedJobFetcher(urls)
+        second = f"127.0.0.1:{servers[1].server_port}"
+
+        jobs = fetcher.fetch_jobs()
+        assert [job["job_id"] for job in jobs] == ["job-001", "job-002"]
+        assert jobs[0]["also_posted_on"] == [f"job-001@{second}"]
+
+        stream = fetcher.stream_catalog_changes()
+        assert stream["full"]
+        assert [item["job_id"] for kind, item in stream["changes"]] == ["job-001", "job-002"]
+        assert not fetcher.stream_catalog_changes()["full"]
+
+        applicant = {"applicant_name": "Fed Tester", "email": "federated@example.com", "skills": ["Python"]}
+        results = fetcher.submit_applications(applicant, [
+            {"job_id": f"job-002@{second}", "cover_letter": "Hello"},
+            {"job_id": "job-001", "cover_letter": "Hello"}
+        ])
+        assert [result["job_id"] for result in results] == [f"job-002@{second}", "job-001"]
+        assert [result["portal_url"] for result in results] == [urls[1], urls[0]]
+        assert all(result["success"] for result in results)
+    finally:
+        for server in servers:
+            server.shutdown()
+
+
+def test_job_catalog_snapshot(tmp_path):
+    """Test the on-disk snapshot round-trips jobs and serves a restarted catalog while the portal is down."""
+    from backend.catalog_snapshot import CatalogSnapshot, write_snapshot
+    from backend.job_catalog import JobCatalog
+
+    jobs = [
+        {"job_id": "job-1", "required_skills": ["Python", "SQL"], "views": 3, "salary_range": None},
+        {"job_id": "job-2", "required_skills": ["sql"], "views": 2 ** 40, "department": "Data"}
+    ]
+    path = str(tmp_path / "catalog.snapshot")
+    write_snapshot(path, jobs, {"sql": [0, 1]}, version=4, cursor="feed:9")
+    with CatalogSnapshot(path) as snapshot:
+        assert snapshot.jobs() == jobs
+        assert snapshot.job(1) == jobs[1]
+        assert snapshot.column("views") == [3, 2 ** 40]
+        assert snapshot.skill_index() == {"sql": [0, 1]}
+        assert (snapshot.version, snapshot.cursor) == (4, "feed:9")
+
+    fetcher = StubFetcher([_portal_job("job-1"), _portal_job("job-2", role="Data Analyst")])
+    catalog = JobCatalog(fetcher, ttl_seconds=3600, snapshot_path=path)
+    catalog.close()
+    catalog.refresh()
+    assert catalog.snapshot_saves == 1
+    assert [job["job_id"] for job in catalog.jobs_with_skills(["PYTHON"])] == ["job-1", "job-2"]
+
+    # A restarted process serves the saved catalog without waiting for the (unreachable) portal
+    restarted_fetcher = StubFetcher([])
+    restarted_fetcher.down = True
+    restarted = JobCatalog(restarted_fetcher, ttl_seconds=3600, snapshot_path=path)
+    restarted.close()
+    version, restored_jobs = restarted.snapshot()
+    assert (version, restored_jobs) == (catalog.version, catalog.jobs)
+    assert restarted.status()["restored_from_snapshot"]
+    assert restarted_fetcher.calls == 0
+    assert restarted_fetcher.restored_cursor == "feed:1"
+
+    # Unreadable snapshots are ignored
+    with open(path, "r+b") as f:
+        f.seek(-1, 2)
+        f.write(b"\x00")
+    assert JobCatalog(StubFetcher([]), snapshot_path=path).version == 0